@@ -1,8 +1,12 @@
 # pages/1_Data_Ingestion.py
 import streamlit as st
 from utils.file_handlers import load_excel, load_pdf_text, analyze_excel_structure
+from utils.instrument import timing_sidebar
+from utils.parse_cache import get_parse_cache
+from utils.pdf_extract import extract_schedule_tables
 
 st.title("Step 1: Upload Source Files")
+timing_sidebar()
 
 uploaded_files = st.file_uploader(
     "Upload Excel schedules & building lookup (and optional PDFs)",
@@ -12,16 +16,24 @@ uploaded_files = st.file_uploader(
 if "RAW_FILES" not in st.session_state:
     st.session_state["RAW_FILES"] = {}
 
+# Parsed uploads are shared on disk across sessions, keyed by file content
+cache = get_parse_cache()
+
 if uploaded_files:
     for f in uploaded_files:
         data = f.read()
         if f.type in ("application/pdf",) or f.name.lower().endswith(".pdf"):
-            txt = load_pdf_text(data)
-            st.session_state["RAW_FILES"][f.name] = {"type": "pdf", "text": txt}
+            txt = load_pdf_text(data, cache=cache)
+            # Pages come from the per-page cache filled by load_pdf_text
+            tables = extract_schedule_tables(data, cache=cache)
+            st.session_state["RAW_FILES"][f.name] = {"type": "pdf", "text": txt, "tables": tables}
             st.success(f"PDF loaded: {f.name}")
+            if tables:
+                st.caption(f"{len(tables)} schedule table(s) found: "
+                           f"{sum(len(t) for t in tables.values()):,} rows, used in Step 2.")
         else:
             try:
-                sheets = load_excel(data, f.name)
+                sheets = load_excel(data, f.name, cache=cache)
                 st.session_state["RAW_FILES"][f.name] = {"type": "excel", "sheets": sheets}
                 st.success(f"Excel loaded: {f.name}")
                 st.dataframe(analyze_excel_structure(sheets))
@@ -4,49 +4,64 @@ import pandas as pd
 
 from utils.file_handlers import (
     analyze_excel_structure,
+    collect_schedule_sheets,
     detect_bldg_lookup_sheet,
-    load_bldg_room_lookup,
-    merge_class_schedule,
 )
 
-from utils.transformations import (
-    build_course_schedule,
-    build_campus_rooms,
-    build_campus_buildings,
-    build_academic_departments,   # <-- exact name
-    build_rooms_inventory,
-    build_course_instructors,
-)
+from utils.instrument import timing_sidebar
+from utils.preview import paginated_dataframe
+from utils.pipeline import HIT, build_transformation_pipeline
+from utils.session_store import session_spill, stash
+from utils.transformations import memory_report
 
 st.title("Step 2: Transformations")
+timing_sidebar()
+
+# Stage outputs are memoized across reruns; only stages downstream of a change recompute
+if "PIPELINE" not in st.session_state:
+    st.session_state["PIPELINE"] = build_transformation_pipeline(spill=session_spill())
+pipe = st.session_state["PIPELINE"]
+pipe.reset_report()
 
 raw_files = st.session_state.get("RAW_FILES", {})
 if not raw_files:
     st.warning("⚠️ Please upload files in Step 1 first.")
     st.stop()
 
-# Collect candidate schedule sheets (very loose heuristic)
-excel_schedules = []
-for _, info in raw_files.items():
-    if info["type"] != "excel":
-        continue
-    for sname, df in info["sheets"].items():
-        cols = {str(c).strip().lower() for c in df.columns}
-        if any(k in cols for k in ("times","days","rooms")) or any(k in cols for k in ("start time","end time")):
-            excel_schedules.append(df)
+# Collect candidate schedule sheets (very loose heuristic, headers only),
+# plus schedule tables extracted from PDFs
+excel_schedules, schedule_keys = collect_schedule_sheets(
+    {name: info["sheets"] if info["type"] == "excel" else info.get("tables", {})
+     for name, info in raw_files.items()}
+)
 
 st.subheader("1) Build Course Schedule")
+compact = st.checkbox(
+    "Compact schema (categorical / Arrow-backed columns)",
+    value=st.session_state.get("COMPACT_SCHEMA", False),
+    help="Stores repeated text as integer-coded categories and dates as datetimes to cut memory on large schedules.",
+)
+st.session_state["COMPACT_SCHEMA"] = compact
+pipe.set_source("schedule_sheets", excel_schedules, fingerprint=repr(schedule_keys))
+pipe.set_source("compact_schema", compact)
 try:
-    merged = merge_class_schedule(excel_schedules)
-    course_schedule = build_course_schedule(merged)
-    st.session_state["COURSE_SCHEDULE"] = course_schedule
-    st.success("✅ Course Schedule built.")
-    st.dataframe(course_schedule.astype({c:"string" for c in course_schedule.columns if course_schedule[c].dtype=='object'}))
+    course_schedule = pipe.get("course_schedule")
+    stash("COURSE_SCHEDULE", course_schedule)
+    dropped = pipe.get("normalized").attrs.get("duplicate_sections", 0)
+    st.success("✅ Course Schedule built." + (f" Dropped {dropped:,} section(s) repeated across files." if dropped else ""))
+    if compact:
+        with st.expander("Memory report"):
+            st.dataframe(memory_report(pipe.get("normalized"), course_schedule))
+    paginated_dataframe(course_schedule, key="course_schedule", fingerprint=pipe.key("course_schedule"))
 except Exception as e:
     st.error(f"❌ Error building Course Schedule: {e}")
     st.stop()
 
 st.subheader("2) Build Campus Rooms (from Building Lookup)")
+def _set_lookup_source(sheets, sheet_name):
+    pipe.set_source("lookup_sheets", sheets, fingerprint=repr(getattr(sheets, "key", id(sheets))))
+    pipe.set_source("lookup_sheet", sheet_name)
+
 lookup_df = None
 # Try auto-detect once
 for fname, info in raw_files.items():
@@ -55,7 +70,8 @@ for fname, info in raw_files.items():
     cand = detect_bldg_lookup_sheet(info["sheets"])
     if cand:
         try:
-            lookup_df = load_bldg_room_lookup(info["sheets"], cand)
+            _set_lookup_source(info["sheets"], cand)
+            lookup_df = pipe.get("lookup")
             st.caption(f"Auto-detected: {fname} :: {cand}")
             break
         except Exception as e:
@@ -69,33 +85,40 @@ if lookup_df is None:
         sheet_name = st.selectbox("Select sheet", options=list(raw_files[selected_file]["sheets"].keys()))
         if sheet_name:
             try:
-                lookup_df = load_bldg_room_lookup(raw_files[selected_file]["sheets"], sheet_name)
+                _set_lookup_source(raw_files[selected_file]["sheets"], sheet_name)
+                lookup_df = pipe.get("lookup")
             except Exception as e:
                 st.error(f"❌ Error loading building lookup: {e}")
                 st.stop()
 
 try:
-    campus_rooms = build_campus_rooms(lookup_df)
-    st.session_state["CAMPUS_ROOMS"] = campus_rooms
+    if lookup_df is None:
+        raise ValueError("Empty building/room lookup dataframe provided.")
+    campus_rooms = pipe.get("campus_rooms")
+    stash("CAMPUS_ROOMS", campus_rooms)
     st.success("✅ Campus Rooms built.")
-    st.dataframe(campus_rooms.astype({c:"string" for c in campus_rooms.columns if campus_rooms[c].dtype=='object'}))
+    paginated_dataframe(campus_rooms, key="campus_rooms", fingerprint=pipe.key("campus_rooms"))
 except Exception as e:
     st.error(f"❌ Error building Campus Rooms: {e}")
     st.stop()
 
 st.subheader("3) Buildings, Departments, Inventory, Instructors")
-buildings = build_campus_buildings(campus_rooms)
-st.session_state["CAMPUS_BUILDINGS"] = buildings
-st.dataframe(buildings)
+buildings = pipe.get("buildings")
+stash("CAMPUS_BUILDINGS", buildings)
+paginated_dataframe(buildings, key="buildings", fingerprint=pipe.key("buildings"))
+
+departments = pipe.get("departments")
+stash("ACADEMIC_DEPARTMENTS", departments)
+paginated_dataframe(departments, key="departments", fingerprint=pipe.key("departments"))
 
-departments = build_academic_departments(course_schedule)
-st.session_state["ACADEMIC_DEPARTMENTS"] = departments
-st.dataframe(departments)
+inventory = pipe.get("inventory")
+stash("ROOMS_INVENTORY", inventory)
 
-inventory = build_rooms_inventory(campus_rooms)
-st.session_state["ROOMS_INVENTORY"] = inventory
+instructors = pipe.get("instructors")
+stash("COURSE_INSTRUCTORS", instructors)
 
-instructors = build_course_instructors(course_schedule)
-st.session_state["COURSE_INSTRUCTORS"] = instructors
+hits = [n for n, status in pipe.report.items() if status == HIT]
+recomputed = [n for n, status in pipe.report.items() if status != HIT]
+st.caption(f"Pipeline cache hits: {', '.join(hits) or 'none'} · recomputed: {', '.join(recomputed) or 'none'}")
 
 st.info("Proceed to **Step 3: Analysis**.")
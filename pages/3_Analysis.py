@@ -1,4 +1,5 @@
 # pages/3_Analysis.py
+import datetime
 import streamlit as st
 from utils.analysis import (
     calculate_room_utilization,
@@ -6,36 +7,143 @@ from utils.analysis import (
     detect_room_conflicts,
     detect_instructor_conflicts,
 )
+from utils.availability import RoomAvailability
+from utils.conflict_index import ConflictIndex
+from utils.fingerprint import frame_fingerprint
+from utils.gemini_client import stream_conflicts_summary
+from utils.instrument import timing_sidebar
+from utils.meetings import get_meeting_table
+from utils.occupancy import get_occupancy, heatmap_table, hourly_occupancy, occupancy_utilization
+from utils.preview import paginated_dataframe
+from utils.session_store import fetch, stash
 
 st.title("Step 3: Analysis")
+timing_sidebar()
 
-course_schedule = st.session_state.get("COURSE_SCHEDULE")
-campus_rooms    = st.session_state.get("CAMPUS_ROOMS")
+course_schedule = fetch("COURSE_SCHEDULE")
+campus_rooms    = fetch("CAMPUS_ROOMS")
 
 if course_schedule is None or campus_rooms is None:
     st.warning("⚠️ Please complete Step 2 first.")
     st.stop()
 
+# Exploded/parsed once per schedule content; widget reruns hit the cache
+meetings = get_meeting_table(course_schedule)
+# Version keys for the previews below, so page flips don't re-hash whole frames
+rooms_fp = frame_fingerprint(campus_rooms)
+view_key = f"{meetings.fingerprint}:{rooms_fp}"
+
 st.header("Room Utilization (Baseline)")
 std_hours = st.number_input("Standard scheduled hours/week (per room)", min_value=1.0, max_value=80.0, value=40.0, step=1.0)
-utilization = calculate_room_utilization(course_schedule, campus_rooms, std_hours)
-st.session_state["UTILIZATION"] = utilization
-st.dataframe(utilization)
+utilization = calculate_room_utilization(course_schedule, campus_rooms, std_hours, meetings=meetings)
+stash("UTILIZATION", utilization)
+paginated_dataframe(utilization, key="utilization", fingerprint=f"utilization:{view_key}:{std_hours}")
 
 st.header("Utilization Summary")
 summary = summarize_utilization(utilization)
-st.session_state["UTIL_SUMMARY"] = summary
-st.dataframe(summary)
+stash("UTIL_SUMMARY", summary)
+paginated_dataframe(summary, key="util_summary")
+
+st.header("Occupancy & Prime Time")
+c1, c2, c3 = st.columns(3)
+prime_days = c1.text_input("Prime-time days", value="MTWRF")
+prime_start = c2.time_input("Prime-time start", value=datetime.time(8, 0), step=1800)
+prime_end = c3.time_input("Prime-time end", value=datetime.time(17, 0), step=1800)
+# Overlapping sections count once; the grid is cached per schedule and room list
+occupancy = occupancy_utilization(
+    course_schedule, campus_rooms, std_hours,
+    prime_days=prime_days,
+    prime_start=prime_start.hour * 60 + prime_start.minute,
+    prime_end=prime_end.hour * 60 + prime_end.minute,
+    meetings=meetings,
+)
+stash("OCCUPANCY", occupancy)
+paginated_dataframe(occupancy, key="occupancy",
+                    fingerprint=f"occupancy:{view_key}:{std_hours}:{prime_days}:{prime_start}:{prime_end}")
+occ = get_occupancy(meetings)
+st.caption("Share of scheduled rooms in use, by hour")
+st.line_chart(hourly_occupancy(occ, prime_days or None))
+with st.expander("Day × hour heatmap table"):
+    heat = heatmap_table(occ).pivot(index="Hour", columns="Day", values="occupied_pct")
+    st.dataframe(heat.round(1))
 
 st.header("Conflicts")
 with st.spinner("Detecting room conflicts..."):
-    r_conf = detect_room_conflicts(course_schedule)
-    st.session_state["ROOM_CONFLICTS"] = r_conf
-st.dataframe(r_conf)
+    r_conf = detect_room_conflicts(course_schedule, meetings=meetings)
+    stash("ROOM_CONFLICTS", r_conf)
+
+# Free-room index over campus rooms; rebuilt only when the schedule or rooms change
+avail_key = (meetings.fingerprint, rooms_fp)
+if st.session_state.get("ROOM_AVAILABILITY_KEY") != avail_key:
+    st.session_state["ROOM_AVAILABILITY"] = RoomAvailability(meetings, campus_rooms)
+    st.session_state["ROOM_AVAILABILITY_KEY"] = avail_key
+availability = st.session_state["ROOM_AVAILABILITY"]
+
+if not r_conf.empty and st.checkbox("Suggest alternative rooms for each conflict"):
+    r_conf_alts = availability.suggest_alternatives(r_conf, course_schedule)
+    paginated_dataframe(r_conf_alts, key="room_conflicts_alts", fingerprint=f"alternatives:{view_key}")
+else:
+    paginated_dataframe(r_conf, key="room_conflicts", fingerprint=f"room_conflicts:{meetings.fingerprint}")
+
+with st.expander("Find a free room"):
+    f1, f2, f3, f4, f5 = st.columns(5)
+    q_days = f1.text_input("Days", value="MW")
+    q_start = f2.time_input("From", value=datetime.time(10, 0), step=900)
+    q_end = f3.time_input("To", value=datetime.time(11, 15), step=900)
+    q_type = f4.selectbox("Room type", [""] + sorted(campus_rooms["Room Type"].astype(str).unique()))
+    q_min = f5.number_input("Min stations", min_value=0, value=0, step=5)
+    # Blank dates: free for the whole term; otherwise only sections meeting in between count
+    d1, d2 = st.columns(2)
+    q_from = d1.date_input("Between dates", value=None)
+    q_to = d2.date_input("and", value=None)
+    try:
+        paginated_dataframe(availability.for_dates(q_from, q_to).free_rooms(
+            q_days, q_start.hour * 60 + q_start.minute, q_end.hour * 60 + q_end.minute,
+            room_type=q_type or None, min_stations=int(q_min),
+        ), key="free_rooms")
+    except ValueError as e:
+        st.warning(str(e))
 
 with st.spinner("Detecting instructor conflicts..."):
-    i_conf = detect_instructor_conflicts(course_schedule)
-    st.session_state["INSTR_CONFLICTS"] = i_conf
-st.dataframe(i_conf)
+    i_conf = detect_instructor_conflicts(course_schedule, meetings=meetings)
+    stash("INSTR_CONFLICTS", i_conf)
+paginated_dataframe(i_conf, key="instr_conflicts", fingerprint=f"instructor_conflicts:{meetings.fingerprint}")
+
+with st.expander("Try a section change"):
+    # What-if edits update only the touched room/instructor-day buckets
+    if st.session_state.get("CONFLICT_INDEX_KEY") != meetings.fingerprint:
+        st.session_state["CONFLICT_INDEX"] = ConflictIndex(course_schedule, meetings=meetings)
+        st.session_state["CONFLICT_INDEX_KEY"] = meetings.fingerprint
+    cidx = st.session_state["CONFLICT_INDEX"]
+    e1, e2, e3, e4, e5 = st.columns(5)
+    e_id = e1.text_input("CourseID")
+    e_loc = e2.text_input("New location (blank = keep)")
+    e_days = e3.text_input("New days (blank = keep)")
+    e_start = e4.text_input("New start (blank = keep)")
+    e_end = e5.text_input("New end (blank = keep)")
+    if st.button("Apply change") and e_id:
+        try:
+            changes = cidx.edit(e_id.strip(), location=e_loc.strip() or None, days=e_days.strip() or None,
+                                start=e_start.strip() or None, end=e_end.strip() or None)
+            st.success(f"{len(changes.added)} conflict(s) added, {len(changes.removed)} resolved.")
+            st.dataframe(changes.added, hide_index=True)
+            st.dataframe(changes.removed, hide_index=True)
+        except (KeyError, ValueError) as e:
+            st.warning(str(e))
+    st.caption(f"Room conflicts now: {cidx.counts['Location']:,} · instructor conflicts now: {cidx.counts['Instructor']:,}. "
+               "Changes here are what-ifs; edit the source schedule to keep them.")
+
+st.header("AI Summary (optional)")
+notes = st.text_area("Notes for the summary", value="", placeholder="Context for the reviewer, e.g. known renovations")
+if st.button("Summarize with Gemini"):
+    try:
+        # Sends a statistical digest, not raw rows; repeated prompts come from cache
+        st.session_state["AI_SUMMARY"] = st.write_stream(
+            stream_conflicts_summary(r_conf, i_conf, utilization, extra_notes=notes)
+        )
+    except Exception as e:
+        st.error(f"❌ Summary failed: {e}")
+elif st.session_state.get("AI_SUMMARY"):
+    st.markdown(st.session_state["AI_SUMMARY"])
 
 st.info("Proceed to **Step 4: Export**.")
@@ -1,16 +1,26 @@
 # pages/4_Export_Report.py
 import streamlit as st
+from utils.instrument import timing_sidebar
 from utils.reporting import create_full_deliverable
+from utils.session_store import fetch
+
+FORMATS = {
+    "Excel workbook (.xlsx)": ("xlsx", "Instruction_Analysis_Deliverable.xlsx",
+                               "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Zipped CSVs (.zip)": ("csv.zip", "Instruction_Analysis_Deliverable_csv.zip", "application/zip"),
+    "Zipped Parquet (.zip)": ("parquet.zip", "Instruction_Analysis_Deliverable_parquet.zip", "application/zip"),
+}
 
 st.title("Step 4: Export Final Deliverable")
+timing_sidebar()
 
-course_schedule = st.session_state.get("COURSE_SCHEDULE")
-campus_rooms    = st.session_state.get("CAMPUS_ROOMS")
-buildings       = st.session_state.get("CAMPUS_BUILDINGS")
-departments     = st.session_state.get("ACADEMIC_DEPARTMENTS")
-utilization     = st.session_state.get("UTILIZATION")
-room_conflicts  = st.session_state.get("ROOM_CONFLICTS")
-instr_conflicts = st.session_state.get("INSTR_CONFLICTS")
+course_schedule = fetch("COURSE_SCHEDULE")
+campus_rooms    = fetch("CAMPUS_ROOMS")
+buildings       = fetch("CAMPUS_BUILDINGS")
+departments     = fetch("ACADEMIC_DEPARTMENTS")
+utilization     = fetch("UTILIZATION")
+room_conflicts  = fetch("ROOM_CONFLICTS")
+instr_conflicts = fetch("INSTR_CONFLICTS")
 
 missing = [n for n,v in [
     ("Course Schedule", course_schedule),
@@ -25,13 +35,20 @@ missing = [n for n,v in [
 if missing:
     st.warning(f"⚠️ Missing from session: {', '.join(missing)}. Please complete Steps 2–3.")
 else:
-    data = create_full_deliverable(
-        course_schedule, campus_rooms, buildings, departments,
-        utilization, room_conflicts, instr_conflicts
-    )
+    label = st.radio("Format", options=list(FORMATS), horizontal=True)
+    fmt, file_name, mime = FORMATS[label]
+    try:
+        # Cached by table fingerprints, so reruns don't regenerate the file
+        data = create_full_deliverable(
+            course_schedule, campus_rooms, buildings, departments,
+            utilization, room_conflicts, instr_conflicts, fmt=fmt,
+        )
+    except ImportError as e:
+        st.error(f"❌ {e}")
+        st.stop()
     st.download_button(
-        "Download Deliverable (.xlsx)",
+        f"Download Deliverable ({label.split('(')[-1].rstrip(')')})",
         data=data,
-        file_name="Instruction_Analysis_Deliverable.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        file_name=file_name,
+        mime=mime,
     )
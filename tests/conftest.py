@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Keep caches and learned layouts out of the user's home while tests run
+_TMP = tempfile.mkdtemp(prefix="credo-tests-")
+os.environ.setdefault("CREDO_CACHE_DIR", os.path.join(_TMP, "cache"))
+os.environ.setdefault("CREDO_SESSION_DIR", os.path.join(_TMP, "sessions"))
+os.environ.setdefault("CREDO_LAYOUT_PROFILES", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import analysis
+from utils.file_handlers import load_bldg_room_lookup
+from utils.synthetic import synthetic_term
+from utils.timeparse import NO_TIME
+from utils.transformations import build_campus_rooms, build_course_schedule
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="module")
+def term():
+    sheets = synthetic_term(400, seed=5)
+    return build_course_schedule(sheets["Class Schedule"]), build_campus_rooms(load_bldg_room_lookup(sheets, "Bldg Room Lookup"))
+
+
+def _nan_keys(cs, rooms):
+    cs = cs.copy()
+    cs.loc[cs.index[::7], "Location"] = np.nan
+    cs.loc[cs.index[::9], "Instructor"] = np.nan
+    cs.loc[cs.index[::10], "Location"] = ""
+    return cs, rooms
+
+
+def _duplicate_rooms(cs, rooms):
+    rooms = pd.concat([rooms, rooms.iloc[::5]], ignore_index=True)
+    rooms.loc[rooms.index[::6], "Room Type"] = np.nan
+    return cs, rooms
+
+
+def _missing_times(cs, rooms):
+    cs = cs.copy()
+    cs.loc[cs.index[::4], ["Start Min", "End Min"]] = NO_TIME
+    cs.loc[cs.index[::6], "Days"] = ""
+    return cs, rooms
+
+
+CASES = {
+    "synthetic": lambda cs, rooms: (cs, rooms),
+    "empty": lambda cs, rooms: (cs.iloc[:0], rooms.iloc[:0]),
+    "empty_schedule": lambda cs, rooms: (cs.iloc[:0], rooms),
+    "nan_keys": _nan_keys,
+    "duplicate_rooms": _duplicate_rooms,
+    "missing_times": _missing_times,
+}
+
+
+def _assert_same(expected, got):
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), got.reset_index(drop=True),
+                                  check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_engines_agree(term, case):
+    cs, rooms = CASES[case](*term)
+    results = {}
+    for engine in analysis.ENGINES:
+        util = analysis.calculate_room_utilization(cs, rooms, engine=engine)
+        results[engine] = {
+            "room_conflicts": analysis.detect_room_conflicts(cs, engine=engine),
+            "instructor_conflicts": analysis.detect_instructor_conflicts(cs, engine=engine),
+            "utilization": util,
+            "summary": analysis.summarize_utilization(util, engine=engine),
+        }
+    for name, expected in results["pandas"].items():
+        _assert_same(expected, results["arrow"][name])
+
+
+def test_cases_exercise_the_edges(term):
+    cs, rooms = _missing_times(*term)
+    assert len(analysis.detect_room_conflicts(cs, engine="pandas")) > 0
+    cs, rooms = _duplicate_rooms(*term)
+    util = analysis.calculate_room_utilization(cs, rooms, engine="arrow")
+    assert len(util) == len(rooms)
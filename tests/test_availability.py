@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from utils.analysis import detect_room_conflicts
+from utils.availability import RoomAvailability
+from utils.meetings import build_meeting_table
+
+FIRST = ("2025-09-01", "2025-10-19")
+SECOND = ("2025-10-20", "2025-12-07")
+
+
+def _schedule(rows):
+    return pd.DataFrame(rows, columns=["CourseID", "Days", "Start Min", "End Min", "Location", "Instructor",
+                                       "Start Date", "End Date", "Actual Enrolled"])
+
+
+ROOMS = pd.DataFrame({
+    "Room ID": ["R1", "R2", "R3"], "Stations": [20, 30, 40],
+    "Room Type": "Classroom", "Room Size Category": ["A", "B", "C"],
+})
+
+# R1 is taken Monday 10-11 in the first half only; two second-half sections clash in R2
+SCHEDULE = _schedule([
+    ("A", "M", 600, 660, "R1", "X", *FIRST, 10),
+    ("B", "M", 600, 660, "R2", "Y", *SECOND, 10),
+    ("C", "M", 630, 690, "R2", "Z", *SECOND, 10),
+    ("D", "M", 600, 690, "R3", "W", "2025-09-01", "2025-12-07", 10),
+])
+
+
+def _free(index, days="M", start=600, end=660):
+    return index.free_rooms(days, start, end)["Location"].tolist()
+
+
+@pytest.fixture
+def index():
+    return RoomAvailability(build_meeting_table(SCHEDULE), ROOMS)
+
+
+def test_whole_term_counts_every_section(index):
+    assert _free(index) == []
+
+
+def test_date_window(index):
+    m = build_meeting_table(SCHEDULE)
+    assert _free(RoomAvailability(m, ROOMS, date_from=SECOND[0])) == ["R1"]
+    assert _free(index.for_dates(*SECOND)) == ["R1"]
+    assert _free(index.for_dates(*FIRST)) == ["R2"]
+    assert index.for_dates() is index
+
+
+def test_alternatives_use_section_b_dates(index):
+    conflicts = detect_room_conflicts(SCHEDULE)
+    assert len(conflicts) == 1
+    out = index.suggest_alternatives(conflicts, SCHEDULE)
+    assert out["Alternatives"].tolist() == ["R1"]
+
+
+def test_moves_carry_into_narrowed_indexes(index):
+    narrowed = index.for_dates(*SECOND)
+    assert _free(narrowed) == ["R1"]
+    # C moves out of R2 into R1
+    index.move_section(2, location="R1")
+    again = index.for_dates(*SECOND)
+    assert again is not narrowed
+    assert _free(again, start=660, end=690) == ["R2"]
+    # A doesn't meet in the second half, so moving it into R2 leaves R2 free there
+    index.move_section(0, location="R2")
+    assert _free(index.for_dates(*SECOND), start=660, end=690) == ["R2"]
+    assert _free(index.for_dates(*FIRST)) == ["R1"]
+
+
+def test_open_ended_windows(index):
+    assert _free(index.for_dates(SECOND[0])) == ["R1"]
+    assert _free(index.for_dates(None, FIRST[1])) == ["R2"]
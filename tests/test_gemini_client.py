@@ -0,0 +1,56 @@
+import pandas as pd
+
+from utils import gemini_client
+from utils.gemini_client import GeminiBackend, GeminiClient, StubBackend, conflict_digest
+
+
+class _Chunk:
+    def __init__(self, text=None):
+        self._text = text
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError("The response has no text: the candidate was blocked.")
+        return self._text
+
+
+class _Model:
+    def generate_content(self, prompt, stream=False):
+        return iter([_Chunk("Hello "), _Chunk(None), _Chunk(""), _Chunk("world")])
+
+
+def test_stream_skips_blocked_chunks():
+    backend = GeminiBackend()
+    backend._models["m"] = _Model()
+    assert list(backend.stream("prompt", "m")) == ["Hello ", "world"]
+
+
+def test_client_caches_complete_responses(tmp_path):
+    client = GeminiClient(model="m", backend=StubBackend(), cache_dir=tmp_path)
+    first = client.generate("Digest:\na\nNotes:\n")
+    assert client.cached("Digest:\na\nNotes:\n") == first
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def _conflicts(n):
+    return pd.DataFrame({
+        "Location": [f"Building {i:04d} with a long name, room {i}" for i in range(n)],
+        "Day": ["M"] * n,
+        "Instructor": [f"Instructor {i:05d}" for i in range(n)],
+    })
+
+
+def test_digest_trims_at_line_boundary():
+    rc = _conflicts(200)
+    full = conflict_digest(rc, rc, None, token_budget=10**6)
+    for budget in (5, 20, 33, 50):
+        text = conflict_digest(rc, rc, None, token_budget=budget)
+        assert 0 < len(text) <= budget * gemini_client.CHARS_PER_TOKEN
+        # Only whole lines of the untrimmed digest
+        assert set(text.splitlines()) <= set(full.splitlines())
+
+
+def test_digest_under_budget_is_untouched():
+    rc = _conflicts(3)
+    assert conflict_digest(rc, None, None) == conflict_digest(rc, None, None, token_budget=10**6)
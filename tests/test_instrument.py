@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from utils import instrument
+from utils.instrument import SessionOptions, bind_session, instrumented, profile_next, records, set_run_id
+
+
+@instrumented("test", name="instrument_probe")
+def _probe(x):
+    return x + 1
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    instrument.configure(enabled=False)
+    instrument.clear()
+    yield
+    bind_session(None)
+    instrument._CONFIG.profile_target = None
+    instrument.clear()
+
+
+def _in_thread(fn):
+    t = threading.Thread(target=fn)
+    t.start()
+    t.join()
+
+
+def _session_call(run_id, options, arm=None):
+    def body():
+        set_run_id(run_id)
+        bind_session(options)
+        if arm:
+            profile_next(arm)
+        _probe(1)
+    return body
+
+
+def test_sessions_toggle_recording_independently():
+    on, off = SessionOptions(enabled=True), SessionOptions(enabled=False)
+    _in_thread(_session_call("a", on))
+    _in_thread(_session_call("b", off))
+    _in_thread(_session_call("c", None))
+    assert [r["run_id"] for r in records()] == ["a"]
+
+
+def test_session_off_overrides_server_default():
+    instrument.configure(enabled=True)
+    _in_thread(_session_call("a", SessionOptions(enabled=False)))
+    _in_thread(_session_call("b", SessionOptions()))
+    assert [r["run_id"] for r in records()] == ["b"]
+
+
+def test_profiler_stays_in_its_session():
+    a, b = SessionOptions(enabled=True), SessionOptions(enabled=True)
+
+    def arm_only():
+        bind_session(a)
+        profile_next("instrument_probe")
+
+    _in_thread(arm_only)
+    _in_thread(_session_call("b", b))
+    assert a.profile_target == "instrument_probe"
+    _in_thread(_session_call("a", a))
+    assert a.profile_target is None
+    by_run = {r["run_id"]: r for r in records()}
+    assert "profile" in by_run["a"] and "profile" not in by_run["b"]
+
+
+def test_tracemalloc_peaks_are_measured_by_one_thread_at_a_time():
+    instrument.configure(enabled=True, memory="tracemalloc")
+    inside, release = threading.Event(), threading.Event()
+
+    @instrumented("test", name="instrument_holder")
+    def holder():
+        block = bytearray(8 * 2**20)
+        inside.set()
+        release.wait(5)
+        return len(block)
+
+    @instrumented("test", name="instrument_allocator")
+    def allocator():
+        return len(bytearray(2**20))
+
+    try:
+        t = threading.Thread(target=holder)
+        t.start()
+        inside.wait(5)
+        allocator()
+        release.set()
+        t.join()
+        allocator()
+    finally:
+        instrument.configure(enabled=False, memory="rss")
+        instrument.tracemalloc.stop()
+    got = [(r["name"], r["peak_mb"]) for r in records()]
+    assert got[0] == ("instrument_allocator", None)
+    assert got[1][0] == "instrument_holder" and got[1][1] >= 8
+    assert got[2][0] == "instrument_allocator" and got[2][1] >= 1
+    assert instrument._TRACE_OWNER is None
+
+
+def test_rss_mode_names_its_measure():
+    instrument.configure(enabled=True, memory="rss")
+    _probe(1)
+    (rec,) = records()
+    assert "rss_hwm_growth_mb" in rec and "peak_mb" not in rec
+    assert "rss_hwm_growth_mb" in instrument.records_frame().columns
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from utils.intervals import overlap_pairs
+
+
+def _reference(group, start, end):
+    """The original nested loop: per group by start, B after A clashes while B.start < A.end."""
+    order = np.lexsort((start, group))
+    pairs = set()
+    for x, i in enumerate(order):
+        for j in order[x + 1:]:
+            if group[j] != group[i]:
+                break
+            if start[j] < end[i]:
+                pairs.add((int(i), int(j)))
+    return pairs
+
+
+def _pairs(group, start, end):
+    a, b = overlap_pairs(group, start, end)
+    return set(zip(a.tolist(), b.tolist()))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(0, 120))
+    group = rng.integers(0, 6, n)
+    # Coarse grid so touching endpoints, equal starts and zero-length intervals are common
+    start = rng.integers(0, 20, n) * 5
+    end = start + rng.integers(0, 6, n) * 5
+    a, b = overlap_pairs(group, start, end)
+    assert len(set(zip(a.tolist(), b.tolist()))) == len(a)
+    assert set(zip(a.tolist(), b.tolist())) == _reference(group, start, end)
+
+
+def test_touching_endpoints_do_not_overlap():
+    assert _pairs([0, 0], [60, 120], [120, 180]) == set()
+
+
+def test_groups_are_separate():
+    assert _pairs([0, 1], [60, 60], [120, 120]) == set()
+
+
+def test_zero_length_intervals():
+    # Inside another interval: clashes; at its end or start: doesn't
+    assert _pairs([0, 0], [60, 90], [120, 90]) == {(0, 1)}
+    assert _pairs([0, 0], [60, 120], [120, 120]) == set()
+    assert _pairs([0, 0], [60, 60], [60, 90]) == set()
+
+
+def test_order_by_group_then_start():
+    a, b = overlap_pairs([1, 0, 0, 0], [0, 30, 0, 10], [50, 60, 60, 60])
+    assert list(zip(a.tolist(), b.tolist())) == [(2, 3), (2, 1), (3, 1)]
+
+
+def test_small_inputs():
+    for n in (0, 1):
+        a, b = overlap_pairs(np.zeros(n), np.zeros(n), np.ones(n))
+        assert len(a) == len(b) == 0
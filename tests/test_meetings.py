@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import meetings
+from utils.meetings import build_meeting_table, get_meeting_table
+from utils.synthetic import synthetic_term
+from utils.transformations import build_course_schedule
+
+
+@pytest.fixture(scope="module")
+def schedule():
+    cs = build_course_schedule(synthetic_term(300, seed=3)["Class Schedule"])
+    # Blank keys and sections with no meeting days
+    cs.loc[cs.index[::11], "Location"] = ""
+    cs.loc[cs.index[::13], "Instructor"] = np.nan
+    cs.loc[cs.index[::17], "Days"] = ""
+    return cs
+
+
+def _reference(cs):
+    """One row per (section, day character) built row by row, as the old explode did."""
+    rows = []
+    for _, r in cs.iterrows():
+        loc = r["Location"] if isinstance(r["Location"], str) and r["Location"].strip() else None
+        ins = r["Instructor"] if isinstance(r["Instructor"], str) and r["Instructor"].strip() else None
+        days = list(r["Days"]) if isinstance(r["Days"], str) else []
+        for day in days or [None]:
+            rows.append((r["CourseID"], day, int(r["Start Min"]), int(r["End Min"]), loc, ins))
+    return rows
+
+
+def test_matches_row_by_row_explode(schedule):
+    got = build_meeting_table(schedule).to_frame()
+    rows = [tuple(None if v is None or (isinstance(v, float) and np.isnan(v)) else v for v in t)
+            for t in got.astype(object).itertuples(index=False)]
+    rows = [(c, d, int(s), int(e), l, i) for c, d, s, e, l, i in rows]
+    assert rows == _reference(schedule)
+
+
+def test_cache_hits_on_equal_content(schedule):
+    meetings._CACHE.clear()
+    first = get_meeting_table(schedule)
+    assert get_meeting_table(schedule.copy()) is first
+
+
+@pytest.mark.parametrize("column, value", [("Location", "ZZZ 999"), ("Start Min", 5), ("Days", "S"),
+                                           ("Start Date", "2025-10-01")])
+def test_cache_invalidated_by_changes(schedule, column, value):
+    meetings._CACHE.clear()
+    first = get_meeting_table(schedule)
+    changed = schedule.copy()
+    changed.loc[changed.index[0], column] = value
+    second = get_meeting_table(changed)
+    assert second is not first
+    assert second.fingerprint != first.fingerprint
+    frame = second.to_frame()
+    row = frame[second.section == 0].iloc[0]
+    if column == "Location":
+        assert row["Location"] == value
+    elif column == "Start Min":
+        assert row["Start Min"] == value
+    elif column == "Days":
+        assert row["Day"] == value
+    else:
+        assert second.date_start[0] == np.datetime64(value, "D").astype(np.int64)
+
+
+def test_cache_invalidated_by_dtype_change(schedule):
+    meetings._CACHE.clear()
+    first = get_meeting_table(schedule)
+    assert get_meeting_table(schedule.astype({"Course Capacity": "float64"})) is not first
+
+
+def test_cache_is_bounded(schedule):
+    meetings._CACHE.clear()
+    first = get_meeting_table(schedule)
+    for i in range(meetings._CACHE_SIZE):
+        changed = schedule.copy()
+        changed.loc[changed.index[0], "Location"] = f"X {i}"
+        get_meeting_table(changed)
+    assert len(meetings._CACHE) == meetings._CACHE_SIZE
+    assert get_meeting_table(schedule) is not first
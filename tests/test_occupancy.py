@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.meetings import build_meeting_table
+from utils.occupancy import build_occupancy, date_periods, occupancy_utilization
+
+# A 14-week term split into two 7-week halves
+TERM = ("2025-09-01", "2025-12-07")
+FIRST = ("2025-09-01", "2025-10-19")
+SECOND = ("2025-10-20", "2025-12-07")
+
+
+def _schedule(rows):
+    return pd.DataFrame(rows, columns=["CourseID", "Days", "Start Min", "End Min", "Location", "Instructor",
+                                       "Start Date", "End Date"])
+
+
+def _rooms(*ids):
+    return pd.DataFrame({"Room ID": list(ids), "Stations": 30, "Room Type": "Classroom", "Room Size Category": "B"})
+
+
+def _hours(schedule, rooms=("R1",), **kw):
+    out = occupancy_utilization(schedule, _rooms(*rooms), **kw)
+    return dict(zip(out["Location"], out["occupied_hours_per_week"]))
+
+
+def test_half_term_section_counts_half():
+    cs = _schedule([("A", "M", 600, 660, "R1", "X", *FIRST), ("B", "M", 600, 660, "R2", "Y", *TERM)])
+    assert _hours(cs, ("R1", "R2")) == pytest.approx({"R1": 0.5, "R2": 1.0})
+
+
+def test_back_to_back_halves_fill_the_slot_once():
+    cs = _schedule([("A", "M", 600, 660, "R1", "X", *FIRST), ("B", "M", 600, 660, "R1", "Y", *SECOND),
+                    ("C", "M", 630, 660, "R1", "Z", *TERM)])
+    assert _hours(cs) == pytest.approx({"R1": 1.0})
+
+
+def test_overlapping_sections_count_once():
+    cs = _schedule([("A", "MW", 600, 660, "R1", "X", *TERM), ("B", "MW", 630, 690, "R1", "Y", *TERM)])
+    assert _hours(cs) == pytest.approx({"R1": 3.0})
+    assert build_occupancy(build_meeting_table(cs), ["R1"]).grid.dtype == bool
+
+
+def test_as_of_takes_one_week():
+    cs = _schedule([("A", "M", 600, 660, "R1", "X", *FIRST), ("B", "W", 600, 720, "R1", "Y", *SECOND)])
+    assert _hours(cs, as_of="2025-09-15") == pytest.approx({"R1": 1.0})
+    assert _hours(cs, as_of="2025-11-03") == pytest.approx({"R1": 2.0})
+    assert _hours(cs, as_of="2026-01-05") == pytest.approx({"R1": 0.0})
+
+
+def test_undated_schedule_is_one_period():
+    cs = _schedule([("A", "M", 600, 660, "R1", "X", None, None)])
+    periods = date_periods(build_meeting_table(cs))
+    assert len(periods) == 1 and periods[0][1] == 1.0
+    assert _hours(cs) == pytest.approx({"R1": 1.0})
+
+
+def test_periods_cover_the_term():
+    cs = _schedule([("A", "M", 600, 660, "R1", "X", *FIRST), ("B", "M", 600, 660, "R1", "Y", "2025-10-01", "2025-11-15")])
+    periods = date_periods(build_meeting_table(cs), *TERM)
+    # Spans with no section meeting are left out
+    assert sum(w for _, w in periods) == pytest.approx((pd.Timestamp("2025-11-15") - pd.Timestamp(TERM[0])).days / 98 + 1 / 98)
+    assert all(active.any() for active, _ in periods)
+
+
+def _staggered(n, seed):
+    from utils.synthetic import synthetic_term
+    from utils.transformations import build_course_schedule
+    cs = build_course_schedule(synthetic_term(n, seed=seed)["Class Schedule"])
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-08-25") + pd.to_timedelta(rng.integers(0, 60, len(cs)), unit="D")
+    end = pd.Timestamp("2025-12-12") - pd.to_timedelta(rng.integers(0, 60, len(cs)), unit="D")
+    cs["Start Date"], cs["End Date"] = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    # Some sections outside the term window and some undated
+    cs.loc[cs.index[::23], ["Start Date", "End Date"]] = ["2026-01-10", "2026-03-01"]
+    cs.loc[cs.index[::29], ["Start Date", "End Date"]] = ""
+    return build_meeting_table(cs)
+
+
+def _per_period(m, rooms, term=(None, None)):
+    """One deduplicated grid per date_periods span, weighted and summed."""
+    from utils.occupancy import occupancy_counts
+    grid = 0.0
+    for active, weight in date_periods(m, *term):
+        grid = grid + weight * (occupancy_counts(m, rooms, active=active) > 0)
+    return grid
+
+
+@pytest.mark.parametrize("term", [(None, None), ("2025-09-01", "2025-11-30")])
+def test_one_pass_grid_matches_per_period_sum(term):
+    m = _staggered(600, seed=4)
+    assert len(date_periods(m, *term)) > 50
+    rooms = np.asarray(m.locations, dtype=object)
+    occ = build_occupancy(m, rooms, term_start=term[0], term_end=term[1])
+    assert occ.grid.dtype == np.float32
+    np.testing.assert_allclose(occ.grid, _per_period(m, rooms, term), rtol=1e-6, atol=1e-6)
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from utils import parse_cache
+from utils.parse_cache import ParseCache
+
+
+def _key(i):
+    return f"{i:064x}"
+
+
+def test_evicts_oldest_entries_over_budget(tmp_path):
+    cache = ParseCache(root=str(tmp_path), max_bytes=25_000)
+    for i in range(10):
+        cache.put_text(_key(i), "x" * 5_000)
+    assert cache.size_bytes() <= 25_000
+    assert cache.get_text(_key(9)) is not None
+    assert cache.get_text(_key(0)) is None
+
+
+def test_writes_under_budget_do_not_rescan(tmp_path, monkeypatch):
+    cache = ParseCache(root=str(tmp_path), max_bytes=10**9)
+    scans = []
+    real = ParseCache._entries
+    monkeypatch.setattr(ParseCache, "_entries", lambda self: scans.append(1) or real(self))
+    n = parse_cache.RESCAN_EVERY * 2
+    for i in range(n):
+        cache.put_text(_key(i), "x")
+    cache.put_sheet(_key(0), "Sheet1", pd.DataFrame({"a": [1, 2]}))
+    # The first write measures the root; after that only periodic rescans
+    assert len(scans) == 1 + n // parse_cache.RESCAN_EVERY
+
+
+def test_page_text_counts_against_the_budget(tmp_path):
+    cache = ParseCache(root=str(tmp_path), max_bytes=30_000)
+    cache.put_text(_key(0), "x" * 10_000)
+    for page in range(5):
+        cache.put_page_text(_key(1), page, "y" * 5_000)
+    assert cache.size_bytes() <= 30_000
+    assert cache.get_text(_key(0)) is None
+    assert cache.get_page_text(_key(1), 4) is not None
+
+
+def _write_fields(root, key, worker, n):
+    cache = ParseCache(root=root, max_bytes=10**9)
+    for i in range(n):
+        cache._update_manifest(key, bodies={f"w{worker}-{i}": "x.parquet"}, row_counts={f"w{worker}-{i}": i})
+
+
+def test_concurrent_manifest_updates_keep_every_field(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    root, key, n = str(tmp_path), _key(7), 25
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_write_fields, [root] * 4, [key] * 4, range(4), [n] * 4))
+    manifest = ParseCache(root=root).manifest(key)
+    assert len(manifest["bodies"]) == 4 * n
+    assert len(manifest["row_counts"]) == 4 * n
@@ -0,0 +1,97 @@
+import pytest
+
+from utils import pdf_extract
+from utils.parse_cache import ParseCache
+from utils.pdf_extract import iter_pdf_pages
+
+pytest.importorskip("PyPDF2")
+
+
+def _pdf(texts):
+    """Minimal PDF with one line of Helvetica text per page."""
+    n = len(texts)
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(n)) + b"] /Count %d >>" % n,
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for i, text in enumerate(texts):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                    b"/Contents %d 0 R >>" % (5 + 2 * i))
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+
+TEXTS = [f"Page number {i}" for i in range(40)]
+
+
+@pytest.fixture(scope="module")
+def pdf():
+    return _pdf(TEXTS)
+
+
+@pytest.fixture
+def pypdf_only(monkeypatch):
+    monkeypatch.setattr(pdf_extract, "_HAS_PDFMINER", False)
+
+
+def test_pages_in_order(pdf, pypdf_only):
+    got = list(iter_pdf_pages(pdf, workers=1))
+    assert [p for p, _ in got] == list(range(len(TEXTS)))
+    assert all(TEXTS[p] in text for p, text in got)
+
+
+def test_pool_matches_serial(pdf, pypdf_only, monkeypatch):
+    monkeypatch.setattr(pdf_extract, "PAGES_PER_CHUNK", 4)
+    monkeypatch.setattr(pdf_extract, "POOL_MIN_PAGES", 8)
+    assert list(iter_pdf_pages(pdf, workers=2)) == list(iter_pdf_pages(pdf, workers=1))
+
+
+def test_cached_pages_are_read_lazily(pdf, pypdf_only, tmp_path):
+    cache = ParseCache(root=str(tmp_path))
+    full = list(iter_pdf_pages(pdf, cache=cache, workers=1))
+    reads = []
+    real = cache.get_page_text
+    cache.get_page_text = lambda key, page: reads.append(page) or real(key, page)
+    pages = iter_pdf_pages(pdf, cache=cache, workers=1)
+    assert next(pages) == full[0]
+    assert reads == [0]
+    assert list(pages) == full[1:]
+
+
+def test_page_evicted_after_listing_is_extracted(pdf, pypdf_only, tmp_path):
+    cache = ParseCache(root=str(tmp_path))
+    full = list(iter_pdf_pages(pdf, cache=cache, workers=1))
+    real = cache.get_page_text
+    cache.get_page_text = lambda key, page: None if page == 3 else real(key, page)
+    assert list(iter_pdf_pages(pdf, cache=cache, workers=1)) == full
+
+
+def test_pdfminer_parses_each_chunk_once(pdf, monkeypatch):
+    class Text:
+        def __init__(self, text):
+            self.text = text
+
+        def get_text(self):
+            return self.text
+
+    calls = []
+
+    def extract_pages(fh, page_numbers):
+        calls.append(list(page_numbers))
+        return [[Text(f"p{p}\n")] for p in page_numbers]
+
+    monkeypatch.setattr(pdf_extract, "_HAS_PDFMINER", True)
+    monkeypatch.setattr(pdf_extract, "_pdfminer_extract_pages", extract_pages)
+    monkeypatch.setattr(pdf_extract, "_LTTextContainer", Text)
+    monkeypatch.setattr(pdf_extract, "PAGES_PER_CHUNK", 16)
+    got = list(iter_pdf_pages(pdf, workers=1))
+    assert got == [(p, f"p{p}\n") for p in range(len(TEXTS))]
+    assert calls == [list(range(0, 16)), list(range(16, 32)), list(range(32, 40))]
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from utils import preview
+from utils.preview import preview_order
+
+
+def _frame():
+    return pd.DataFrame({"room": ["B 2", None, "A 1", "b 3"], "n": [3, 1, 2, 4]})
+
+
+def test_filter_and_sort():
+    preview._CACHE.clear()
+    df = _frame()
+    assert preview_order(df, sort_by="n").tolist() == [1, 2, 0, 3]
+    assert preview_order(df, sort_by="room", ascending=False).tolist() == [3, 0, 2, 1]
+    assert preview_order(df, "b", filter_col="room").tolist() == [0, 3]
+
+
+def test_given_fingerprint_skips_hashing(monkeypatch):
+    preview._CACHE.clear()
+    calls = []
+    monkeypatch.setattr(preview, "frame_fingerprint", lambda df: calls.append(1) or "fp")
+    df = _frame()
+    first = preview_order(df, sort_by="n", fingerprint="stage-v1")
+    again = preview_order(df, sort_by="n", fingerprint="stage-v1")
+    assert again is first and not calls
+    preview_order(df, sort_by="n")
+    assert calls == [1]
@@ -0,0 +1,64 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import reporting
+from utils.reporting import deliverable_bytes, write_deliverable_xlsx
+
+pytest.importorskip("xlsxwriter")
+pytest.importorskip("openpyxl")
+
+
+def _frame():
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "ratio": [0.5, np.nan, 2.0],
+        "name": pd.Series(["a", None, "c"], dtype="str"),
+        "when": pd.to_datetime([pd.Timestamp("2025-08-25"), None, pd.Timestamp("2025-12-12 13:30")]),
+        "flag": [True, False, True],
+        "kind": pd.Categorical(["x", None, "x"]),
+        "count": pd.array([1, None, 3], dtype="Int64"),
+    })
+
+
+def test_xlsx_round_trip():
+    df = _frame()
+    buf = io.BytesIO()
+    write_deliverable_xlsx([("Sheet", df)], buf)
+    back = pd.read_excel(io.BytesIO(buf.getvalue()), sheet_name="Sheet")
+    assert list(back.columns) == list(df.columns)
+    assert back["id"].tolist() == [1, 2, 3]
+    assert back["ratio"].isna().tolist() == [False, True, False]
+    assert back["name"].isna().tolist() == [False, True, False]
+    assert back["when"].tolist()[0] == pd.Timestamp("2025-08-25")
+    assert back["when"].tolist()[2] == pd.Timestamp("2025-12-12 13:30")
+    assert pd.isna(back["when"].tolist()[1])
+    assert back["flag"].tolist() == [True, False, True]
+    assert back["kind"].isna().tolist() == [False, True, False]
+    assert back["count"].isna().tolist() == [False, True, False]
+
+
+def test_dates_written_once_with_date_format():
+    import openpyxl
+    buf = io.BytesIO()
+    write_deliverable_xlsx([("Sheet", _frame())], buf)
+    ws = openpyxl.load_workbook(io.BytesIO(buf.getvalue()))["Sheet"]
+    cell = ws.cell(row=2, column=4)
+    assert cell.is_date and cell.number_format == "yyyy-mm-dd hh:mm:ss"
+
+
+def test_cache_is_bounded_by_bytes(monkeypatch):
+    reporting._CACHE.clear()
+    first = deliverable_bytes([("Sheet", _frame())], "csv.zip")
+    monkeypatch.setattr(reporting, "_CACHE_MAX_BYTES", len(first) + 10)
+    other = _frame().assign(id=[4, 5, 6])
+    deliverable_bytes([("Sheet", other)], "csv.zip")
+    assert len(reporting._CACHE) == 1
+    assert sum(len(v) for v in reporting._CACHE.values()) <= reporting._CACHE_MAX_BYTES
+    # Too large to cache at all
+    monkeypatch.setattr(reporting, "_CACHE_MAX_BYTES", 10)
+    reporting._CACHE.clear()
+    deliverable_bytes([("Sheet", other)], "csv.zip")
+    assert not reporting._CACHE
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.file_handlers import DEFAULT_SIZE_BINS, categorize_room_size
+
+
+def _size_cat(seats, asf):
+    """The per-row rules load_bldg_room_lookup applied before binning was vectorized."""
+    if seats > 0:
+        for bound, label in zip((15, 25, 35, 49, 75), "ABCDE"):
+            if seats <= bound:
+                return label
+        return "F"
+    asf = float(asf or 0)
+    for bound, label in zip((300, 500, 700, 900, 1300), "ABCDE"):
+        if asf <= bound:
+            return label
+    return "F"
+
+
+def _around(breaks):
+    return sorted({v for b in breaks for v in (b - 1, b, b + 1)})
+
+
+def test_matches_the_old_rules_at_every_breakpoint():
+    seats = _around(DEFAULT_SIZE_BINS["stations"]) + [1, 500]
+    areas = _around(DEFAULT_SIZE_BINS["asf"]) + [0, 299.5, 1300.5, 5000, np.nan]
+    stations = seats + [0] * len(areas) + [-3] * len(areas)
+    asf = [1000.0] * len(seats) + areas + areas
+    got = categorize_room_size(pd.Series(stations), pd.Series(asf))
+    assert list(got) == [_size_cat(s, a) for s, a in zip(stations, asf)]
+
+
+def test_nan_asf_without_stations_is_largest():
+    got = categorize_room_size([0, np.nan], [np.nan, np.nan])
+    assert list(got) == ["F", "F"]
+
+
+def test_custom_bins():
+    bins = {"stations": (20, 60), "asf": (400, 1000), "labels": ("S", "M", "L")}
+    got = categorize_room_size([20, 21, 61, 0, 0], [0, 0, 0, 400, 1001], bins)
+    assert list(got) == ["S", "M", "L", "S", "L"]
+
+
+@pytest.mark.parametrize("bins", [
+    {"labels": ("A", "B")},
+    {"stations": (10, 20, 30, 40, 50, 60)},
+    {"asf": (300, 300, 700, 900, 1300)},
+    {"stations": (15, 25, 20, 49, 75)},
+])
+def test_rejects_bad_bins(bins):
+    with pytest.raises(ValueError):
+        categorize_room_size([10], [100], bins)
@@ -0,0 +1,69 @@
+import importlib
+
+import pandas as pd
+
+from utils import parse_cache, session_store
+from utils.parse_cache import ParseCache
+from utils.session_store import SessionStore
+
+
+def _key(i):
+    return f"{i:064x}"
+
+
+def test_default_root_is_outside_the_parse_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("CREDO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("CREDO_SESSION_DIR")
+    try:
+        importlib.reload(parse_cache)
+        importlib.reload(session_store)
+        assert session_store.DEFAULT_SESSION_DIR == str(tmp_path / "cache") + "-sessions"
+    finally:
+        monkeypatch.undo()
+        importlib.reload(parse_cache)
+        importlib.reload(session_store)
+
+
+def test_parse_cache_eviction_leaves_session_frames(tmp_path):
+    # A session root nested in the cache root: the shard filter alone must protect it
+    store = SessionStore(root=str(tmp_path / "sessions"))
+    frame = pd.DataFrame({"Location": ["A 101", "B 202"], "Stations": [30, 40]})
+    handle = store.put("0a" * 16, "CAMPUS_ROOMS", frame)
+
+    cache = ParseCache(root=str(tmp_path), max_bytes=12_000)
+    for i in range(6):
+        cache.put_text(_key(i), "x" * 5_000)
+    cache.evict()
+    assert cache.get_text(_key(0)) is None
+
+    fresh = SessionStore(root=str(tmp_path / "sessions"))
+    pd.testing.assert_frame_equal(fresh.load(handle), frame)
+
+
+def _frame(n=2_000):
+    return pd.DataFrame({"Location": [f"Room {i:05d}" for i in range(n)], "Stations": range(n)})
+
+
+def test_memo_counts_object_bytes(tmp_path):
+    # Mixed-type object column: goes to pickle and comes back as Python objects
+    frame = pd.DataFrame({"Location": [f"Room {i:05d}" if i % 7 else i for i in range(2_000)]}, dtype=object)
+    shallow = int(frame.memory_usage(deep=False).sum())
+    assert int(frame.memory_usage(deep=True).sum()) > shallow * 4
+    store = SessionStore(root=str(tmp_path), memo_bytes=shallow * 2)
+    handle = store.put("s1", "rooms", frame)
+    assert handle.path.endswith(".pkl")
+    store.load(handle)
+    # Fits by the shallow estimate, not once the objects are counted
+    assert len(store._memo) == 0
+
+
+def test_mutating_a_loaded_frame_leaves_later_loads_intact(tmp_path):
+    frame = _frame(50)
+    store = SessionStore(root=str(tmp_path))
+    handle = store.put("s1", "rooms", frame)
+    first = store.load(handle)
+    first.loc[0, "Location"] = "changed"
+    first["Stations"] += 1
+    first["extra"] = 1
+    pd.testing.assert_frame_equal(store.load(handle), frame)
+    assert store.handle_for(first) == handle
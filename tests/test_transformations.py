@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from utils import transformations
+from utils.synthetic import synthetic_term
+from utils.transformations import has_course_identifier, merge_course_schedules
+
+
+@pytest.fixture(scope="module")
+def schedule():
+    return synthetic_term(200, seed=2)["Class Schedule"]
+
+
+def test_skips_sheets_without_a_course_identifier(schedule):
+    rooms = pd.DataFrame({"Rooms": ["A 101", "B 202"], "Days": ["MW", "TR"]})
+    assert not has_course_identifier(rooms.columns)
+    assert has_course_identifier(schedule.columns)
+    out = merge_course_schedules([schedule, rooms], workers=1)
+    assert len(out) == len(schedule)
+
+
+def test_other_key_errors_propagate(schedule, monkeypatch):
+    def broken(df_raw, compact=False):
+        raise KeyError("Instructor")
+    monkeypatch.setattr(transformations, "build_course_schedule", broken)
+    with pytest.raises(KeyError, match="Instructor"):
+        merge_course_schedules([schedule, schedule], workers=2)
+
+
+def test_no_sheet_with_a_course_identifier():
+    with pytest.raises(KeyError, match="course identifier"):
+        merge_course_schedules([pd.DataFrame({"Days": ["MW"], "Start Time": ["9:00"]})])
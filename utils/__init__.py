@@ -2,23 +2,34 @@
 
 # File handlers
 from .file_handlers import (
+    LazyWorkbook,
     load_excel,
     load_pdf_text,
     analyze_excel_structure,
     detect_bldg_lookup_sheet,
     guess_bldg_column_map,
     load_bldg_room_lookup,
+    categorize_room_size,
     merge_class_schedule,
 )
 
+# PDFs
+from .pdf_extract import (
+    iter_pdf_pages,
+    extract_schedule_tables,
+)
+
 # Transformations
 from .transformations import (
     build_course_schedule,
+    merge_course_schedules,
     build_campus_rooms,
     build_campus_buildings,
     build_academic_departments,   # <-- exact name
     build_rooms_inventory,
     build_course_instructors,
+    resolve_schedule_columns,
+    schedule_source_columns,
 )
 
 # Analysis
@@ -27,6 +38,7 @@ from .analysis import (
     summarize_utilization,
     detect_room_conflicts,
     detect_instructor_conflicts,
+    set_engine,
 )
 
 # Reporting
@@ -1,116 +1,169 @@
 # utils/analysis.py
 from __future__ import annotations
+import os
+from typing import Optional, Tuple
+import numpy as np
 import pandas as pd
 
-def _explode_by_days(df: pd.DataFrame) -> pd.DataFrame:
-    if "Days" not in df.columns:
-        return df.copy()
-    d = df.copy()
-    d["Days"] = d["Days"].fillna("").astype(str)
-    rows = []
-    for _, r in d.iterrows():
-        days = list(str(r["Days"]))
-        if not days:
-            rows.append(r)
-            continue
-        for dd in days:
-            r2 = r.copy()
-            r2["Day"] = dd
-            rows.append(r2)
-    return pd.DataFrame(rows)
-
-def _parse_times(df: pd.DataFrame) -> pd.DataFrame:
-    d = df.copy()
-    d["Start_dt"] = pd.to_datetime(d["Start Time"], errors="coerce")
-    d["End_dt"]   = pd.to_datetime(d["End Time"], errors="coerce")
-    d["duration_hours"] = (d["End_dt"] - d["Start_dt"]).dt.total_seconds() / 3600.0
-    d["duration_hours"] = d["duration_hours"].clip(lower=0).fillna(0)
-    return d
-
-def detect_room_conflicts(course_df: pd.DataFrame) -> pd.DataFrame:
-    if course_df is None or course_df.empty:
-        return pd.DataFrame(columns=["Location","Day","CourseID_A","CourseID_B","Start_A","End_A","Start_B","End_B"])
-    d = _explode_by_days(course_df)
-    d = _parse_times(d)
-    d = d[d["Location"].astype(str).str.strip() != ""].copy()
-    d = d.dropna(subset=["Start_dt","End_dt"])
-    if d.empty:
-        return pd.DataFrame(columns=["Location","Day","CourseID_A","CourseID_B","Start_A","End_A","Start_B","End_B"])
-
-    out_rows = []
-    for (loc, day), g in d.groupby(["Location","Day"]):
-        g = g.sort_values("Start_dt")
-        arr = g[["CourseID","Start_dt","End_dt"]].values
-        for i in range(len(arr)):
-            A_id, A_s, A_e = arr[i]
-            for j in range(i+1, len(arr)):
-                B_id, B_s, B_e = arr[j]
-                if B_s < A_e:
-                    out_rows.append({
-                        "Location": loc, "Day": day,
-                        "CourseID_A": A_id, "CourseID_B": B_id,
-                        "Start_A": A_s, "End_A": A_e,
-                        "Start_B": B_s, "End_B": B_e,
-                    })
-                else:
-                    break
-    return pd.DataFrame(out_rows)
-
-def detect_instructor_conflicts(course_df: pd.DataFrame) -> pd.DataFrame:
+from . import arrow_compute as _arrow
+from .instrument import instrumented
+from .intervals import overlap_pairs
+from .meetings import OPEN_END, OPEN_START, MeetingTable, get_meeting_table
+from .timeparse import parse_date_column
+from .timeparse import minutes_to_hhmm
+
+# "pandas" (default) or "arrow" (pyarrow.compute group-bys and joins; see utils.arrow_compute)
+ENGINES = ("pandas", "arrow")
+DEFAULT_ENGINE = os.getenv("CREDO_ANALYSIS_ENGINE", "pandas").strip().lower() or "pandas"
+
+def set_engine(name: str) -> None:
+    """Engine used by the analysis functions when none is passed."""
+    global DEFAULT_ENGINE
+    DEFAULT_ENGINE = _engine(name)
+
+def _engine(engine: Optional[str]) -> str:
+    name = (engine or DEFAULT_ENGINE).strip().lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown analysis engine {name!r}; expected one of {ENGINES}")
+    if name == "arrow" and not _arrow._HAS_PYARROW:
+        raise ValueError("The arrow analysis engine needs pyarrow installed")
+    return name
+
+def _meetings_for(course_df: Optional[pd.DataFrame], meetings: Optional[MeetingTable]) -> Optional[MeetingTable]:
+    if meetings is not None:
+        return meetings
     if course_df is None or course_df.empty:
-        return pd.DataFrame(columns=["Instructor","Day","CourseID_A","CourseID_B","Start_A","End_A","Start_B","End_B"])
-    d = _explode_by_days(course_df)
-    d = _parse_times(d)
-    d = d[d["Instructor"].astype(str).str.strip() != ""].copy()
-    d = d.dropna(subset=["Start_dt","End_dt"])
-    if d.empty:
-        return pd.DataFrame(columns=["Instructor","Day","CourseID_A","CourseID_B","Start_A","End_A","Start_B","End_B"])
-
-    out_rows = []
-    for (inst, day), g in d.groupby(["Instructor","Day"]):
-        g = g.sort_values("Start_dt")
-        arr = g[["CourseID","Start_dt","End_dt"]].values
-        for i in range(len(arr)):
-            A_id, A_s, A_e = arr[i]
-            for j in range(i+1, len(arr)):
-                B_id, B_s, B_e = arr[j]
-                if B_s < A_e:
-                    out_rows.append({
-                        "Instructor": inst, "Day": day,
-                        "CourseID_A": A_id, "CourseID_B": B_id,
-                        "Start_A": A_s, "End_A": A_e,
-                        "Start_B": B_s, "End_B": B_e,
-                    })
-                else:
-                    break
-    return pd.DataFrame(out_rows)
-
-def _expand_for_utilization(df: pd.DataFrame) -> pd.DataFrame:
-    d = _explode_by_days(df)
-    d = _parse_times(d)
-    d["hours"] = d["duration_hours"].fillna(0)
-    return d
-
-def calculate_room_utilization(course_df: pd.DataFrame, campus_rooms_df: pd.DataFrame, standard_hours_per_week: float = 40.0) -> pd.DataFrame:
+        return None
+    return get_meeting_table(course_df)
+
+def _detect_conflicts(m: Optional[MeetingTable], key: str, engine: Optional[str] = None) -> pd.DataFrame:
+    cols = [key, "Day", "CourseID_A", "CourseID_B", "Start_A", "End_A", "Start_B", "End_B"]
+    engine = _engine(engine)
+    if m is None or len(m) == 0:
+        return pd.DataFrame(columns=cols)
+    codes, labels = (m.location, m.locations) if key == "Location" else (m.instructor, m.instructors)
+    keep = np.flatnonzero((codes >= 0) & (m.day >= 0) & m.has_time)
+    if not len(keep):
+        return pd.DataFrame(columns=cols)
+
+    grp = codes[keep].astype(np.int64) * len(m.day_labels) + m.day[keep]
+    start = m.start[keep].astype(np.int64)
+    end = m.end[keep].astype(np.int64)
+    ia, ib = overlap_pairs(grp, start, end)
+    # Same weekly slot only clashes if the date ranges overlap too
+    same_dates = m.dates_overlap(keep[ia], keep[ib])
+    ia, ib = ia[same_dates], ib[same_dates]
+    if engine == "arrow":
+        return _arrow.conflict_frame(m, key, cols, keep, ia, ib)
+
+    ids = m.course_ids[m.section[keep]]
+    return pd.DataFrame({
+        key: labels[codes[keep][ia]],
+        "Day": m.day_labels[m.day[keep][ia]],
+        "CourseID_A": ids[ia], "CourseID_B": ids[ib],
+        "Start_A": minutes_to_hhmm(start[ia]), "End_A": minutes_to_hhmm(end[ia]),
+        "Start_B": minutes_to_hhmm(start[ib]), "End_B": minutes_to_hhmm(end[ib]),
+    }, columns=cols)
+
+@instrumented("analysis")
+def detect_room_conflicts(course_df: pd.DataFrame, meetings: Optional[MeetingTable] = None,
+                          engine: Optional[str] = None) -> pd.DataFrame:
+    return _detect_conflicts(_meetings_for(course_df, meetings), "Location", engine)
+
+@instrumented("analysis")
+def detect_instructor_conflicts(course_df: pd.DataFrame, meetings: Optional[MeetingTable] = None,
+                                engine: Optional[str] = None) -> pd.DataFrame:
+    return _detect_conflicts(_meetings_for(course_df, meetings), "Instructor", engine)
+
+def _day_number(value) -> Optional[int]:
+    if value is None:
+        return None
+    d = parse_date_column(pd.Series([value], dtype=object))[0]
+    if np.isnat(d):
+        raise ValueError(f"Unrecognized date: {value!r}")
+    return int(d.astype(np.int64))
+
+def term_bounds(m: MeetingTable, term_start=None, term_end=None) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Term as inclusive int days since 1970-01-01: the given dates, else the
+    earliest start and latest end date in the schedule. (None, None) when
+    either end is unknown or the term is empty.
+    """
+    ts, te = _day_number(term_start), _day_number(term_end)
+    dated_s, dated_e = m.date_start != OPEN_START, m.date_end != OPEN_END
+    if ts is None:
+        ts = int(m.date_start[dated_s].min()) if dated_s.any() else None
+    if te is None:
+        te = int(m.date_end[dated_e].max()) if dated_e.any() else None
+    if ts is None or te is None or te < ts:
+        return None, None
+    return ts, te
+
+def term_weights(m: MeetingTable, term_start=None, term_end=None) -> np.ndarray:
+    """
+    Share of the term's weeks each meeting's section meets: weeks of its
+    date range inside the term over the term's weeks. The term defaults to
+    the earliest start and latest end date in the schedule; sections with
+    no dates (or a schedule with none) count for the full term.
+    """
+    weights = np.ones(len(m), dtype=float)
+    ts, te = term_bounds(m, term_start, term_end)
+    if ts is None:
+        return weights
+    term_weeks = -(-(te - ts + 1) // 7)
+    lo = np.maximum(m.date_start.astype(np.int64), ts)
+    hi = np.minimum(m.date_end.astype(np.int64), te)
+    weeks = np.where(hi >= lo, -(-(hi - lo + 1) // 7), 0)
+    return weeks / term_weeks
+
+def _scheduled_hours(m: MeetingTable, weights: Optional[np.ndarray] = None) -> pd.DataFrame:
+    ok = m.location >= 0
+    hours = m.hours if weights is None else m.hours * weights
+    hours = np.bincount(m.location[ok], weights=hours[ok], minlength=len(m.locations))
+    return pd.DataFrame({"Location": m.locations, "scheduled_hours_per_week": hours})
+
+@instrumented("analysis")
+def calculate_room_utilization(
+    course_df: pd.DataFrame,
+    campus_rooms_df: pd.DataFrame,
+    standard_hours_per_week: float = 40.0,
+    meetings: Optional[MeetingTable] = None,
+    term_start=None,
+    term_end=None,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Scheduled hours per week and % of `standard_hours_per_week` per campus
+    room. Each section's weekly hours are weighted by the share of term
+    weeks it meets (see term_weights), so half-term sections count half.
+    """
+    engine = _engine(engine)
     if campus_rooms_df is None or campus_rooms_df.empty:
         return pd.DataFrame(columns=["Location","Stations","Room Type","Room Size Category","scheduled_hours_per_week","utilization_pct"])
-    if course_df is None or course_df.empty:
+    m = _meetings_for(course_df, meetings)
+    if m is None:
         base = campus_rooms_df.copy().rename(columns={"Room ID":"Location"})
         base["scheduled_hours_per_week"] = 0.0
         base["utilization_pct"] = 0.0
         return base[["Location","Stations","Room Type","Room Size Category","scheduled_hours_per_week","utilization_pct"]]
 
-    exp = _expand_for_utilization(course_df)
-    sched = exp.groupby("Location", as_index=False)["hours"].sum().rename(columns={"hours":"scheduled_hours_per_week"})
+    weights = term_weights(m, term_start, term_end)
     base = campus_rooms_df[["Room ID","Stations","Room Type","Room Size Category"]].copy().rename(columns={"Room ID":"Location"})
+    if engine == "arrow":
+        return _arrow.room_utilization(m, m.hours * weights, base, standard_hours_per_week)
+    sched = _scheduled_hours(m, weights)
     out = base.merge(sched, on="Location", how="left")
     out["scheduled_hours_per_week"] = out["scheduled_hours_per_week"].fillna(0.0)
     out["utilization_pct"] = (out["scheduled_hours_per_week"] / float(max(standard_hours_per_week, 0.001))) * 100.0
     return out
 
-def summarize_utilization(util_df: pd.DataFrame) -> pd.DataFrame:
+@instrumented("analysis")
+def summarize_utilization(util_df: pd.DataFrame, engine: Optional[str] = None) -> pd.DataFrame:
+    engine = _engine(engine)
     if util_df is None or util_df.empty:
         return pd.DataFrame(columns=["Room Type","Room Size Category","Rooms","Avg Util %"])
+    if engine == "arrow":
+        return _arrow.utilization_summary(util_df)
     g = util_df.groupby(["Room Type","Room Size Category"], as_index=False).agg(
         Rooms=("Location","nunique"),
         Avg_Util=("utilization_pct","mean"),
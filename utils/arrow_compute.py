@@ -0,0 +1,90 @@
+# utils/arrow_compute.py
+"""
+pyarrow.compute implementations behind the "arrow" analysis engine.
+
+Same inputs and outputs as the pandas paths in utils.analysis (which picks
+between them): hash group-bys and joins run on Arrow's multithreaded
+kernels, and string columns are gathered as Arrow arrays instead of
+through object ndarrays. Interval overlap has no Arrow kernel, so conflict
+pairs still come from the shared sort-based sweep in utils.intervals.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from .meetings import MeetingTable
+from .timeparse import _HHMM
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    _HAS_PYARROW = True
+except Exception:
+    pa = pc = None
+    _HAS_PYARROW = False
+
+_ROW = "__row"
+_hhmm = None
+
+
+def _strings(values: np.ndarray) -> "pa.Array":
+    return pa.array(values, type=pa.string(), from_pandas=True)
+
+def _minute_labels(minutes: np.ndarray) -> "pa.Array":
+    global _hhmm
+    if _hhmm is None:
+        _hhmm = _strings(_HHMM)
+    m = np.asarray(minutes, dtype=np.int64)
+    return _hhmm.take(np.where((m >= 0) & (m < 24 * 60), m, len(_HHMM) - 1))
+
+# ------------------------------ Conflicts ------------------------------
+
+def conflict_frame(m: MeetingTable, key: str, cols, keep: np.ndarray, ia: np.ndarray, ib: np.ndarray) -> pd.DataFrame:
+    """Conflict rows for pairs (keep[ia], keep[ib]) of meeting positions, labels taken in Arrow."""
+    codes, labels = (m.location, m.locations) if key == "Location" else (m.instructor, m.instructors)
+    a, b = keep[ia], keep[ib]
+    ids = _strings(m.course_ids)
+    table = pa.table({
+        key: _strings(labels).take(codes[a]),
+        "Day": _strings(m.day_labels).take(m.day[a]),
+        "CourseID_A": ids.take(m.section[a]), "CourseID_B": ids.take(m.section[b]),
+        "Start_A": _minute_labels(m.start[a]), "End_A": _minute_labels(m.end[a]),
+        "Start_B": _minute_labels(m.start[b]), "End_B": _minute_labels(m.end[b]),
+    })
+    return table.to_pandas()[cols]
+
+# ------------------------------ Utilization ------------------------------
+
+def room_utilization(m: MeetingTable, hours: np.ndarray, rooms: pd.DataFrame, standard_hours_per_week: float) -> pd.DataFrame:
+    """
+    Hash-aggregate weekly hours per location code, then left-join onto
+    `rooms` (Location, Stations, Room Type, Room Size Category) keeping its
+    row order, as DataFrame.merge(how="left") does.
+    """
+    ok = m.location >= 0
+    per_code = pa.table({"code": m.location[ok], "hours": hours[ok]}).group_by("code").aggregate([("hours", "sum")])
+    sched = pa.table({
+        "Location": _strings(m.locations).take(per_code["code"]),
+        "scheduled_hours_per_week": per_code["hours_sum"],
+    })
+    base = pa.Table.from_pandas(rooms, preserve_index=False)
+    base = base.set_column(0, "Location", base["Location"].cast(pa.string()))
+    base = base.append_column(_ROW, pa.array(np.arange(len(rooms), dtype=np.int64)))
+    out = base.join(sched, "Location", join_type="left outer").sort_by(_ROW).drop_columns([_ROW])
+    hrs = pc.fill_null(out["scheduled_hours_per_week"], 0.0)
+    out = out.set_column(out.schema.get_field_index("scheduled_hours_per_week"), "scheduled_hours_per_week", hrs)
+    out = out.append_column("utilization_pct", pc.multiply(pc.divide(hrs, float(max(standard_hours_per_week, 0.001))), 100.0))
+    return out.to_pandas()[list(rooms.columns) + ["scheduled_hours_per_week", "utilization_pct"]]
+
+def utilization_summary(util_df: pd.DataFrame) -> pd.DataFrame:
+    """Distinct rooms and mean utilization per (Room Type, Room Size Category), keys sorted, null keys dropped."""
+    keys = ["Room Type", "Room Size Category"]
+    table = pa.Table.from_pandas(util_df[keys + ["Location", "utilization_pct"]], preserve_index=False)
+    table = table.filter(pc.and_(pc.is_valid(table[keys[0]]), pc.is_valid(table[keys[1]])))
+    g = table.group_by(keys).aggregate([("Location", "count_distinct"), ("utilization_pct", "mean")])
+    g = g.sort_by([(k, "ascending") for k in keys]).to_pandas()
+    out = g[keys].copy()
+    out["Rooms"] = g["Location_count_distinct"].astype(np.int64)
+    # Round on the pandas side so halves break the same way as the pandas engine
+    out["Avg Util %"] = g["utilization_pct_mean"].round(1)
+    return out
@@ -0,0 +1,344 @@
+# utils/availability.py
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from .analysis import _day_number
+from .meetings import OPEN_END, OPEN_START, MeetingTable, get_meeting_table
+from .occupancy import SLOT_MINUTES, Clock, _minutes, meeting_slots, meets_on, occupancy_counts
+
+# Rooms x queries evaluated per block in batch lookups
+BATCH_BLOCK_CELLS = 4_000_000
+
+Meeting = Tuple[int, int, int, int]   # (room row, day, first slot, end slot)
+
+
+def _clock_minutes(values) -> np.ndarray:
+    """Minutes since midnight per value (-1 when unparseable), parsed once per distinct value."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    mins = []
+    for u in uniques:
+        try:
+            mins.append(_minutes(u))
+        except ValueError:
+            mins.append(-1)
+    return np.append(np.array(mins, dtype=np.int64), -1)[codes]
+
+
+class RoomAvailability:
+    """
+    Free-room index over campus rooms and a schedule's meetings.
+
+    Keeps per-(room, day) meeting counts per time slot plus their running
+    prefix sum of busy slots, so "is room r free on day d over [t1, t2)"
+    is two array reads and a query over every room is O(rooms). Moving a
+    section touches only the (room, day) rows it leaves and enters.
+
+    Only sections whose date range shares a date with [date_from, date_to]
+    make a room busy; by default any section in the schedule does, so a
+    room is free when it is free for the whole term. for_dates() gives the
+    index for a narrower window, e.g. a half-term section's dates.
+    """
+
+    def __init__(self, meetings: MeetingTable, campus_rooms_df: pd.DataFrame, slot_minutes: int = SLOT_MINUTES,
+                 date_from=None, date_to=None):
+        rooms = campus_rooms_df.drop_duplicates("Room ID")
+        # Rooms are held in best-fit order (fewest stations first)
+        stations = pd.to_numeric(rooms["Stations"], errors="coerce").fillna(0)
+        rooms = rooms.iloc[np.argsort(stations.to_numpy(), kind="stable")]
+        self.rooms = rooms["Room ID"].to_numpy(dtype=object)
+        self.stations = pd.to_numeric(rooms["Stations"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+        self.room_types = rooms["Room Type"].astype(str).to_numpy(dtype=object)
+        self.size_categories = rooms["Room Size Category"].to_numpy(dtype=object) \
+            if "Room Size Category" in rooms.columns else np.full(len(rooms), "", dtype=object)
+        self.slot_minutes = slot_minutes
+        self.day_labels = meetings.day_labels
+        self.course_ids = meetings.course_ids
+        self._row_of = {r: i for i, r in enumerate(self.rooms)}
+        self._day_of = {d: i for i, d in enumerate(self.day_labels)}
+        self._source = (meetings, campus_rooms_df)
+        lo, hi = _day_number(date_from), _day_number(date_to)
+        self.dates = (OPEN_START if lo is None else lo, OPEN_END if hi is None else hi)
+        # Each section's date range, by schedule row position
+        self._sec_dates = np.tile(np.array([OPEN_START, OPEN_END], dtype=np.int64), (len(meetings.course_ids), 1))
+        self._sec_dates[meetings.section, 0] = meetings.date_start
+        self._sec_dates[meetings.section, 1] = meetings.date_end
+        self._narrowed: Dict[Tuple[int, int], "RoomAvailability"] = {}
+        active = meets_on(meetings, *self.dates)
+
+        self.counts = occupancy_counts(meetings, self.rooms, slot_minutes, active)
+        # days x slot boundaries x rooms, so one boundary across all rooms is contiguous
+        n_rooms, n_days, n_slots = self.counts.shape
+        self.busy_prefix = np.zeros((n_days, n_slots + 1, n_rooms), dtype=np.int16)
+        np.cumsum((self.counts > 0).transpose(1, 2, 0), axis=1, out=self.busy_prefix[:, 1:, :])
+
+        # Each section's meetings, for moves
+        idx, row, day, s0, s1 = meeting_slots(meetings, self.rooms, slot_minutes, active)
+        self._section = meetings.section[idx]
+        self._meetings = np.stack([row, day, s0, s1], axis=1) if len(idx) else np.empty((0, 4), dtype=np.int64)
+        self._moved: Dict[int, List[Meeting]] = {}
+
+    @classmethod
+    def from_schedule(cls, course_df: pd.DataFrame, campus_rooms_df: pd.DataFrame,
+                      meetings: Optional[MeetingTable] = None, slot_minutes: int = SLOT_MINUTES) -> "RoomAvailability":
+        return cls(meetings if meetings is not None else get_meeting_table(course_df), campus_rooms_df, slot_minutes)
+
+    def _meets_in_window(self, section: int) -> bool:
+        lo, hi = self._sec_dates[section]
+        return bool(lo <= self.dates[1] and hi >= self.dates[0])
+
+    def for_dates(self, date_from=None, date_to=None) -> "RoomAvailability":
+        """
+        Index over the same rooms counting only sections that meet within
+        [date_from, date_to] (clipped to this index's window), with the
+        moves made here carried over. Cached until the next move.
+        """
+        lo, hi = _day_number(date_from), _day_number(date_to)
+        lo = self.dates[0] if lo is None else max(lo, self.dates[0])
+        hi = self.dates[1] if hi is None else min(hi, self.dates[1])
+        if (lo, hi) == self.dates:
+            return self
+        hit = self._narrowed.get((lo, hi))
+        if hit is None:
+            meetings, rooms_df = self._source
+            hit = RoomAvailability(meetings, rooms_df, self.slot_minutes,
+                                   None if lo == OPEN_START else np.datetime64(lo, "D"),
+                                   None if hi == OPEN_END else np.datetime64(hi, "D"))
+            for section, new in self._moved.items():
+                hit._replace(section, new if hit._meets_in_window(section) else [])
+            self._narrowed[(lo, hi)] = hit
+        return hit
+
+    # --------- Queries ---------
+    def _window(self, start: Clock, end: Clock) -> Tuple[int, int]:
+        s, e = _minutes(start), _minutes(end)
+        if e <= s:
+            raise ValueError("Query end must be after start.")
+        return s // self.slot_minutes, min(-(-e // self.slot_minutes), self.counts.shape[2])
+
+    def _days(self, days: str) -> np.ndarray:
+        return np.array(sorted({self._day_of[d] for d in str(days) if d in self._day_of}), dtype=np.int64)
+
+    def _eligible(self, room_type: Optional[str], min_stations: int) -> np.ndarray:
+        ok = self.stations >= min_stations
+        if room_type:
+            ok &= self.room_types == str(room_type)
+        return ok
+
+    def free_room_index(self, days: str, start: Clock, end: Clock,
+                        room_type: Optional[str] = None, min_stations: int = 0) -> np.ndarray:
+        """Row positions of matching rooms free on every day in `days` over [start, end)."""
+        s0, s1 = self._window(start, end)
+        ok = self._eligible(room_type, min_stations)
+        for d in self._days(days):
+            ok &= self.busy_prefix[d, s1] == self.busy_prefix[d, s0]
+        return np.flatnonzero(ok)
+
+    def _frame(self, rows: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Location": self.rooms[rows],
+            "Stations": self.stations[rows],
+            "Room Type": self.room_types[rows],
+            "Room Size Category": self.size_categories[rows],
+        })
+
+    def free_rooms(self, days: str, start: Clock, end: Clock,
+                   room_type: Optional[str] = None, min_stations: int = 0) -> pd.DataFrame:
+        """Matching free rooms, best fit (fewest spare stations) first."""
+        return self._frame(self.free_room_index(days, start, end, room_type, min_stations))
+
+    def free_rooms_batch(self, queries: pd.DataFrame, limit: int = 3) -> pd.DataFrame:
+        """
+        Answer many queries at once. `queries` has Days, Start, End and
+        optionally Room Type and Min Stations columns; the result has up to
+        `limit` best-fit rooms per query, tagged with the query's row
+        position in "query". Repeated queries are answered once.
+        """
+        n = len(queries)
+        q = pd.DataFrame({
+            "Days": queries["Days"].astype(str).to_numpy(),
+            "Start": _clock_minutes(queries["Start"]),
+            "End": _clock_minutes(queries["End"]),
+            "Room Type": queries["Room Type"].fillna("").astype(str).to_numpy()
+                         if "Room Type" in queries.columns else np.full(n, ""),
+            "Min Stations": pd.to_numeric(queries["Min Stations"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+                            if "Min Stations" in queries.columns else np.zeros(n, dtype=np.int64),
+        })
+        group = q.groupby(list(q.columns), sort=False).ngroup().to_numpy()
+        first = np.unique(group, return_index=True)[1]
+        g_rows, rooms = self._batch(q.iloc[first], limit)
+
+        # Fan answers back out to every query that asked the same thing
+        hits = pd.DataFrame({"g": g_rows, "room": rooms})
+        asked = pd.DataFrame({"query": np.arange(n), "g": group})
+        pairs = asked.merge(hits, on="g", how="inner", sort=False).sort_values(["query"], kind="stable")
+        out = self._frame(pairs["room"].to_numpy())
+        out.insert(0, "query", pairs["query"].to_numpy())
+        return out
+
+    def _batch(self, q: pd.DataFrame, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best-fit search per query: candidates are the rooms of the wanted
+        type (already in station order) from the first with enough
+        stations on. Each round checks the next window of candidates for
+        every unfinished query at once and doubles the window, so most
+        queries stop after a few dozen rooms instead of scanning them all.
+        """
+        s0 = q["Start"].to_numpy(dtype=np.int64) // self.slot_minutes
+        s1 = np.minimum(-(-q["End"].to_numpy(dtype=np.int64) // self.slot_minutes), self.counts.shape[2])
+        valid = (q["Start"].to_numpy() >= 0) & (s1 > s0)
+        need = q["Min Stations"].to_numpy()
+        day_mask = np.zeros((len(q), len(self.day_labels)), dtype=bool)
+        for i, d in enumerate(q["Days"]):
+            day_mask[i, self._days(d)] = True
+
+        out_q, out_r = [], []
+        types = q["Room Type"].to_numpy()
+        for rtype in pd.unique(types):
+            qs = np.flatnonzero((types == rtype) & valid)
+            if not len(qs):
+                continue
+            cand = np.flatnonzero(self.room_types == rtype) if rtype else np.arange(len(self.rooms))
+            if not len(cand):
+                continue
+            pos = np.searchsorted(self.stations[cand], need[qs], side="left")
+            found = np.zeros(len(qs), dtype=np.int64)
+            width = max(4 * limit, 16)
+            live = np.flatnonzero(pos < len(cand))
+            while len(live):
+                offs = pos[live, None] + np.arange(width)
+                inside = offs < len(cand)
+                rooms = cand[np.minimum(offs, len(cand) - 1)]
+                free = inside.copy()
+                ql = qs[live]
+                for d in np.flatnonzero(day_mask[ql].any(axis=0)):
+                    on = day_mask[ql, d]
+                    r = rooms[on]
+                    free[on] &= (self.busy_prefix[d, s1[ql[on], None], r] == self.busy_prefix[d, s0[ql[on], None], r])
+                rank = found[live, None] + np.cumsum(free, axis=1)
+                hit = free & (rank <= limit)
+                li, wi = np.nonzero(hit)
+                out_q.append(ql[li])
+                out_r.append(rooms[li, wi])
+                found[live] += hit.sum(axis=1)
+                pos[live] += width
+                live = live[(found[live] < limit) & (pos[live] < len(cand))]
+                width *= 2
+        empty = np.empty(0, dtype=np.int64)
+        if not out_q:
+            return empty, empty
+        gq, gr = np.concatenate(out_q), np.concatenate(out_r)
+        # Group by query, best fit first within each
+        order = np.lexsort((gr, gq))
+        return gq[order], gr[order]
+
+    def suggest_alternatives(self, room_conflicts: pd.DataFrame, course_df: Optional[pd.DataFrame] = None,
+                             limit: int = 3) -> pd.DataFrame:
+        """
+        Room conflicts with an "Alternatives" column: up to `limit` free rooms
+        of the conflicted room's type, with at least as many stations as
+        section B enrolls (or, failing that, the conflicted room's
+        stations), over section B's day and time.
+        """
+        out = room_conflicts.copy()
+        if out.empty:
+            out["Alternatives"] = pd.Series(dtype=object)
+            return out
+        rows = out["Location"].map(self._row_of)
+        known = rows.notna().to_numpy()
+        r = rows.fillna(0).astype(np.int64).to_numpy()
+        need = np.where(known, self.stations[r], 0)
+        if course_df is not None and "Actual Enrolled" in course_df.columns:
+            enrolled = pd.to_numeric(course_df["Actual Enrolled"], errors="coerce")
+            enrolled = enrolled.groupby(course_df["CourseID"].to_numpy()).max()
+            b = out["CourseID_B"].map(enrolled).fillna(0).to_numpy(dtype=np.int64)
+            need = np.where(b > 0, b, need)
+        queries = pd.DataFrame({
+            "Days": out["Day"].to_numpy(),
+            "Start": out["Start_B"].to_numpy(),
+            "End": out["End_B"].to_numpy(),
+            "Room Type": np.where(known, self.room_types[r], ""),
+            "Min Stations": need,
+        })
+        # Rooms only need to be free while section B meets: one index per distinct date range
+        first = pd.Series(np.arange(len(self.course_ids)), index=self.course_ids)
+        b_sec = out["CourseID_B"].map(first[~first.index.duplicated()])
+        b_dates = np.tile(np.array([OPEN_START, OPEN_END], dtype=np.int64), (len(out), 1))
+        has = b_sec.notna().to_numpy()
+        b_dates[has] = self._sec_dates[b_sec[has].astype(np.int64).to_numpy()]
+        ranges, which = np.unique(b_dates, axis=0, return_inverse=True)
+        parts = []
+        for g, (lo, hi) in enumerate(ranges.tolist()):
+            pos = np.flatnonzero(which.ravel() == g)
+            index = self.for_dates(np.datetime64(lo, "D") if lo != OPEN_START else None,
+                                   np.datetime64(hi, "D") if hi != OPEN_END else None)
+            h = index.free_rooms_batch(queries.iloc[pos], limit=limit)
+            h["query"] = pos[h["query"].to_numpy()]
+            parts.append(h)
+        hits = pd.concat(parts, ignore_index=True).sort_values("query", kind="stable")
+        # Hits are grouped by query: split them at query boundaries and join
+        labels = hits["Location"].astype(str).to_numpy()
+        cuts = np.cumsum(np.bincount(hits["query"].to_numpy(), minlength=len(out)))[:-1]
+        out["Alternatives"] = [", ".join(chunk) for chunk in np.split(labels, cuts)]
+        return out
+
+    # --------- Updates ---------
+    def _section_meetings(self, section: int) -> List[Meeting]:
+        if section in self._moved:
+            return self._moved[section]
+        lo, hi = np.searchsorted(self._section, [section, section + 1])
+        return [tuple(int(v) for v in mt) for mt in self._meetings[lo:hi]]
+
+    def _apply(self, meetings: List[Meeting], delta: int) -> None:
+        for row, day, s0, s1 in meetings:
+            self.counts[row, day, s0:s1] += delta
+
+    def _refresh(self, touched) -> None:
+        for row, day in touched:
+            self.busy_prefix[day, 1:, row] = np.cumsum(self.counts[row, day] > 0)
+
+    def _replace(self, section: int, new: List[Meeting]) -> None:
+        old = self._section_meetings(section)
+        self._apply(old, -1)
+        self._apply(new, +1)
+        self._refresh({(m[0], m[1]) for m in old + new})
+        self._moved[section] = new
+
+    def section_position(self, course_id) -> int:
+        hit = np.flatnonzero(self.course_ids == course_id)
+        if not len(hit):
+            raise KeyError(f"Unknown CourseID: {course_id}")
+        return int(hit[0])
+
+    def move_section(self, section: int, location=None, days: Optional[str] = None,
+                     start: Optional[Clock] = None, end: Optional[Clock] = None) -> None:
+        """
+        Re-place one section (schedule row position): any of its location,
+        days and times. Unspecified fields keep their current values; a
+        location outside campus rooms drops the section from the index.
+        Sections that don't meet within the index's dates are ignored.
+        """
+        if not self._meets_in_window(section):
+            return
+        old = self._section_meetings(section)
+        if location is not None:
+            row = self._row_of.get(location, -1)
+        elif old:
+            row = old[0][0]
+        else:
+            raise ValueError("Section has no indexed meetings; give a location, days and times.")
+        day_codes = list(self._days(days)) if days is not None else sorted({m[1] for m in old})
+        if start is not None or end is not None:
+            if (start is None or end is None) and not old:
+                raise ValueError("Section has no indexed meetings; give both start and end.")
+            s0 = _minutes(start) // self.slot_minutes if start is not None else old[0][2]
+            s1 = -(-_minutes(end) // self.slot_minutes) if end is not None else old[0][3]
+            s1 = min(s1, self.counts.shape[2])
+        else:
+            if not old:
+                raise ValueError("Section has no indexed meetings; give start and end.")
+            s0, s1 = old[0][2], old[0][3]
+        new = [(row, int(d), s0, s1) for d in day_codes] if row >= 0 and s1 > s0 else []
+        self._narrowed.clear()
+        self._replace(section, new)
@@ -0,0 +1,149 @@
+# utils/batch.py
+"""
+Headless ingest -> transform -> analyze -> export for many campuses.
+
+    python -m utils.batch INPUT_DIR OUTPUT_DIR [--workers N] [--std-hours 40]
+
+INPUT_DIR holds one sub-directory of workbooks per campus. Each campus is
+processed in its own worker process and gets OUTPUT_DIR/<campus>/ with the
+deliverable workbook and a timing.json; OUTPUT_DIR/summary.json collects
+every campus' timings and status.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .analysis import calculate_room_utilization, detect_instructor_conflicts, detect_room_conflicts
+from .file_handlers import collect_schedule_sheets, detect_bldg_lookup_sheet, load_excel
+from .meetings import get_meeting_table
+from .parse_cache import ParseCache
+from .pipeline import build_transformation_pipeline
+from .reporting import deliverable_tables, write_deliverable
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+DELIVERABLE_NAME = "Instruction_Analysis_Deliverable.xlsx"
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(time.perf_counter() - t0, 4)
+
+
+def run_campus(campus_dir: str, out_dir: str, std_hours: float = 40.0, cache_dir: Optional[str] = None) -> Dict:
+    """Run the full pipeline for one campus directory; never raises."""
+    campus = Path(campus_dir).name
+    dest = Path(out_dir) / campus
+    dest.mkdir(parents=True, exist_ok=True)
+    timings: Dict[str, float] = {}
+    result: Dict = {"campus": campus, "status": "ok", "timings": timings}
+    t_all = time.perf_counter()
+    try:
+        cache = ParseCache(cache_dir) if cache_dir else None
+        with _timed(timings, "ingest"):
+            workbooks = {
+                p.name: load_excel(p.read_bytes(), p.name, cache=cache)
+                for p in sorted(Path(campus_dir).iterdir())
+                if p.suffix.lower() in EXCEL_SUFFIXES and not p.name.startswith("~$")
+            }
+            if not workbooks:
+                raise ValueError(f"No Excel workbooks in {campus_dir}")
+            # Workbooks parse lazily: read the schedule and lookup sheets here so
+            # ingest times the actual parsing and transform only the builders
+            pipe = build_transformation_pipeline()
+            frames, keys = collect_schedule_sheets(workbooks)
+            pipe.set_source("schedule_sheets", frames, fingerprint=repr(keys))
+            lookup = next(
+                ((wb, s) for wb in workbooks.values() for s in [detect_bldg_lookup_sheet(wb)] if s),
+                None,
+            )
+            if lookup is None:
+                raise ValueError("No building/room lookup sheet found.")
+            pipe.set_source("lookup_sheets", lookup[0], fingerprint=lookup[0].key)
+            pipe.set_source("lookup_sheet", lookup[1])
+            pipe.run(["lookup"])
+
+        with _timed(timings, "transform"):
+            tables = pipe.run(["course_schedule", "campus_rooms", "buildings", "departments"])
+
+        with _timed(timings, "analyze"):
+            course_schedule = tables["course_schedule"]
+            meetings = get_meeting_table(course_schedule)
+            utilization = calculate_room_utilization(course_schedule, tables["campus_rooms"], std_hours, meetings=meetings)
+            room_conflicts = detect_room_conflicts(course_schedule, meetings=meetings)
+            instr_conflicts = detect_instructor_conflicts(course_schedule, meetings=meetings)
+
+        with _timed(timings, "export"):
+            # Streamed straight to disk; never materialized as bytes
+            write_deliverable(
+                deliverable_tables(
+                    course_schedule, tables["campus_rooms"], tables["buildings"], tables["departments"],
+                    utilization, room_conflicts, instr_conflicts,
+                ),
+                str(dest / DELIVERABLE_NAME),
+            )
+
+        result["rows"] = {
+            "course_schedule": len(course_schedule),
+            "campus_rooms": len(tables["campus_rooms"]),
+            "room_conflicts": len(room_conflicts),
+            "instructor_conflicts": len(instr_conflicts),
+        }
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    timings["total"] = round(time.perf_counter() - t_all, 4)
+    (dest / "timing.json").write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return result
+
+
+def run_batch(input_dir: str, out_dir: str, workers: Optional[int] = None, std_hours: float = 40.0,
+              cache_dir: Optional[str] = None) -> List[Dict]:
+    campuses = sorted(str(p) for p in Path(input_dir).iterdir() if p.is_dir())
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(campuses) or 1))
+    t0 = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_campus, c, out_dir, std_hours, cache_dir): c for c in campuses}
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            print(f"[{r['status']}] {r['campus']}: {r['timings'].get('total', 0):.2f}s", file=sys.stderr)
+    results.sort(key=lambda r: r["campus"])
+    summary = {
+        "workers": workers,
+        "wall_seconds": round(time.perf_counter() - t0, 4),
+        "campuses": results,
+    }
+    (Path(out_dir) / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m utils.batch", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("input_dir", help="directory with one sub-directory of workbooks per campus")
+    ap.add_argument("output_dir", help="where deliverables and timing summaries are written")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--std-hours", type=float, default=40.0, help="standard scheduled hours/week per room")
+    ap.add_argument("--cache-dir", default=None, help="optional parse cache directory shared by workers (keep it private: it holds pickles)")
+    args = ap.parse_args(argv)
+
+    results = run_batch(args.input_dir, args.output_dir, args.workers, args.std_hours, args.cache_dir)
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# utils/bench.py
+"""
+Time and memory-profile the main utils entry points on synthetic terms.
+
+    python -m utils.bench [--sizes 1000,10000,100000] [--save-baseline]
+
+Each benchmark runs on a seeded synthetic term (see utils.synthetic) at
+every size: best-of-N wall time, then one extra run under tracemalloc
+for peak memory. Results are compared with a stored baseline and the
+command exits 1 when any time or peak memory regresses by more than
+--threshold.
+
+    python -m utils.bench --check-engines [--sizes ...]
+
+compares every analysis function's output under each engine in
+utils.analysis.ENGINES with the pandas engine and exits 1 on a mismatch.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from . import analysis as _analysis
+from . import meetings as _meetings
+from . import reporting as _reporting
+from .analysis import calculate_room_utilization, detect_instructor_conflicts, detect_room_conflicts, summarize_utilization
+from .file_handlers import load_bldg_room_lookup
+from .meetings import MeetingTable, build_meeting_table
+from .occupancy import build_occupancy
+from .synthetic import TERM, synthetic_term
+from .transformations import (
+    build_academic_departments, build_campus_buildings, build_campus_rooms, build_course_schedule, merge_course_schedules,
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_BASELINE = ".benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# Differences below these are timer/allocator noise, never regressions
+MIN_SECONDS = 0.005
+MIN_PEAK_MB = 1.0
+
+
+class Inputs:
+    """Synthetic term for one size plus the derived tables, built once and shared."""
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.sheets = synthetic_term(size, seed)
+        self.schedule = self.sheets["Class Schedule"]
+        # Four overlapping "files": each shares 5% of its rows with the next
+        n, step = len(self.schedule), -(-len(self.schedule) // 4)
+        self.schedule_files = [self.schedule.iloc[i:min(n, i + step + step // 20)] for i in range(0, n, step)]
+        self.course_schedule = build_course_schedule(self.schedule)
+        self.campus_rooms = build_campus_rooms(load_bldg_room_lookup(self.sheets, "Bldg Room Lookup"))
+        self.utilization = calculate_room_utilization(self.course_schedule, self.campus_rooms)
+        self.room_conflicts = detect_room_conflicts(self.course_schedule)
+        self.seed = seed
+
+    @cached_property
+    def meetings(self) -> MeetingTable:
+        return build_meeting_table(self.course_schedule)
+
+    @cached_property
+    def staggered_meetings(self) -> MeetingTable:
+        """Meetings whose sections start and end on different days through the term: 100+ date periods."""
+        cs = self.course_schedule.copy()
+        rng = np.random.default_rng(self.seed)
+        t0, t1 = pd.Timestamp(TERM[0]), pd.Timestamp(TERM[1])
+        cs["Start Date"] = (t0 + pd.to_timedelta(rng.integers(0, 56, len(cs)), unit="D")).strftime("%Y-%m-%d")
+        cs["End Date"] = (t1 - pd.to_timedelta(rng.integers(0, 56, len(cs)), unit="D")).strftime("%Y-%m-%d")
+        return build_meeting_table(cs)
+
+
+def _cold() -> None:
+    """Drop in-process result caches so every run measures the full computation."""
+    _meetings._CACHE.clear()
+    _reporting._CACHE.clear()
+
+
+def _deliverable(x: Inputs) -> bytes:
+    cs = x.course_schedule
+    return _reporting.create_full_deliverable(
+        cs, x.campus_rooms, build_campus_buildings(x.campus_rooms), build_academic_departments(cs),
+        x.utilization, x.room_conflicts, x.room_conflicts.iloc[:0],
+    )
+
+
+# name -> (callable on Inputs, largest size it is run at)
+BENCHMARKS: Dict[str, tuple] = {
+    "build_course_schedule": (lambda x: build_course_schedule(x.schedule), None),
+    "merge_course_schedules": (lambda x: merge_course_schedules(x.schedule_files), None),
+    "load_bldg_room_lookup": (lambda x: load_bldg_room_lookup(x.sheets, "Bldg Room Lookup"), None),
+    "detect_room_conflicts": (lambda x: detect_room_conflicts(x.course_schedule), None),
+    "detect_instructor_conflicts": (lambda x: detect_instructor_conflicts(x.course_schedule), 100_000),
+    "calculate_room_utilization": (lambda x: calculate_room_utilization(x.course_schedule, x.campus_rooms), None),
+    "summarize_utilization": (lambda x: summarize_utilization(x.utilization), None),
+    "build_occupancy": (lambda x: build_occupancy(x.meetings, x.campus_rooms["Room ID"]), None),
+    "build_occupancy[staggered]": (lambda x: build_occupancy(x.staggered_meetings, x.campus_rooms["Room ID"]), None),
+    # xlsx writing is slow by nature; keep it to sizes an analyst would export
+    "create_full_deliverable": (_deliverable, 100_000),
+}
+
+
+# Analysis entry points run under every engine by check_engines
+ENGINE_CHECKS: Dict[str, Callable] = {
+    "detect_room_conflicts": lambda x, e: detect_room_conflicts(x.course_schedule, engine=e),
+    "detect_instructor_conflicts": lambda x, e: detect_instructor_conflicts(x.course_schedule, engine=e),
+    "calculate_room_utilization": lambda x, e: calculate_room_utilization(x.course_schedule, x.campus_rooms, engine=e),
+    "calculate_room_utilization[term]": lambda x, e: calculate_room_utilization(
+        x.course_schedule, x.campus_rooms, 35.0, term_start="2025-09-01", term_end="2025-10-31", engine=e),
+    "summarize_utilization": lambda x, e: summarize_utilization(x.utilization, engine=e),
+}
+
+
+def _frame_diff(expected: pd.DataFrame, got: pd.DataFrame) -> Optional[str]:
+    try:
+        pd.testing.assert_frame_equal(expected.reset_index(drop=True), got.reset_index(drop=True),
+                                      check_exact=False, rtol=1e-9, atol=1e-9)
+    except AssertionError as exc:
+        return str(exc).strip().splitlines()[0]
+    return None
+
+
+def check_engines(sizes=DEFAULT_SIZES, seed: int = 0, engines=None) -> pd.DataFrame:
+    """One row per (check, size, engine): whether its output equals the pandas engine's."""
+    engines = [e for e in (engines or _analysis.ENGINES) if e != "pandas"]
+    rows = []
+    for size in sizes:
+        inputs = Inputs(size, seed)
+        for name, fn in ENGINE_CHECKS.items():
+            expected = fn(inputs, "pandas")
+            for engine in engines:
+                diff = _frame_diff(expected, fn(inputs, engine))
+                rows.append({"check": name, "size": size, "engine": engine, "rows": len(expected),
+                             "equal": diff is None, "difference": diff or ""})
+        del inputs
+    return pd.DataFrame(rows, columns=["check", "size", "engine", "rows", "equal", "difference"])
+
+
+def measure(fn: Callable[[], object], repeat: int = 3, memory: bool = True) -> Dict[str, float]:
+    times = []
+    for _ in range(max(1, repeat)):
+        _cold()
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    out = {"seconds": round(min(times), 6)}
+    if memory:
+        _cold()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            out["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+        finally:
+            tracemalloc.stop()
+    return out
+
+
+def run(sizes=DEFAULT_SIZES, names: Optional[List[str]] = None, repeat: int = 3, memory: bool = True,
+        seed: int = 0) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """{benchmark: {size: {"seconds": ..., "peak_mb": ...}}} for every benchmark and size."""
+    names = names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise KeyError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+    results: Dict[str, Dict[str, Dict[str, float]]] = {n: {} for n in names}
+    for size in sizes:
+        inputs = Inputs(size, seed)
+        for name in names:
+            fn, max_size = BENCHMARKS[name]
+            if max_size is not None and size > max_size:
+                continue
+            results[name][str(size)] = measure(lambda: fn(inputs), repeat, memory)
+            print(f"{name:<28} {size:>9,}  {results[name][str(size)]}", file=sys.stderr)
+        del inputs
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> pd.DataFrame:
+    """One row per (benchmark, size, metric) found in both, flagged when worse than baseline by > threshold."""
+    rows = []
+    floors = {"seconds": MIN_SECONDS, "peak_mb": MIN_PEAK_MB}
+    for name, by_size in results.items():
+        for size, metrics in by_size.items():
+            base = baseline.get(name, {}).get(size)
+            if not base:
+                continue
+            for metric, value in metrics.items():
+                if metric not in base:
+                    continue
+                b = base[metric]
+                ratio = value / b if b else np.inf
+                rows.append({
+                    "benchmark": name, "size": int(size), "metric": metric,
+                    "baseline": b, "current": value, "ratio": round(ratio, 3),
+                    "regressed": bool(ratio > 1 + threshold and value - b > floors[metric]),
+                })
+    return pd.DataFrame(rows, columns=["benchmark", "size", "metric", "baseline", "current", "ratio", "regressed"])
+
+
+def _environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m utils.bench", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                    help="comma-separated section counts (e.g. 1000,10000,1000000)")
+    ap.add_argument("--only", default=None, help="comma-separated benchmark names")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark; the best is kept")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare with / save to")
+    ap.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="allowed slowdown / memory growth as a fraction (default 0.25)")
+    ap.add_argument("--json", default=None, help="also write this run's results to a JSON file")
+    ap.add_argument("--engine", choices=_analysis.ENGINES, default=None,
+                    help="analysis engine to time (default: CREDO_ANALYSIS_ENGINE or pandas)")
+    ap.add_argument("--check-engines", action="store_true",
+                    help="compare analysis outputs of every engine with the pandas engine instead of timing")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.check_engines:
+        report = check_engines(sizes, args.seed)
+        with pd.option_context("display.width", 160, "display.max_rows", None, "display.max_colwidth", 80):
+            print(report.to_string(index=False))
+        return 0 if report["equal"].all() else 1
+    if args.engine:
+        _analysis.set_engine(args.engine)
+    names = [n.strip() for n in args.only.split(",")] if args.only else None
+    results = run(sizes, names, args.repeat, not args.no_memory, args.seed)
+    record = {"environment": _environment(), "seed": args.seed, "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(record, indent=2), encoding="utf-8")
+
+    path = Path(args.baseline)
+    if args.save_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {path}")
+        return 0
+    if not path.exists():
+        print(f"No baseline at {path}; run with --save-baseline first.")
+        return 0
+
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    report = compare(results, baseline.get("results", {}), args.threshold)
+    with pd.option_context("display.width", 160, "display.max_rows", None):
+        print(report.to_string(index=False) if not report.empty else "Nothing comparable in baseline.")
+    bad = report[report["regressed"]]
+    if not bad.empty:
+        print(f"\n{len(bad)} regression(s) beyond {args.threshold:.0%} of baseline.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+# utils/conflict_index.py
+"""
+Incrementally maintained room and instructor conflicts.
+
+ConflictIndex keeps every timed meeting bucketed by (location, day) and
+(instructor, day). Editing a section or applying a delta frame of changed
+CourseIDs re-checks only the buckets those sections leave or join and
+returns the conflict pairs that appeared and disappeared, so the cost
+follows the size of the touched buckets rather than the whole term.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+from .intervals import overlap_pairs
+from .meetings import MeetingTable, build_meeting_table, get_meeting_table
+from .occupancy import Clock, _minutes
+from .timeparse import minutes_to_hhmm
+from .transformations import normalize_days_column
+
+KINDS = ("Location", "Instructor")
+CHANGE_COLUMNS = ["Kind", "Key", "Day", "CourseID_A", "CourseID_B", "Start_A", "End_A", "Start_B", "End_B"]
+# Section fields a delta row carries; Start/End Min are minutes since midnight
+DELTA_COLUMNS = ["CourseID", "Days", "Start Min", "End Min", "Location", "Instructor", "Start Date", "End Date"]
+
+# (section uid, start, end, date_start, date_end)
+Entry = Tuple[int, int, int, int, int]
+Group = Tuple[str, str, str]   # (kind, key label, day label)
+Pair = Tuple[Entry, Entry]
+
+
+@dataclass(frozen=True)
+class ConflictChanges:
+    """Conflict pairs gained and lost by one update, in CHANGE_COLUMNS layout."""
+    added: pd.DataFrame
+    removed: pd.DataFrame
+
+    @property
+    def empty(self) -> bool:
+        return self.added.empty and self.removed.empty
+
+
+def _pair(a: Entry, b: Entry) -> Pair:
+    # A is the earlier meeting (start, then uid), matching detect_*_conflicts
+    return (a, b) if (a[1], a[0]) <= (b[1], b[0]) else (b, a)
+
+def _group_pairs(entries: List[Entry]) -> Set[Pair]:
+    if len(entries) < 2:
+        return set()
+    arr = np.array(entries, dtype=np.int64)
+    ia, ib = overlap_pairs(np.zeros(len(arr), dtype=np.int64), arr[:, 1], arr[:, 2])
+    ok = np.maximum(arr[ia, 3], arr[ib, 3]) <= np.minimum(arr[ia, 4], arr[ib, 4])
+    return {_pair(entries[a], entries[b]) for a, b in zip(ia[ok].tolist(), ib[ok].tolist())}
+
+def _grouped_entries(m: MeetingTable, uids: np.ndarray) -> Dict[Group, List[Entry]]:
+    """Timed meetings of `m` bucketed by kind/key/day, with section uids from `uids[m.section]`."""
+    out: Dict[Group, List[Entry]] = {}
+    timed = m.has_time & (m.day >= 0)
+    for kind, codes, labels in (("Location", m.location, m.locations), ("Instructor", m.instructor, m.instructors)):
+        keep = np.flatnonzero(timed & (codes >= 0))
+        if not len(keep):
+            continue
+        grp = codes[keep].astype(np.int64) * len(m.day_labels) + m.day[keep]
+        order = np.argsort(grp, kind="stable")
+        keep, grp = keep[order], grp[order]
+        entries = list(zip(
+            uids[m.section[keep]].tolist(), m.start[keep].tolist(), m.end[keep].tolist(),
+            m.date_start[keep].tolist(), m.date_end[keep].tolist(),
+        ))
+        cuts = np.flatnonzero(np.diff(grp)) + 1
+        bounds = np.concatenate([[0], cuts, [len(grp)]]).tolist()
+        day_of, key_of = m.day[keep], codes[keep]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            out[(kind, labels[key_of[lo]], m.day_labels[day_of[lo]])] = entries[lo:hi]
+    return out
+
+
+class ConflictIndex:
+    """
+    Current room and instructor conflicts of a schedule, updatable in place.
+
+    Sections are identified by CourseID: apply() replaces every section of
+    the delta's CourseIDs (and drops `removed` ones), edit() re-places one
+    section. Both return ConflictChanges for just the touched buckets.
+    """
+
+    def __init__(self, course_df: pd.DataFrame, meetings: Optional[MeetingTable] = None):
+        m = meetings if meetings is not None else get_meeting_table(course_df)
+        self._df = course_df
+        self._base = m
+        n = len(course_df)
+        self._course_id: Dict[int, object] = dict(enumerate(m.course_ids.tolist()))
+        self._uids: Dict[object, List[int]] = {}
+        for uid, cid in self._course_id.items():
+            self._uids.setdefault(cid, []).append(uid)
+        self._next_uid = n
+        self._rows: Dict[int, dict] = {}            # delta rows of edited/added sections
+        self.groups = _grouped_entries(m, np.arange(n, dtype=np.int64))
+        self._groups_of: Dict[int, List[Group]] = {}
+        for g, entries in self.groups.items():
+            for e in entries:
+                self._groups_of.setdefault(e[0], []).append(g)
+        self.counts = {kind: len(self._pairs_of_kind(kind)[0]) for kind in KINDS}
+
+    @classmethod
+    def from_schedule(cls, course_df: pd.DataFrame) -> "ConflictIndex":
+        return cls(course_df)
+
+    def __contains__(self, course_id) -> bool:
+        return bool(self._uids.get(course_id))
+
+    # ---- full views ----
+
+    def _pairs_of_kind(self, kind: str):
+        """Current pairs of one kind: (a, b) rows into the entries array, group ids, key and day labels."""
+        keys, days, rows, gids = [], [], [], []
+        for (k, key, day), entries in self.groups.items():
+            if k != kind or len(entries) < 2:
+                continue
+            keys.append(key)
+            days.append(day)
+            rows.extend(entries)
+            gids.extend([len(keys) - 1] * len(entries))
+        arr = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        g = np.array(gids, dtype=np.int64)
+        ia, ib = overlap_pairs(g, arr[:, 1], arr[:, 2]) if len(arr) else (np.empty(0, np.int64),) * 2
+        ok = np.maximum(arr[ia, 3], arr[ib, 3]) <= np.minimum(arr[ia, 4], arr[ib, 4])
+        return ia[ok], ib[ok], arr, g, np.array(keys, dtype=object), np.array(days, dtype=object)
+
+    def conflicts(self, kind: str = "Location") -> pd.DataFrame:
+        """Current conflicts in detect_room_conflicts / detect_instructor_conflicts layout."""
+        if kind not in KINDS:
+            raise KeyError(f"Unknown conflict kind: {kind}")
+        ia, ib, arr, g, keys, days = self._pairs_of_kind(kind)
+        ids = np.array([self._course_id[u] for u in arr[:, 0].tolist()], dtype=object) if len(arr) else np.empty(0, object)
+        return pd.DataFrame({
+            kind: keys[g[ia]] if len(ia) else np.empty(0, object),
+            "Day": days[g[ia]] if len(ia) else np.empty(0, object),
+            "CourseID_A": ids[ia] if len(ia) else np.empty(0, object),
+            "CourseID_B": ids[ib] if len(ia) else np.empty(0, object),
+            "Start_A": minutes_to_hhmm(arr[ia, 1]), "End_A": minutes_to_hhmm(arr[ia, 2]),
+            "Start_B": minutes_to_hhmm(arr[ib, 1]), "End_B": minutes_to_hhmm(arr[ib, 2]),
+        }, columns=[kind, "Day", "CourseID_A", "CourseID_B", "Start_A", "End_A", "Start_B", "End_B"])
+
+    def room_conflicts(self) -> pd.DataFrame:
+        return self.conflicts("Location")
+
+    def instructor_conflicts(self) -> pd.DataFrame:
+        return self.conflicts("Instructor")
+
+    # ---- updates ----
+
+    def _ident(self, pair: Pair) -> tuple:
+        return tuple(sorted(((self._course_id[e[0]],) + e[1:] for e in pair), key=repr))
+
+    def _changes_frame(self, pairs: List[Tuple[Group, Pair]]) -> pd.DataFrame:
+        if not pairs:
+            return pd.DataFrame(columns=CHANGE_COLUMNS)
+        a = np.array([p[0] for _, p in pairs], dtype=np.int64)
+        b = np.array([p[1] for _, p in pairs], dtype=np.int64)
+        return pd.DataFrame({
+            "Kind": [g[0] for g, _ in pairs],
+            "Key": [g[1] for g, _ in pairs],
+            "Day": [g[2] for g, _ in pairs],
+            "CourseID_A": [self._course_id[u] for u in a[:, 0].tolist()],
+            "CourseID_B": [self._course_id[u] for u in b[:, 0].tolist()],
+            "Start_A": minutes_to_hhmm(a[:, 1]), "End_A": minutes_to_hhmm(a[:, 2]),
+            "Start_B": minutes_to_hhmm(b[:, 1]), "End_B": minutes_to_hhmm(b[:, 2]),
+        }, columns=CHANGE_COLUMNS)
+
+    def apply(self, delta: Optional[pd.DataFrame] = None, removed: Iterable = ()) -> ConflictChanges:
+        """
+        Replace all sections of each CourseID in `delta` with its rows and
+        drop the CourseIDs in `removed`. `delta` is in course-schedule
+        layout (CourseID, Days, Start/End Time or Start/End Min, Location,
+        Instructor, optional Start/End Date).
+        """
+        delta = delta if delta is not None else pd.DataFrame(columns=DELTA_COLUMNS)
+        if "CourseID" not in delta.columns:
+            raise KeyError("Delta frame needs a CourseID column.")
+        # Parse the delta on its own; its buckets are the ones sections join
+        new_uids = np.arange(self._next_uid, self._next_uid + len(delta), dtype=np.int64)
+        joining = _grouped_entries(build_meeting_table(delta), new_uids) if len(delta) else {}
+        leaving = [u for cid in set(delta["CourseID"].tolist()) | set(removed) for u in self._uids.get(cid, [])]
+
+        touched = set(joining)
+        for u in leaving:
+            touched.update(self._groups_of.get(u, ()))
+        before = {g: _group_pairs(self.groups.get(g, [])) for g in touched}
+
+        gone = set(leaving)
+        for u in leaving:
+            for g in self._groups_of.pop(u, ()):
+                if g in self.groups:
+                    self.groups[g] = [e for e in self.groups[g] if e[0] not in gone]
+            cid = self._course_id.get(u)
+            if cid in self._uids:
+                self._uids.pop(cid)
+            self._rows.pop(u, None)
+        for g, entries in joining.items():
+            self.groups.setdefault(g, []).extend(entries)
+            for e in entries:
+                self._groups_of.setdefault(e[0], []).append(g)
+        records = delta.to_dict("records")
+        for uid, rec in zip(new_uids.tolist(), records):
+            self._course_id[uid] = rec["CourseID"]
+            self._uids.setdefault(rec["CourseID"], []).append(uid)
+            self._rows[uid] = rec
+        self._next_uid += len(delta)
+
+        added: List[Tuple[Group, Pair]] = []
+        lost: List[Tuple[Group, Pair]] = []
+        for g in touched:
+            # Compare by CourseID and times, so re-placed but unchanged pairs cancel out
+            old = {self._ident(p): p for p in before[g]}
+            new = {self._ident(p): p for p in _group_pairs(self.groups.get(g, []))}
+            added += [(g, new[k]) for k in new.keys() - old.keys()]
+            lost += [(g, old[k]) for k in old.keys() - new.keys()]
+            if not self.groups.get(g):
+                self.groups.pop(g, None)
+        for kind in KINDS:
+            self.counts[kind] += sum(g[0] == kind for g, _ in added) - sum(g[0] == kind for g, _ in lost)
+        # Removed pairs may name sections that no longer exist; label them before forgetting
+        out = ConflictChanges(self._changes_frame(added), self._changes_frame(lost))
+        for u in leaving:
+            self._course_id.pop(u, None)
+        return out
+
+    def section_rows(self, course_id) -> pd.DataFrame:
+        """Current delta-layout rows of a CourseID (one per section with that ID)."""
+        uids = self._uids.get(course_id)
+        if not uids:
+            raise KeyError(f"Unknown CourseID: {course_id}")
+        rows = []
+        m = self._base
+        for u in uids:
+            if u in self._rows:
+                rows.append({c: self._rows[u].get(c) for c in DELTA_COLUMNS})
+                continue
+            src = self._df.iloc[u]
+            first = int(np.searchsorted(m.section, u))
+            rows.append({
+                "CourseID": course_id,
+                "Days": src.get("Days", ""),
+                "Start Min": int(m.start[first]),
+                "End Min": int(m.end[first]),
+                "Location": src.get("Location", ""),
+                "Instructor": src.get("Instructor", ""),
+                "Start Date": src.get("Start Date"),
+                "End Date": src.get("End Date"),
+            })
+        return pd.DataFrame(rows, columns=DELTA_COLUMNS)
+
+    def edit(self, course_id, location=None, instructor=None, days: Optional[str] = None,
+             start: Optional[Clock] = None, end: Optional[Clock] = None) -> ConflictChanges:
+        """Re-place every section of `course_id`; unspecified fields keep their current values."""
+        rows = self.section_rows(course_id)
+        if location is not None:
+            rows["Location"] = location
+        if instructor is not None:
+            rows["Instructor"] = instructor
+        if days is not None:
+            rows["Days"] = normalize_days_column(pd.Series([days] * len(rows), dtype=object)).to_numpy()
+        if start is not None:
+            rows["Start Min"] = _minutes(start)
+        if end is not None:
+            rows["End Min"] = _minutes(end)
+        return self.apply(rows)
@@ -1,83 +1,220 @@
 # utils/file_handlers.py
 from __future__ import annotations
 import io
-from typing import Dict, List, Optional
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
-# Try optional PDF backends lazily to avoid hard dependency
-try:
-    # Only bind a callable name; don't import module at top-level if unavailable
-    from pdfminer.high_level import extract_text as _pdfminer_extract_text
-    _HAS_PDFMINER = True
-except Exception:
-    _pdfminer_extract_text = None
-    _HAS_PDFMINER = False
+from .fingerprint import bytes_fingerprint
+from .instrument import instrumented
+from .layouts import get_layout_store
+from .parse_cache import ParseCache
+from .pdf_extract import pdf_text
+from .transformations import schedule_profile, schedule_source_columns
 
-try:
-    import PyPDF2 as _PyPDF2
-    _HAS_PYPDF2 = True
-except Exception:
-    _PyPDF2 = None
-    _HAS_PYPDF2 = False
+# Rows read per sheet when sniffing headers
+HEADER_SNIFF_ROWS = 5
 
+# Lookup columns parsed as text when a layout profile declares dtypes
+LOOKUP_TEXT_ROLES = ("Building", "Room", "Room Type", "Registrar")
 
-# --------- Simple loaders ---------
-def load_excel(file_bytes: bytes, filename: str) -> Dict[str, pd.DataFrame]:
-    xls = pd.ExcelFile(io.BytesIO(file_bytes))
-    return {s: xls.parse(s, header=0) for s in xls.sheet_names}
+# Room Size Category breakpoints (inclusive upper bounds). Stations are used
+# when > 0, otherwise ASF. Override per institution via load_bldg_room_lookup.
+DEFAULT_SIZE_BINS = {
+    "stations": (15, 25, 35, 49, 75),
+    "asf": (300, 500, 700, 900, 1300),
+    "labels": ("A", "B", "C", "D", "E", "F"),
+}
 
 
-def load_pdf_text(file_bytes: bytes) -> str:
+# --------- Simple loaders ---------
+class LazyWorkbook(Mapping):
     """
-    Best-effort PDF text extraction.
-    Prefers pdfminer.six if installed, falls back to PyPDF2, otherwise returns "".
+    Read-only mapping of sheet name -> DataFrame that defers parsing.
+
+    Sheet headers come from the first HEADER_SNIFF_ROWS rows only (openpyxl
+    streams in read-only mode, so the rest of the sheet is never touched).
+    Full bodies are parsed on first access, optionally restricted to the
+    columns a transformation needs, and kept for reuse. With a ParseCache,
+    names, headers and bodies are also read from / written to disk under the
+    SHA-256 of the file bytes, so a repeat upload never reopens the workbook.
     """
-    if _HAS_PDFMINER and _pdfminer_extract_text is not None:
-        with io.BytesIO(file_bytes) as fh:
+
+    def __init__(self, file_bytes: bytes, filename: str = "", cache: Optional[ParseCache] = None):
+        self.filename = filename
+        self._bytes = file_bytes
+        self._cache = cache
+        self.key = bytes_fingerprint(file_bytes)
+        self._names: Optional[List[str]] = None
+        self._xls: Optional[pd.ExcelFile] = None
+        self._headers: Dict[str, pd.DataFrame] = {}
+        self._row_counts: Dict[str, Optional[int]] = {}
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._partial: Dict[tuple, pd.DataFrame] = {}
+
+    @property
+    def _excel(self) -> pd.ExcelFile:
+        if self._xls is None:
+            self._xls = pd.ExcelFile(io.BytesIO(self._bytes))
+        return self._xls
+
+    @property
+    def sheet_names(self) -> List[str]:
+        if self._names is None:
+            if self._cache is not None:
+                self._names = self._cache.sheet_names(self.key)
+                if self._names is not None:
+                    self._headers.update(self._cache.headers(self.key))
+                    self._row_counts.update(self._cache.row_counts(self.key))
+            if self._names is None:
+                self._names = list(self._excel.sheet_names)
+                if self._cache is not None:
+                    self._cache.put_sheet_names(self.key, self._names)
+        return self._names
+
+    def header(self, name: str) -> pd.DataFrame:
+        """First few rows of a sheet (enough to classify it)."""
+        if name in self._frames:
+            return self._frames[name].head(HEADER_SNIFF_ROWS)
+        self.sheet_names  # pulls cached headers in, if any
+        if name not in self._headers:
+            self._row_count_hint(name)
+            self._headers[name] = self._excel.parse(name, header=0, nrows=HEADER_SNIFF_ROWS)
+            if self._cache is not None:
+                self._cache.put_headers(self.key, {name: self._headers[name]}, {name: self._row_counts.get(name)})
+        return self._headers[name]
+
+    def columns(self, name: str) -> List:
+        return list(self.header(name).columns)
+
+    def row_count(self, name: str) -> Optional[int]:
+        """Data rows in a sheet; from the sheet's stored dimensions when not parsed yet."""
+        if name in self._frames:
+            return len(self._frames[name])
+        return self._row_count_hint(name)
+
+    def _row_count_hint(self, name: str) -> Optional[int]:
+        if name not in self._row_counts:
             try:
-                return _pdfminer_extract_text(fh) or ""
+                book = self._excel.book
+                if hasattr(book, "sheet_by_name"):
+                    n = book.sheet_by_name(name).nrows
+                else:
+                    n = book[name].max_row
+                self._row_counts[name] = max(int(n) - 1, 0) if n is not None else None
             except Exception:
-                # fall through to next backend
-                pass
-
-    if _HAS_PYPDF2 and _PyPDF2 is not None:
-        try:
-            reader = _PyPDF2.PdfReader(io.BytesIO(file_bytes))
-            chunks = []
-            for page in reader.pages:
-                try:
-                    chunks.append(page.extract_text() or "")
-                except Exception:
-                    chunks.append("")
-            return "\n".join(chunks).strip()
-        except Exception:
-            return ""
-
-    # No PDF backend available; return empty so app continues
-    return ""
+                self._row_counts[name] = None
+        return self._row_counts[name]
+
+    def parse(self, name: str, usecols: Optional[Sequence] = None, dtype: Optional[Dict] = None) -> pd.DataFrame:
+        """Parse a sheet body, optionally only the given header names and with declared dtypes."""
+        if usecols is None and not dtype:
+            if name not in self._frames:
+                self._frames[name] = self._load_body(name, None, None)
+            return self._frames[name]
+        if name in self._frames and not dtype:
+            return self._frames[name][list(usecols)]
+        key = (name, tuple(usecols) if usecols is not None else None, tuple(sorted((dtype or {}).items(), key=repr)))
+        if key not in self._partial:
+            self._partial[key] = self._load_body(name, usecols, dtype)
+        return self._partial[key]
+
+    def _load_body(self, name: str, usecols: Optional[Sequence], dtype: Optional[Dict]) -> pd.DataFrame:
+        if self._cache is not None:
+            df = self._cache.read_sheet(self.key, name, usecols, dtype)
+            if df is not None:
+                return df
+        kwargs = {"dtype": dtype} if dtype else {}
+        if usecols is not None:
+            wanted = set(usecols)
+            kwargs["usecols"] = lambda c: c in wanted
+        df = self._excel.parse(name, header=0, **kwargs)
+        if self._cache is not None:
+            self._cache.put_sheet(self.key, name, df, usecols, dtype)
+        return df
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in self.sheet_names:
+            raise KeyError(name)
+        return self.parse(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sheet_names)
+
+    def __len__(self) -> int:
+        return len(self.sheet_names)
+
+
+@instrumented("ingestion")
+def load_excel(file_bytes: bytes, filename: str, cache: Optional[ParseCache] = None) -> LazyWorkbook:
+    return LazyWorkbook(file_bytes, filename, cache=cache)
+
+
+def sheet_columns(sheets: Mapping, name: str) -> List:
+    """Header of one sheet without forcing a full parse of lazy workbooks."""
+    if isinstance(sheets, LazyWorkbook):
+        return sheets.columns(name)
+    return list(sheets[name].columns)
+
+
+def sheet_header(sheets: Mapping, name: str) -> pd.DataFrame:
+    if isinstance(sheets, LazyWorkbook):
+        return sheets.header(name)
+    return sheets[name]
+
+
+def load_sheet(sheets: Mapping, name: str, usecols: Optional[Sequence] = None,
+               dtype: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Sheet body, restricted to `usecols` (raw header names) when given. Lazy
+    workbooks parse with the declared `dtype`s; in-memory frames are returned as-is.
+    """
+    if isinstance(sheets, LazyWorkbook):
+        return sheets.parse(name, usecols=usecols, dtype=dtype)
+    df = sheets[name]
+    return df[list(usecols)] if usecols is not None else df
+
+
+@instrumented("ingestion")
+def load_pdf_text(file_bytes: bytes, cache: Optional[ParseCache] = None, workers: Optional[int] = None) -> str:
+    """
+    Best-effort PDF text extraction, page by page (see utils.pdf_extract),
+    memoized per page in `cache` when given. Prefers pdfminer.six if
+    installed, falls back to PyPDF2, otherwise returns "".
+    """
+    if cache is None:
+        return pdf_text(file_bytes, workers=workers)
+    key = bytes_fingerprint(file_bytes)
+    text = cache.get_text(key)
+    if text is None:
+        text = pdf_text(file_bytes, cache=cache, workers=workers)
+        cache.put_text(key, text)
+    return text
 
 
 # --------- Analyze sheets ---------
-def analyze_excel_structure(sheets: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+def analyze_excel_structure(sheets: Mapping) -> pd.DataFrame:
     rows = []
-    for name, df in sheets.items():
+    for name in sheets:
+        cols = sheet_columns(sheets, name)
         rows.append(
             {
                 "sheet": name,
-                "rows": len(df),
-                "cols": len(df.columns),
-                "columns_preview": [str(c) for c in df.columns[:10]],
+                "rows": sheets.row_count(name) if isinstance(sheets, LazyWorkbook) else len(sheets[name]),
+                "cols": len(cols),
+                "columns_preview": [str(c) for c in cols[:10]],
             }
         )
     return pd.DataFrame(rows)
 
 
 # --------- Detect lookup sheet ---------
-def detect_bldg_lookup_sheet(sheets: Dict[str, pd.DataFrame]) -> Optional[str]:
+def detect_bldg_lookup_sheet(sheets: Mapping) -> Optional[str]:
     best = None
     best_score = -1
-    for name, df in sheets.items():
-        cols = {str(c).strip().lower() for c in df.columns}
+    for name in sheets:
+        cols = {str(c).strip().lower() for c in sheet_columns(sheets, name)}
         score = 0
         if {"building", "room #"} <= cols or {"bldg", "room"}.issubset(cols):
             score += 2
@@ -110,21 +247,37 @@ def guess_bldg_column_map(df: pd.DataFrame) -> Dict[str, str]:
     }
 
 
+@instrumented("ingestion")
 def load_bldg_room_lookup(
-    sheets: Dict[str, pd.DataFrame],
+    sheets: Mapping,
     sheet_name: Optional[str] = None,
     column_map: Optional[Dict[str, str]] = None,
+    size_bins: Optional[Dict] = None,
 ) -> pd.DataFrame:
     if sheet_name is None:
         sheet_name = detect_bldg_lookup_sheet(sheets)
         if sheet_name is None:
             raise ValueError("No building/room lookup sheet found.")
-    df = sheets[sheet_name].copy()
+    dtypes = None
     if column_map is None:
-        column_map = guess_bldg_column_map(df)
+        # Reuse the stored profile for this header layout, if any
+        store = get_layout_store()
+        header = sheet_columns(sheets, sheet_name)
+        prof = store.get("lookup", header)
+        if prof is None:
+            mapping = guess_bldg_column_map(sheet_header(sheets, sheet_name))
+            prof = store.put("lookup", header, mapping, {
+                mapping[role]: "str" for role in LOOKUP_TEXT_ROLES if mapping.get(role)
+            })
+            prof = store.get("lookup", header)
+        column_map, dtypes = prof["mapping"], prof["dtypes"]
 
     if not column_map.get("Building") or not column_map.get("Room"):
-        raise ValueError(f"Missing required mapping for Building/Room. Columns: {list(df.columns)}")
+        raise ValueError(f"Missing required mapping for Building/Room. Columns: {sheet_columns(sheets, sheet_name)}")
+
+    # Only the mapped columns are parsed from lazy workbooks
+    used = list(dict.fromkeys(c for c in column_map.values() if c))
+    df = load_sheet(sheets, sheet_name, usecols=used, dtype=dtypes).copy()
 
     out = pd.DataFrame()
     out["Bldg"] = df[column_map["Building"]].astype(str).str.strip()
@@ -156,38 +309,69 @@ def load_bldg_room_lookup(
 
     out["Room ID"] = (out["Bldg"].str.strip() + " " + out["Room"].str.strip()).str.strip()
 
-    def size_cat(row):
-        seats = row.get("Stations", 0)
-        if seats > 0:
-            if seats <= 15:
-                return "A"
-            if seats <= 25:
-                return "B"
-            if seats <= 35:
-                return "C"
-            if seats <= 49:
-                return "D"
-            if seats <= 75:
-                return "E"
-            return "F"
-        asf = float(row.get("ASF", 0) or 0)
-        if asf <= 300:
-            return "A"
-        if asf <= 500:
-            return "B"
-        if asf <= 700:
-            return "C"
-        if asf <= 900:
-            return "D"
-        if asf <= 1300:
-            return "E"
-        return "F"
-
-    out["Room Size Category"] = out.apply(size_cat, axis=1)
+    out["Room Size Category"] = categorize_room_size(out["Stations"], out["ASF"], size_bins)
     return out
 
 
+def categorize_room_size(stations, asf, size_bins: Optional[Dict] = None) -> np.ndarray:
+    """
+    Vectorized Room Size Category: bin Stations where > 0, else ASF, against
+    the inclusive upper bounds in `size_bins` (DEFAULT_SIZE_BINS by default).
+    """
+    bins = {**DEFAULT_SIZE_BINS, **(size_bins or {})}
+    labels = np.asarray(bins["labels"], dtype=object)
+    st_breaks = np.asarray(bins["stations"], dtype=float)
+    asf_breaks = np.asarray(bins["asf"], dtype=float)
+    if len(labels) != len(st_breaks) + 1 or len(labels) != len(asf_breaks) + 1:
+        raise ValueError("Size bins need exactly one more label than breakpoints for both stations and ASF.")
+    if np.any(np.diff(st_breaks) <= 0) or np.any(np.diff(asf_breaks) <= 0):
+        raise ValueError("Size bin breakpoints must be strictly increasing.")
+
+    seats = np.asarray(pd.to_numeric(pd.Series(stations), errors="coerce").fillna(0), dtype=float)
+    area = np.asarray(pd.to_numeric(pd.Series(asf), errors="coerce"), dtype=float)
+    # side="left" puts a value equal to a breakpoint in that breakpoint's bin (<=)
+    idx = np.where(
+        seats > 0,
+        np.searchsorted(st_breaks, seats, side="left"),
+        np.searchsorted(asf_breaks, area, side="left"),
+    )
+    return labels[idx]
+
+
+def is_schedule_sheet(columns) -> bool:
+    # Very loose heuristic on headers only
+    cols = {str(c).strip().lower() for c in columns}
+    return any(k in cols for k in ("times","days","rooms")) or any(k in cols for k in ("start time","end time"))
+
+
+@instrumented("ingestion")
+def collect_schedule_sheets(workbooks: Mapping) -> Tuple[List[pd.DataFrame], List[tuple]]:
+    """
+    Find schedule-like sheets across {filename: sheets} and parse only the
+    columns build_course_schedule will read, with the dtypes declared by the
+    sheet's layout profile. Returns the frames and a cheap
+    (workbook key, sheet, columns) identity for each, usable as a fingerprint.
+    """
+    frames, keys = [], []
+    for _, sheets in workbooks.items():
+        for sname in sheets:
+            raw_cols = sheet_columns(sheets, sname)
+            if not is_schedule_sheet(raw_cols):
+                continue
+            by_name = {str(c).strip(): c for c in raw_cols}
+            needed = [by_name[c] for c in schedule_source_columns(raw_cols)]
+            dtypes = {by_name[c]: t for c, t in schedule_profile(raw_cols)["dtypes"].items() if c in by_name}
+            frames.append(load_sheet(sheets, sname, usecols=needed, dtype=dtypes))
+            keys.append((getattr(sheets, "key", id(sheets)), sname, tuple(needed), tuple(sorted(dtypes.items(), key=repr))))
+    return frames, keys
+
+
+@instrumented("ingestion")
 def merge_class_schedule(schedules: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Raw column-union concat of schedule sheets. Step 2 normalizes sheets one
+    by one instead (transformations.merge_course_schedules).
+    """
     if not schedules:
         return pd.DataFrame()
     df = pd.concat(schedules, ignore_index=True)
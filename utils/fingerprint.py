@@ -0,0 +1,19 @@
+# utils/fingerprint.py
+from __future__ import annotations
+import hashlib
+import pandas as pd
+
+def bytes_fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame: values, index, column names and dtypes.
+    Two frames with the same fingerprint are interchangeable for caching.
+    """
+    h = hashlib.sha1()
+    if df is None:
+        return h.hexdigest()
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
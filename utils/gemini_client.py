@@ -1,46 +1,222 @@
+import hashlib
 import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
 import streamlit as st
-import google.generativeai as genai
+
+from .parse_cache import DEFAULT_CACHE_DIR, atomic_write
+
+try:
+    import google.generativeai as genai
+    _HAS_GENAI = True
+except Exception:
+    genai = None
+    _HAS_GENAI = False
 
 MODEL_NAME = "gemini-2.5-pro"
 
+# Rough prompt budget; ~4 characters per token for English/CSV text
+DIGEST_TOKEN_BUDGET = 1500
+CHARS_PER_TOKEN = 4
+
+# "gemini" (default) or "stub" for offline runs and tests
+BACKEND = os.getenv("CREDO_LLM_BACKEND", "gemini")
+RESPONSE_CACHE_DIR = os.getenv("CREDO_LLM_CACHE_DIR", os.path.join(DEFAULT_CACHE_DIR, "llm"))
+
 def _get_key():
     # Prefer Streamlit secrets; fall back to env var for local dev
-    if "GEMINI_API_KEY" in st.secrets:
-        return st.secrets["GEMINI_API_KEY"]
+    try:
+        if "GEMINI_API_KEY" in st.secrets:
+            return st.secrets["GEMINI_API_KEY"]
+    except Exception:
+        # No secrets.toml outside a configured Streamlit app
+        pass
     return os.getenv("GEMINI_API_KEY")
 
 def init_gemini():
+    if not _HAS_GENAI:
+        raise ImportError("google-generativeai is required for the Gemini backend.")
     key = _get_key()
     if not key:
         raise ValueError("Gemini API key not found. Set st.secrets['GEMINI_API_KEY'] or env GEMINI_API_KEY.")
     genai.configure(api_key=key)
     return genai
 
-def summarize_conflicts_with_gemini(room_conflicts_df, instructor_conflicts_df, utilization_df, extra_notes=""):
+# ------------------------------ Backends ------------------------------
+
+class GeminiBackend:
+    """Configures the SDK once and reuses one GenerativeModel per model name."""
+
+    def __init__(self):
+        self._models = {}
+
+    def stream(self, prompt: str, model: str) -> Iterator[str]:
+        if model not in self._models:
+            if not self._models:
+                init_gemini()
+            self._models[model] = genai.GenerativeModel(model)
+        for chunk in self._models[model].generate_content(prompt, stream=True):
+            try:
+                text = chunk.text
+            except (ValueError, AttributeError):
+                # The SDK raises on chunks whose candidate was blocked or carries no text
+                continue
+            if text:
+                yield text
+
+class StubBackend:
+    """Deterministic local backend: echoes the digest back as a canned summary, word by word."""
+
+    def stream(self, prompt: str, model: str) -> Iterator[str]:
+        digest = prompt.split("Digest:", 1)[-1].split("Notes:", 1)[0].strip()
+        text = f"[stub:{model}] Summary of {len(digest.splitlines())} digest lines.\n\n{digest}"
+        for word in text.split(" "):
+            yield word + " "
+
+def _default_backend():
+    return StubBackend() if BACKEND == "stub" else GeminiBackend()
+
+# ------------------------------ Client ------------------------------
+
+def prompt_key(prompt: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\x1f{prompt}".encode("utf-8")).hexdigest()
+
+class GeminiClient:
     """
-    Send a compact prompt with conflict/utilization tables (as CSV snippets).
+    Reusable LLM client with a response cache keyed by sha256(model, prompt).
+
+    Responses are kept in a small in-memory LRU and, unless `cache_dir` is
+    False, as text files under CREDO_LLM_CACHE_DIR so identical prompts
+    across sessions never hit the API twice. stream() yields text as it
+    arrives; only complete responses are cached.
     """
-    init_gemini()
-    model = genai.GenerativeModel(MODEL_NAME)
 
-    # Keep prompt compact
-    def head_csv(df, n=50):
-        if df is None or df.empty:
-            return "(none)"
-        return df.head(n).to_csv(index=False)
+    def __init__(self, model: str = MODEL_NAME, backend=None, cache_dir=None, cache_size: int = 32):
+        self.model = model
+        self.backend = backend or _default_backend()
+        self.cache_dir = None if cache_dir is False else Path(cache_dir or RESPONSE_CACHE_DIR)
+        self.cache_size = cache_size
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
 
-    prompt = f"""
-You are assisting with campus instructional space scheduling QA.
+    def cached(self, prompt: str) -> Optional[str]:
+        key = prompt_key(prompt, self.model)
+        hit = self._memo.get(key)
+        if hit is None and self.cache_dir is not None:
+            try:
+                hit = (self.cache_dir / f"{key}.txt").read_text("utf-8")
+            except Exception:
+                hit = None
+        if hit is not None:
+            self._remember(key, hit)
+        return hit
 
-Room conflicts (top rows):
-{head_csv(room_conflicts_df)}
+    def _remember(self, key: str, text: str) -> None:
+        self._memo[key] = text
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.cache_size:
+            self._memo.popitem(last=False)
 
-Instructor conflicts (top rows):
-{head_csv(instructor_conflicts_df)}
+    def stream(self, prompt: str) -> Iterator[str]:
+        hit = self.cached(prompt)
+        if hit is not None:
+            yield hit
+            return
+        parts: List[str] = []
+        for text in self.backend.stream(prompt, self.model):
+            parts.append(text)
+            yield text
+        text = "".join(parts)
+        if not text:
+            return
+        key = prompt_key(prompt, self.model)
+        self._remember(key, text)
+        if self.cache_dir is not None:
+            try:
+                atomic_write(self.cache_dir / f"{key}.txt", text.encode("utf-8"))
+            except OSError:
+                pass
 
-Room utilization (top rows):
-{head_csv(utilization_df)}
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+_CLIENT: Optional[GeminiClient] = None
+
+def get_client() -> GeminiClient:
+    """Process-wide client for MODEL_NAME on the CREDO_LLM_BACKEND backend."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = GeminiClient()
+    return _CLIENT
+
+# ------------------------------ Digest ------------------------------
+
+def _top_counts(df: Optional[pd.DataFrame], col: str, n: int) -> List[str]:
+    if df is None or df.empty or col not in df.columns:
+        return []
+    vc = df[col].value_counts().head(n)
+    return [f"{k}: {v}" for k, v in vc.items()]
+
+def _util_lines(util: Optional[pd.DataFrame], n: int) -> List[str]:
+    if util is None or util.empty or "utilization_pct" not in util.columns:
+        return []
+    u = util["utilization_pct"].astype(float)
+    q = u.quantile([0.1, 0.25, 0.5, 0.75, 0.9]).round(1)
+    bands = pd.cut(u, [-0.01, 0, 25, 50, 75, 100, float("inf")],
+                   labels=["0%", "0-25%", "25-50%", "50-75%", "75-100%", ">100%"]).value_counts(sort=False)
+    lines = [
+        f"rooms: {len(u)}, mean {u.mean():.1f}%, p10/p25/p50/p75/p90: " + "/".join(f"{v:g}" for v in q),
+        "rooms by band: " + ", ".join(f"{k} {v}" for k, v in bands.items()),
+    ]
+    top = util.nlargest(n, "utilization_pct")
+    lines += [f"busiest {r.Location}: {r.utilization_pct:.1f}%" for r in top.itertuples()]
+    idle = util[u > 0].nsmallest(n, "utilization_pct")
+    lines += [f"least used {r.Location}: {r.utilization_pct:.1f}%" for r in idle.itertuples()]
+    return lines
+
+def conflict_digest(room_conflicts_df, instructor_conflicts_df, utilization_df,
+                    token_budget: int = DIGEST_TOKEN_BUDGET) -> str:
+    """
+    Statistical digest of the analysis tables for the prompt: conflict
+    totals, top conflicting rooms/instructors/days and the utilization
+    distribution. Ranked lists are shortened until the text fits
+    `token_budget` (estimated at CHARS_PER_TOKEN characters per token).
+    """
+    def render(n: int) -> str:
+        rc, ic = room_conflicts_df, instructor_conflicts_df
+        sections = [
+            ("Totals", [
+                f"room conflicts: {0 if rc is None else len(rc)}",
+                f"instructor conflicts: {0 if ic is None else len(ic)}",
+            ]),
+            ("Top conflicting rooms", _top_counts(rc, "Location", n)),
+            ("Room conflicts by day", _top_counts(rc, "Day", 7)),
+            ("Top conflicting instructors", _top_counts(ic, "Instructor", n)),
+            ("Utilization", _util_lines(utilization_df, n)),
+        ]
+        return "\n".join(f"{title}:\n" + "\n".join(f"- {l}" for l in lines)
+                         for title, lines in sections if lines)
+
+    limit = token_budget * CHARS_PER_TOKEN
+    n = 15
+    text = render(n)
+    while len(text) > limit and n > 1:
+        n = max(1, n // 2)
+        text = render(n)
+    if len(text) > limit:
+        # Drop whole lines, never half a row
+        cut = text.rfind("\n", 0, limit + 1)
+        text = text[:cut] if cut > 0 else text[:limit]
+    return text
+
+def build_prompt(digest: str, extra_notes: str = "") -> str:
+    return f"""
+You are assisting with campus instructional space scheduling QA.
+
+Digest:
+{digest}
 
 Notes:
 {extra_notes}
@@ -51,5 +227,18 @@ Tasks:
 3) Call out any data hygiene issues you infer (missing times, ambiguous days).
 Make it concise and skimmable.
 """
-    resp = model.generate_content(prompt)
-    return resp.text or "(no response)"
+
+def stream_conflicts_summary(room_conflicts_df, instructor_conflicts_df, utilization_df, extra_notes="",
+                             client: Optional[GeminiClient] = None) -> Iterator[str]:
+    """Summary text chunks as they arrive; pass to st.write_stream."""
+    prompt = build_prompt(conflict_digest(room_conflicts_df, instructor_conflicts_df, utilization_df), extra_notes)
+    return (client or get_client()).stream(prompt)
+
+def summarize_conflicts_with_gemini(room_conflicts_df, instructor_conflicts_df, utilization_df, extra_notes="",
+                                    client: Optional[GeminiClient] = None):
+    """
+    Send a compact statistical digest of the conflict/utilization tables.
+    """
+    text = "".join(stream_conflicts_summary(room_conflicts_df, instructor_conflicts_df, utilization_df,
+                                            extra_notes, client))
+    return text or "(no response)"
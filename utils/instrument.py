@@ -0,0 +1,375 @@
+# utils/instrument.py
+"""
+Stage-level timing and memory instrumentation.
+
+Entry points in ingestion, transformation, analysis and reporting are
+wrapped with @instrumented(stage). When instrumentation is off (the
+default) the wrapper is a single flag check before calling through. When
+on, each call produces one record with wall time, a memory measure and
+input/output row counts; records are kept in memory for the sidebar panel
+and appended as JSON lines to CREDO_INSTRUMENT_LOG when that is set.
+
+Memory is process-wide in both modes. In "rss" mode a record's
+rss_hwm_growth_mb is how far the stage raised the process's peak RSS,
+which is 0 when it fit under an earlier peak, not the stage's own peak.
+In "tracemalloc" mode peak_mb is the stage's allocation peak above its
+starting point. tracemalloc has one peak counter, so only one thread
+measures at a time: while a stage on one thread holds it, stages on other
+threads record peak_mb as None, and the holder's peak includes what those
+threads allocate meanwhile (e.g. merge_course_schedules's sheet workers).
+
+The environment sets the server-wide default. A Streamlit session can
+override it (and arm the profiler) for its own calls only: its
+SessionOptions are bound to the thread running its script.
+
+    CREDO_INSTRUMENT=1             # time + growth of the process peak RSS
+    CREDO_INSTRUMENT=tracemalloc   # time + exact Python allocation peaks (slower)
+    CREDO_INSTRUMENT_LOG=path.jsonl
+"""
+from __future__ import annotations
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+    _HAS_RESOURCE = True
+except ImportError:  # Windows
+    resource = None
+    _HAS_RESOURCE = False
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+MEMORY_MODES = ("rss", "tracemalloc", "off")
+# Record field holding each mode's measure
+MEMORY_FIELDS = {"rss": "rss_hwm_growth_mb", "tracemalloc": "peak_mb"}
+MAX_RECORDS = 2000
+PROFILE_LINES = 40
+
+_LOCK = threading.Lock()
+_RECORDS: "deque[Dict[str, Any]]" = deque(maxlen=MAX_RECORDS)
+_PROCESS_RUN_ID = uuid.uuid4().hex[:12]
+# Thread measuring tracemalloc peaks; see the module docstring
+_TRACE_OWNER: Optional[int] = None
+
+
+class _Local(threading.local):
+    # Class defaults: a missing per-thread value is a plain lookup, not a caught AttributeError
+    run_id: Optional[str] = None
+    stack: "Optional[List[_Frame]]" = None
+    options: "Optional[SessionOptions]" = None
+
+
+_local = _Local()
+
+
+class _Config:
+    def __init__(self):
+        mode = os.getenv("CREDO_INSTRUMENT", "").strip().lower()
+        self.enabled = mode not in ("", "0", "false", "off", "no")
+        self.memory = "tracemalloc" if mode == "tracemalloc" else "rss"
+        self.log_path = os.getenv("CREDO_INSTRUMENT_LOG") or None
+        self.profile_target: Optional[str] = None
+
+
+class SessionOptions:
+    """One session's overrides: `enabled` (None follows the server default) and an armed profiler target."""
+    __slots__ = ("enabled", "profile_target")
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = enabled
+        self.profile_target: Optional[str] = None
+
+
+_CONFIG = _Config()
+# name -> stage for every wrapped function, for pickers in the UI
+REGISTRY: Dict[str, str] = {}
+
+# ------------------------------ Configuration ------------------------------
+
+def configure(enabled: Optional[bool] = None, memory: Optional[str] = None, log_path=None) -> None:
+    """Turn recording on/off, pick the memory measure and the JSON-lines sink (False clears it)."""
+    if memory is not None:
+        if memory not in MEMORY_MODES:
+            raise ValueError(f"memory must be one of {MEMORY_MODES}")
+        _CONFIG.memory = memory
+    if log_path is not None:
+        _CONFIG.log_path = str(log_path) if log_path else None
+    if enabled is not None:
+        _CONFIG.enabled = bool(enabled)
+    if _CONFIG.enabled and _CONFIG.memory == "tracemalloc" and tracemalloc is not None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+def bind_session(options: Optional[SessionOptions]) -> None:
+    """Apply `options` to calls made on this thread (None: server-wide settings only)."""
+    _local.options = options
+
+def current_session() -> Optional[SessionOptions]:
+    return _local.options
+
+def is_enabled() -> bool:
+    opts = _local.options
+    return _CONFIG.enabled if opts is None or opts.enabled is None else opts.enabled
+
+def set_run_id(run_id: Optional[str]) -> None:
+    """Tag records from this thread (e.g. one Streamlit session) with `run_id`."""
+    _local.run_id = run_id
+
+def current_run_id() -> str:
+    return _local.run_id or _PROCESS_RUN_ID
+
+def profile_next(name: Optional[str]) -> None:
+    """
+    Capture a cProfile of the next call to the wrapped function `name`
+    (None disarms): in this thread's session when one is bound, else in
+    any thread.
+    """
+    if name is not None and name not in REGISTRY:
+        raise KeyError(f"Not an instrumented function: {name}")
+    opts = current_session()
+    if opts is not None:
+        opts.profile_target = name
+    else:
+        _CONFIG.profile_target = name
+
+# ------------------------------ Measuring ------------------------------
+
+def _rows(value: Any) -> Optional[int]:
+    """Row count of a frame, or of the frames in a list/tuple/plain dict; None otherwise."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        parts = [_rows(v) for v in value]
+    elif isinstance(value, dict):
+        # Only plain dicts: lazy mappings (workbooks) would parse on access
+        parts = [_rows(v) for v in value.values()]
+    else:
+        return None
+    parts = [p for p in parts if p is not None]
+    return sum(parts) if parts else None
+
+def _rows_in(args: tuple, kwargs: Dict[str, Any]) -> Optional[int]:
+    return _rows(list(args) + list(kwargs.values()))
+
+def _max_rss_mb() -> float:
+    if not _HAS_RESOURCE:
+        return 0.0
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+class _Frame:
+    __slots__ = ("mem_base", "mem_peak", "owns_trace")
+
+def _stack() -> List[_Frame]:
+    stack = _local.stack
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def _claim_trace(frame: _Frame) -> bool:
+    """True when this thread measures tracemalloc peaks, claiming it for `frame` if free."""
+    global _TRACE_OWNER
+    me = threading.get_ident()
+    with _LOCK:
+        frame.owns_trace = _TRACE_OWNER is None
+        if frame.owns_trace:
+            _TRACE_OWNER = me
+        return _TRACE_OWNER == me
+
+def _release_trace(frame: _Frame) -> None:
+    global _TRACE_OWNER
+    if frame.owns_trace:
+        with _LOCK:
+            _TRACE_OWNER = None
+
+def _mem_enter(frame: _Frame, stack: List[_Frame], mode: str) -> None:
+    frame.owns_trace = False
+    if mode == "tracemalloc" and tracemalloc is not None and tracemalloc.is_tracing():
+        if not _claim_trace(frame):
+            frame.mem_base = frame.mem_peak = None
+            return
+        # Fold the enclosing stage's peak so far into its frame before resetting
+        cur, peak = tracemalloc.get_traced_memory()
+        if stack and stack[-1].mem_peak is not None:
+            stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+        tracemalloc.reset_peak()
+        frame.mem_base = frame.mem_peak = cur
+    elif mode == "rss":
+        frame.mem_base = frame.mem_peak = _max_rss_mb()
+    else:
+        frame.mem_base = frame.mem_peak = None
+
+def _mem_exit(frame: _Frame, stack: List[_Frame], mode: str) -> Optional[float]:
+    if frame.mem_base is None:
+        return None
+    try:
+        if mode == "tracemalloc" and tracemalloc is not None and tracemalloc.is_tracing():
+            peak = max(frame.mem_peak, tracemalloc.get_traced_memory()[1])
+            if stack and stack[-1].mem_peak is not None:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+            tracemalloc.reset_peak()
+            return round((peak - frame.mem_base) / 2**20, 3)
+        if mode == "rss":
+            # Growth of the process high-water mark; 0 when the stage fit under an earlier peak
+            return round(_max_rss_mb() - frame.mem_base, 3)
+        return None
+    finally:
+        _release_trace(frame)
+
+def _emit(record: Dict[str, Any]) -> None:
+    with _LOCK:
+        _RECORDS.append(record)
+        path = _CONFIG.log_path
+        if path:
+            try:
+                with open(path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(record, default=str) + "\n")
+            except OSError:
+                pass
+
+def _profile_text(prof: cProfile.Profile) -> str:
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return buf.getvalue()
+
+def _record_call(fn: Callable, stage: str, name: str, args: tuple, kwargs: Dict[str, Any]):
+    stack = _stack()
+    mode = _CONFIG.memory
+    frame = _Frame()
+    prof = None
+    opts = current_session()
+    if opts is not None and opts.profile_target == name:
+        opts.profile_target = None
+        prof = cProfile.Profile()
+    elif _CONFIG.profile_target == name:
+        _CONFIG.profile_target = None
+        prof = cProfile.Profile()
+    record: Dict[str, Any] = {
+        "run_id": current_run_id(),
+        "stage": stage,
+        "name": name,
+        "depth": len(stack),
+        "started": time.time(),
+        "rows_in": _rows_in(args, kwargs),
+    }
+    _mem_enter(frame, stack, mode)
+    stack.append(frame)
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        if prof is not None:
+            out = prof.runcall(fn, *args, **kwargs)
+        else:
+            out = fn(*args, **kwargs)
+        ok = True
+        return out
+    finally:
+        record["seconds"] = round(time.perf_counter() - t0, 6)
+        stack.pop()
+        mem = _mem_exit(frame, stack, mode)
+        if mode in MEMORY_FIELDS:
+            record[MEMORY_FIELDS[mode]] = mem
+        record["memory"] = mode
+        record["rows_out"] = _rows(out) if ok else None
+        if ok and isinstance(out, (bytes, bytearray)):
+            record["bytes_out"] = len(out)
+        record["status"] = "ok" if ok else "error"
+        if prof is not None:
+            record["profile"] = _profile_text(prof)
+        _emit(record)
+
+def instrumented(stage: str, name: Optional[str] = None):
+    """Decorator recording each call of the wrapped function under `stage` when enabled."""
+    def wrap(fn: Callable) -> Callable:
+        label = name or fn.__name__
+        REGISTRY[label] = stage
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            opts = _local.options
+            if not (_CONFIG.enabled if opts is None or opts.enabled is None else opts.enabled):
+                return fn(*args, **kwargs)
+            return _record_call(fn, stage, label, args, kwargs)
+        return wrapper
+    return wrap
+
+# ------------------------------ Reading records ------------------------------
+
+def records(run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    with _LOCK:
+        out = list(_RECORDS)
+    return out if run_id is None else [r for r in out if r["run_id"] == run_id]
+
+def records_frame(run_id: Optional[str] = None) -> pd.DataFrame:
+    cols = ["run_id", "stage", "name", "depth", "seconds", *MEMORY_FIELDS.values(), "rows_in", "rows_out", "status", "started"]
+    rows = records(run_id)
+    df = pd.DataFrame([{c: r.get(c) for c in cols} for r in rows], columns=cols)
+    # Only the memory measure(s) actually recorded
+    df = df.drop(columns=[c for c in MEMORY_FIELDS.values() if not any(c in r for r in rows)])
+    df["started"] = pd.to_datetime(df["started"], unit="s")
+    return df
+
+def last_profile(run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    for r in reversed(records(run_id)):
+        if "profile" in r:
+            return r
+    return None
+
+def clear(run_id: Optional[str] = None) -> None:
+    with _LOCK:
+        keep = [] if run_id is None else [r for r in _RECORDS if r["run_id"] != run_id]
+        _RECORDS.clear()
+        _RECORDS.extend(keep)
+
+# ------------------------------ Streamlit panel ------------------------------
+
+def timing_sidebar() -> None:
+    """
+    Collapsible sidebar panel: recording toggle, one-shot profiler and the
+    session's stage timings. Call at the top of every page; it tags this
+    session's records and binds its options, so the toggle and profiler
+    only affect this session. Timings of a run show on the next rerun.
+    """
+    import streamlit as st
+
+    run_id = st.session_state.setdefault("INSTRUMENT_RUN_ID", uuid.uuid4().hex[:12])
+    set_run_id(run_id)
+    opts = st.session_state.setdefault("INSTRUMENT_OPTIONS", SessionOptions())
+    bind_session(opts)
+    with st.sidebar.expander("⏱ Stage timings", expanded=False):
+        # Seeded once from the server default; afterwards this session's own choice
+        on = st.checkbox("Record stage timings", value=_CONFIG.enabled, key="instrument_enabled")
+        opts.enabled = on
+        if not on:
+            st.caption("Off: instrumented functions run with no overhead.")
+            return
+        target = st.selectbox("Profile next call of", ["(none)"] + sorted(REGISTRY), key="instrument_profile")
+        if st.button("Arm profiler", key="instrument_arm"):
+            profile_next(None if target == "(none)" else target)
+        df = records_frame(run_id)
+        if df.empty:
+            st.caption(f"Run {run_id}: no stages recorded yet.")
+            return
+        top = df[df["depth"] == 0]
+        st.caption(f"Run {run_id}: {len(df)} calls, {top['seconds'].sum():.2f}s at top level")
+        st.dataframe(df.drop(columns=["run_id"]).iloc[::-1], hide_index=True, use_container_width=True)
+        prof = last_profile(run_id)
+        if prof is not None:
+            st.markdown(f"**Profile: {prof['name']}** ({prof['seconds']:.3f}s)")
+            st.code(prof["profile"], language=None)
+        if st.button("Clear timings", key="instrument_clear"):
+            clear(run_id)
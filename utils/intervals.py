@@ -0,0 +1,51 @@
+# utils/intervals.py
+from __future__ import annotations
+from typing import Tuple
+import numpy as np
+
+# ------------------------------ Overlap engine ------------------------------
+
+def overlap_pairs(group: np.ndarray, start: np.ndarray, end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find every pair of intervals that overlap within the same group.
+
+    `group`, `start` and `end` are equal-length integer arrays (group codes and
+    interval bounds, e.g. minutes since midnight). Within each group, intervals
+    are ordered by start; a later interval B overlaps an earlier interval A when
+    B.start < A.end. Returns positional index arrays (a, b) into the inputs,
+    ordered by group, then A's start, then B's start.
+    """
+    group = np.asarray(group, dtype=np.int64)
+    start = np.asarray(start, dtype=np.int64)
+    end = np.asarray(end, dtype=np.int64)
+    n = len(group)
+    empty = np.empty(0, dtype=np.int64)
+    if n < 2:
+        return empty, empty
+
+    # Rank-compress bounds so group-offset keys stay small regardless of units
+    bounds, ranks = np.unique(np.concatenate([start, end]), return_inverse=True)
+    s_rank = ranks[:n].astype(np.int64)
+    e_rank = ranks[n:].astype(np.int64)
+    span = np.int64(len(bounds) + 1)
+
+    order = np.lexsort((start, group))
+    g_sorted = group[order]
+    _, g_dense = np.unique(g_sorted, return_inverse=True)
+    g_dense = g_dense.astype(np.int64)
+
+    s_key = g_dense * span + s_rank[order]
+    e_key = g_dense * span + e_rank[order]
+
+    # For each A, partners are the sorted entries after it that start before A ends
+    pos = np.arange(n, dtype=np.int64)
+    hi = np.searchsorted(s_key, e_key, side="left")
+    counts = np.maximum(hi - pos - 1, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return empty, empty
+
+    a_sorted = np.repeat(pos, counts)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    b_sorted = a_sorted + 1 + (np.arange(total, dtype=np.int64) - offsets)
+    return order[a_sorted], order[b_sorted]
@@ -0,0 +1,95 @@
+# utils/layouts.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .parse_cache import DEFAULT_CACHE_DIR, atomic_write
+
+DEFAULT_LAYOUT_DIR = os.getenv("CREDO_LAYOUT_DIR", os.path.join(DEFAULT_CACHE_DIR, "layouts"))
+
+
+def normalize_header(columns: Iterable) -> List[str]:
+    return [str(c).strip().lower() for c in columns]
+
+
+def header_key(kind: str, columns: Iterable) -> str:
+    """Stable id of a source layout: hash of its kind and normalized header row."""
+    h = hashlib.sha1(kind.encode("utf-8"))
+    for c in normalize_header(columns):
+        h.update(b"\x1f" + c.encode("utf-8"))
+    return h.hexdigest()
+
+
+class LayoutStore:
+    """
+    Persisted source-layout profiles, one JSON file per header hash.
+
+    A profile records how a header row was resolved: role -> column mapping
+    plus the dtype to parse each mapped column with. Layouts repeat term
+    after term, so a hit skips column resolution and lets ingestion read
+    only the mapped columns with declared dtypes. Profiles are also kept in
+    memory for the life of the process.
+    """
+
+    def __init__(self, root: Optional[str] = None, persist: bool = True):
+        self.root = Path(root or DEFAULT_LAYOUT_DIR)
+        self.persist = persist
+        self._memo: Dict[str, Dict] = {}
+
+    def get(self, kind: str, columns: Iterable) -> Optional[Dict]:
+        columns = list(columns)
+        key = header_key(kind, columns)
+        prof = self._memo.get(key)
+        if prof is None and self.persist:
+            try:
+                prof = json.loads((self.root / f"{key}.json").read_text("utf-8"))
+            except Exception:
+                prof = None
+            if prof is not None:
+                self._memo[key] = prof
+        if prof is None:
+            return None
+        return _rebind(prof, columns)
+
+    def put(self, kind: str, columns: Iterable, mapping: Dict[str, Optional[str]], dtypes: Dict[str, str]) -> Dict:
+        columns = list(columns)
+        key = header_key(kind, columns)
+        prof = {
+            "kind": kind,
+            "header": normalize_header(columns),
+            "mapping": {k: (str(v) if v is not None else None) for k, v in mapping.items()},
+            "dtypes": {str(k): v for k, v in dtypes.items()},
+        }
+        self._memo[key] = prof
+        if self.persist:
+            try:
+                atomic_write(self.root / f"{key}.json", json.dumps(prof, indent=1).encode("utf-8"))
+            except OSError:
+                # A read-only cache dir only costs re-resolution next time
+                pass
+        return prof
+
+
+def _rebind(prof: Dict, columns: List) -> Dict:
+    """Point a stored profile at the given header's own column labels."""
+    by_norm = {str(c).strip().lower(): c for c in columns}
+    rebind = lambda c: by_norm.get(str(c).strip().lower()) if c is not None else None
+    return {
+        **prof,
+        "mapping": {k: rebind(v) for k, v in prof["mapping"].items()},
+        "dtypes": {rebind(k): v for k, v in prof["dtypes"].items() if rebind(k) is not None},
+    }
+
+
+_DEFAULT: Optional[LayoutStore] = None
+
+
+def get_layout_store() -> LayoutStore:
+    """Process-wide store under CREDO_LAYOUT_DIR (default <parse cache>/layouts)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = LayoutStore(persist=os.getenv("CREDO_LAYOUT_PROFILES", "1") != "0")
+    return _DEFAULT
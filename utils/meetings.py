@@ -0,0 +1,188 @@
+# utils/meetings.py
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from .fingerprint import frame_fingerprint
+from .instrument import instrumented
+from .timeparse import NO_TIME, parse_date_column, schedule_minutes
+from .transformations import DAY_ORDER
+
+# Day-number bounds for sections without a start/end date (open-ended)
+OPEN_START = np.iinfo(np.int32).min
+OPEN_END = np.iinfo(np.int32).max
+
+_CACHE_SIZE = 8
+_CACHE: "OrderedDict[str, MeetingTable]" = OrderedDict()
+
+# ------------------------------ Meeting table ------------------------------
+
+@dataclass(frozen=True)
+class MeetingTable:
+    """
+    One row per (section, meeting day), stored as parallel NumPy arrays.
+
+    `section` is the row position in the source schedule; `day`, `location`
+    and `instructor` are integer codes into the matching label arrays, with -1
+    for a missing day or a blank location/instructor. Start/end are int16
+    minutes since midnight (NO_TIME when unknown). date_start/date_end are
+    the section's inclusive date range as int32 days since 1970-01-01,
+    OPEN_START/OPEN_END when the schedule gives no date.
+    """
+    fingerprint: str
+    section: np.ndarray
+    day: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    location: np.ndarray
+    instructor: np.ndarray
+    course_ids: np.ndarray
+    day_labels: np.ndarray
+    locations: np.ndarray
+    instructors: np.ndarray
+    date_start: np.ndarray
+    date_end: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.section)
+
+    @property
+    def has_time(self) -> np.ndarray:
+        return (self.start != NO_TIME) & (self.end != NO_TIME)
+
+    @property
+    def hours(self) -> np.ndarray:
+        dur = np.clip(self.end.astype(np.int32) - self.start.astype(np.int32), 0, None) / 60.0
+        return np.where(self.has_time, dur, 0.0)
+
+    def dates_overlap(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Whether meetings a[i] and b[i] share at least one date of their ranges."""
+        return np.maximum(self.date_start[a], self.date_start[b]) <= np.minimum(self.date_end[a], self.date_end[b])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Meeting-level view with readable labels (one row per section and day)."""
+        return pd.DataFrame({
+            "CourseID": self.course_ids[self.section],
+            "Day": _labels(self.day, self.day_labels),
+            "Start Min": self.start,
+            "End Min": self.end,
+            "Location": _labels(self.location, self.locations),
+            "Instructor": _labels(self.instructor, self.instructors),
+        })
+
+def _labels(codes: np.ndarray, uniques: np.ndarray) -> np.ndarray:
+    out = np.full(len(codes), None, dtype=object)
+    ok = codes >= 0
+    out[ok] = uniques[codes[ok]]
+    return out
+
+def _day_chars(days: pd.Series):
+    """
+    Split each Days string into single characters in one columnar pass.
+    Returns (row_pos, chars): the source row position of every character and
+    the characters themselves as a fixed-width unicode array.
+    """
+    s = days.astype(object).fillna("").astype(str)
+    lens = s.str.len().to_numpy(dtype=np.int64)
+    joined = "".join(s.tolist())
+    # UTF-32 code units line up 1:1 with numpy's '<U1' items
+    chars = np.frombuffer(joined.encode("utf-32-le"), dtype="<U1")
+    row_pos = np.repeat(np.arange(len(s), dtype=np.int64), lens)
+    return row_pos, chars
+
+def _day_codes(chars: np.ndarray):
+    # DAY_ORDER letters get codes 0-6; any other characters found in Days follow
+    extra = sorted(set(np.unique(chars).tolist()) - set(DAY_ORDER))
+    labels = np.array(list(DAY_ORDER) + extra, dtype=object)
+    if not len(chars):
+        return np.empty(0, dtype=np.int8), labels
+    lookup = {c: i for i, c in enumerate(labels)}
+    uniq, inv = np.unique(chars, return_inverse=True)
+    codes = np.array([lookup[c] for c in uniq.tolist()], dtype=np.int8)[inv]
+    return codes, labels
+
+def _key_codes(values: pd.Series):
+    """Sorted factorize codes, with -1 for NaN or blank keys."""
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.is_monotonic_increasing:
+        # Compact schedules already carry sorted integer codes
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories.to_numpy()
+    else:
+        codes, uniques = pd.factorize(values, sort=True)
+    uniques = np.asarray(uniques, dtype=object)
+    blank = np.array([str(u).strip() == "" for u in uniques], dtype=bool)
+    codes = codes.astype(np.int32)
+    if blank.any():
+        codes[(codes >= 0) & blank[np.maximum(codes, 0)]] = -1
+    return codes, uniques
+
+def _date_days(course_df: pd.DataFrame, col: str, missing: int) -> np.ndarray:
+    """int32 days since epoch for a date column, `missing` where blank or absent."""
+    if col not in course_df.columns:
+        return np.full(len(course_df), missing, dtype=np.int32)
+    d = parse_date_column(course_df[col])
+    days = d.astype(np.int64)
+    return np.where(np.isnat(d), missing, days).astype(np.int32)
+
+@instrumented("analysis")
+def build_meeting_table(course_df: pd.DataFrame, fingerprint: str = "") -> MeetingTable:
+    n = len(course_df)
+    if "Start Min" in course_df.columns and "End Min" in course_df.columns:
+        start = course_df["Start Min"].to_numpy(dtype=np.int16)
+        end = course_df["End Min"].to_numpy(dtype=np.int16)
+    else:
+        mins = schedule_minutes(course_df["Start Time"], course_df["End Time"])
+        start = mins["Start Min"].to_numpy(dtype=np.int16)
+        end = mins["End Min"].to_numpy(dtype=np.int16)
+
+    days = course_df["Days"] if "Days" in course_df.columns else pd.Series([""] * n, index=course_df.index)
+    row_pos, chars = _day_chars(days)
+    day_codes, day_labels = _day_codes(chars)
+
+    # Sections with no meeting days keep a single meeting with day -1
+    lens = np.bincount(row_pos, minlength=n) if n else np.zeros(0, dtype=np.int64)
+    dayless = np.flatnonzero(lens == 0)
+    section = np.concatenate([row_pos, dayless])
+    day = np.concatenate([day_codes, np.full(len(dayless), -1, dtype=np.int8)])
+    order = np.argsort(section, kind="stable")
+    section = section[order].astype(np.int32)
+    day = day[order]
+
+    d_start = _date_days(course_df, "Start Date", OPEN_START)
+    d_end = _date_days(course_df, "End Date", OPEN_END)
+
+    loc_codes, locations = _key_codes(course_df["Location"] if "Location" in course_df.columns else pd.Series([""] * n))
+    ins_codes, instructors = _key_codes(course_df["Instructor"] if "Instructor" in course_df.columns else pd.Series([""] * n))
+
+    return MeetingTable(
+        fingerprint=fingerprint,
+        section=section,
+        day=day,
+        start=start[section],
+        end=end[section],
+        location=loc_codes[section],
+        instructor=ins_codes[section],
+        course_ids=course_df["CourseID"].to_numpy(dtype=object),
+        day_labels=day_labels,
+        locations=locations,
+        instructors=instructors,
+        date_start=d_start[section],
+        date_end=d_end[section],
+    )
+
+def get_meeting_table(course_df: pd.DataFrame) -> MeetingTable:
+    """
+    Return the meeting table for a schedule, reusing a cached one when the
+    schedule's content fingerprint has been seen before.
+    """
+    fp = frame_fingerprint(course_df)
+    hit = _CACHE.get(fp)
+    if hit is not None:
+        _CACHE.move_to_end(fp)
+        return hit
+    table = build_meeting_table(course_df, fingerprint=fp)
+    _CACHE[fp] = table
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return table
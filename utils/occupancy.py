@@ -0,0 +1,335 @@
+# utils/occupancy.py
+from __future__ import annotations
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+
+from .analysis import _day_number, term_bounds
+from .instrument import instrumented
+from .meetings import MeetingTable, get_meeting_table
+from .timeparse import parse_time_value
+
+SLOT_MINUTES = 5
+MINUTES_PER_DAY = 24 * 60
+
+# Default prime-time window: weekdays 8am-5pm
+PRIME_DAYS = "MTWRF"
+PRIME_START = 8 * 60
+PRIME_END = 17 * 60
+
+_CACHE_SIZE = 4
+_CACHE: "OrderedDict[tuple, Occupancy]" = OrderedDict()
+
+Clock = Union[int, str]
+
+# ------------------------------ Occupancy grid ------------------------------
+
+@dataclass(frozen=True)
+class Occupancy:
+    """
+    Dense rooms x days x time-slot occupancy: grid[r, d, s] is the share of
+    the term during which some meeting in room r on day d overlaps slot s
+    ([s*slot, (s+1)*slot) minutes). Overlapping sections mark the same
+    slots once, so sums over the grid are deduplicated room time. The grid
+    is boolean when every section meets the whole term (or for an as_of
+    snapshot) and float32 otherwise.
+    """
+    rooms: np.ndarray
+    day_labels: np.ndarray
+    slot_minutes: int
+    grid: np.ndarray
+
+    @property
+    def slot_hours(self) -> float:
+        return self.slot_minutes / 60.0
+
+    def day_index(self, days: Optional[str] = None) -> np.ndarray:
+        if days is None:
+            return np.arange(len(self.day_labels))
+        pos = {d: i for i, d in enumerate(self.day_labels)}
+        return np.array(sorted({pos[d] for d in days if d in pos}), dtype=np.int64)
+
+    def slot_range(self, start: Clock, end: Clock) -> slice:
+        """Slots fully inside [start, end), given as minutes or clock text."""
+        s, e = _minutes(start), _minutes(end)
+        return slice(-(-s // self.slot_minutes), e // self.slot_minutes)
+
+def _minutes(value: Clock) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    start, _, ok = parse_time_value(value)
+    if not ok or start is None:
+        raise ValueError(f"Unrecognized time of day: {value!r}")
+    return start
+
+def meeting_slots(meetings: MeetingTable, rooms: np.ndarray, slot_minutes: int = SLOT_MINUTES,
+                  active: Optional[np.ndarray] = None):
+    """
+    Grid coordinates of every timed meeting in a listed room: (meeting
+    index, room row, day, first slot, end slot), slots covering any part
+    of [start, end). `active` optionally masks meetings to include.
+    """
+    m = meetings
+    row_of_code = pd.Index(rooms).get_indexer(m.locations) if len(m.locations) else np.empty(0, dtype=np.int64)
+    ok = (m.location >= 0) & (m.day >= 0) & m.has_time & (m.end > m.start)
+    if active is not None:
+        ok &= active
+    idx = np.flatnonzero(ok)
+    row = row_of_code[m.location[idx]] if len(idx) else np.empty(0, dtype=np.int64)
+    keep = row >= 0
+    idx, row = idx[keep], row[keep].astype(np.int64)
+    s0 = np.clip(m.start[idx].astype(np.int64), 0, MINUTES_PER_DAY) // slot_minutes
+    s1 = -(-np.clip(m.end[idx].astype(np.int64), 0, MINUTES_PER_DAY) // slot_minutes)
+    return idx, row, m.day[idx].astype(np.int64), s0, s1
+
+def occupancy_counts(meetings: MeetingTable, rooms: np.ndarray, slot_minutes: int = SLOT_MINUTES,
+                     active: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Number of meetings covering each (room, day, slot), scattered in one
+    vectorized pass: +1 at a meeting's first slot and -1 past its last in
+    a difference array, then a cumulative sum along the slot axis.
+    """
+    if MINUTES_PER_DAY % slot_minutes:
+        raise ValueError("slot_minutes must divide a day evenly.")
+    n_days, n_slots = len(meetings.day_labels), MINUTES_PER_DAY // slot_minutes
+    _, row, day, s0, s1 = meeting_slots(meetings, rooms, slot_minutes, active)
+    # One extra slot column absorbs the -1 of meetings ending at midnight
+    width = n_slots + 1
+    base = (row * n_days + day) * width
+    diff = np.zeros(len(rooms) * n_days * width, dtype=np.int32)
+    np.add.at(diff, base + s0, 1)
+    np.add.at(diff, base + s1, -1)
+    counts = np.cumsum(diff.reshape(len(rooms), n_days, width), axis=2, dtype=np.int32)[:, :, :n_slots]
+    return counts.astype(np.int16)
+
+def _room_rows(meetings: MeetingTable, rooms: Optional[Sequence]) -> np.ndarray:
+    rooms = np.asarray(meetings.locations if rooms is None else list(rooms), dtype=object)
+    if not pd.Index(rooms).is_unique:
+        raise ValueError("Occupancy rooms must be unique.")
+    return rooms
+
+def meets_on(meetings: MeetingTable, first_day: int, last_day: int) -> np.ndarray:
+    """Meetings whose section's date range shares a date with [first_day, last_day] (int days)."""
+    return (meetings.date_start <= last_day) & (meetings.date_end >= first_day)
+
+def date_periods(meetings: MeetingTable, term_start=None, term_end=None):
+    """
+    Split the term (see analysis.term_bounds) into spans over which the
+    same sections meet: [(active meeting mask, share of the term's days)].
+    One full-weight span when the schedule has no dates. build_occupancy
+    weights its grid by these spans without building one grid per span.
+    """
+    m = meetings
+    ts, te = term_bounds(m, term_start, term_end)
+    if ts is None:
+        return [(np.ones(len(m), dtype=bool), 1.0)]
+    lo = np.clip(m.date_start.astype(np.int64), ts, te + 1)
+    hi = np.clip(m.date_end.astype(np.int64) + 1, ts, te + 1)
+    bounds = np.unique(np.concatenate([[ts, te + 1], lo, hi]))
+    periods = []
+    for p0, p1 in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        # Every range starts and ends on a bound, so it covers a span fully or not at all
+        active = (lo <= p0) & (hi >= p1)
+        if active.any():
+            periods.append((active, (p1 - p0) / (te + 1 - ts)))
+    return periods
+
+def _term_share_grid(meetings: MeetingTable, rooms: np.ndarray, slot_minutes: int, ts: int, te: int) -> np.ndarray:
+    """
+    float32 grid of the share of the term's days [ts, te] on which some
+    meeting covers each (room, day, slot), in one pass over all meetings.
+
+    Within one (room, day), the meetings covering a slot only change at
+    meeting start and end slots, so the slot axis is cut into segments at
+    those edges. Each meeting is paired with the segments it spans, and a
+    segment's value is the length of the union of its meetings' date
+    ranges, swept in start-date order.
+    """
+    m = meetings
+    n_days, n_slots = len(m.day_labels), MINUTES_PER_DAY // slot_minutes
+    grid = np.zeros((len(rooms), n_days, n_slots), dtype=np.float32)
+    idx, row, day, s0, s1 = meeting_slots(m, rooms, slot_minutes)
+    span = te + 1 - ts
+    # Date ranges as [lo, hi) days from the term start, clipped to the term
+    lo = np.clip(m.date_start[idx].astype(np.int64), ts, te + 1) - ts
+    hi = np.clip(m.date_end[idx].astype(np.int64) + 1, ts, te + 1) - ts
+    live = hi > lo
+    if not live.any():
+        return grid
+    lo, hi, s0, s1 = lo[live], hi[live], s0[live], s1[live]
+    width = n_slots + 1
+    cell = row[live] * n_days + day[live]
+
+    edges = np.unique(np.concatenate([cell * width + s0, cell * width + s1]))
+    k0 = np.searchsorted(edges, cell * width + s0)
+    n = np.searchsorted(edges, cell * width + s1) - k0
+    # (meeting, segment) pairs: meeting i covers segments k0[i] .. k0[i] + n[i] - 1
+    pair = np.repeat(np.arange(len(n)), n)
+    seg = np.arange(len(pair)) - np.repeat(np.cumsum(n) - n, n) + k0[pair]
+    order = np.lexsort((lo[pair], seg))
+    seg, plo, phi = seg[order], lo[pair][order], hi[pair][order]
+    # Furthest date reached so far in the segment; the seg offset keeps
+    # segments apart, leaving a negative reach before each one's first pair
+    off = seg * (span + 1)
+    reach = np.concatenate([[-1], np.maximum.accumulate(off + phi)[:-1]]) - off
+    days = np.bincount(seg, weights=np.clip(phi - np.maximum(plo, reach), 0, None), minlength=len(edges))
+
+    segs = np.flatnonzero(days > 0)
+    first, stop = edges[segs] % width, edges[segs + 1] % width
+    lengths = stop - first
+    starts = (edges[segs] // width) * n_slots + first
+    flat = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+    grid.reshape(-1)[flat] = np.repeat(days[segs] / span, lengths)
+    return grid
+
+def build_occupancy(meetings: MeetingTable, rooms: Optional[Sequence] = None,
+                    slot_minutes: int = SLOT_MINUTES, term_start=None, term_end=None,
+                    as_of=None) -> Occupancy:
+    """
+    Occupancy grid from occupancy_counts. `rooms` fixes the row order (e.g.
+    campus Room IDs); meetings in other rooms are left out. By default
+    rows are the schedule's own locations.
+
+    Section date ranges count the same way as in utilization: a slot is
+    weighted by the share of the term's days on which some section meets
+    in it (the date_periods spans it is occupied in), so a half-term
+    section fills half of its slots. With `as_of`, the grid is instead
+    the week of that date: only sections meeting on it count, at full
+    weight.
+    """
+    rooms = _room_rows(meetings, rooms)
+    if MINUTES_PER_DAY % slot_minutes:
+        raise ValueError("slot_minutes must divide a day evenly.")
+    if as_of is not None:
+        day = _day_number(as_of)
+        grid = occupancy_counts(meetings, rooms, slot_minutes, meets_on(meetings, day, day)) > 0
+        return Occupancy(rooms=rooms, day_labels=meetings.day_labels, slot_minutes=slot_minutes, grid=grid)
+    ts, te = term_bounds(meetings, term_start, term_end)
+    if ts is None:
+        grid = occupancy_counts(meetings, rooms, slot_minutes) > 0
+    else:
+        lo = np.clip(meetings.date_start.astype(np.int64), ts, te + 1)
+        hi = np.clip(meetings.date_end.astype(np.int64) + 1, ts, te + 1)
+        whole = (lo == ts) & (hi == te + 1)
+        if np.all(whole | (hi <= lo)):
+            # Every section meets the whole term or not at all
+            grid = occupancy_counts(meetings, rooms, slot_minutes, whole) > 0
+        else:
+            grid = _term_share_grid(meetings, rooms, slot_minutes, ts, te)
+    return Occupancy(rooms=rooms, day_labels=meetings.day_labels, slot_minutes=slot_minutes, grid=grid)
+
+def get_occupancy(meetings: MeetingTable, rooms: Optional[Sequence] = None,
+                  slot_minutes: int = SLOT_MINUTES, term_start=None, term_end=None,
+                  as_of=None) -> Occupancy:
+    """build_occupancy, cached by meeting-table fingerprint, room list, slot size and dates."""
+    h = hashlib.sha1()
+    if rooms is not None:
+        for r in rooms:
+            h.update(repr(r).encode("utf-8") + b"\x1f")
+    key = (meetings.fingerprint, rooms is None, h.hexdigest(), slot_minutes,
+           str(term_start), str(term_end), str(as_of))
+    hit = _CACHE.get(key) if meetings.fingerprint else None
+    if hit is not None:
+        _CACHE.move_to_end(key)
+        return hit
+    occ = build_occupancy(meetings, rooms, slot_minutes, term_start, term_end, as_of)
+    if meetings.fingerprint:
+        _CACHE[key] = occ
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return occ
+
+# ------------------------------ Measures ------------------------------
+
+def occupied_hours(occ: Occupancy) -> pd.DataFrame:
+    """Weekly hours each room is in use, with overlapping sections counted once."""
+    slots = occ.grid.sum(axis=(1, 2), dtype=np.float64)
+    return pd.DataFrame({"Location": occ.rooms, "occupied_hours_per_week": slots * occ.slot_hours})
+
+def prime_time_utilization(occ: Occupancy, days: str = PRIME_DAYS,
+                           start: Clock = PRIME_START, end: Clock = PRIME_END) -> pd.DataFrame:
+    """Per-room occupied hours and share of the prime-time window (days x [start, end))."""
+    d, s = occ.day_index(days), occ.slot_range(start, end)
+    window = occ.grid[:, d, s]
+    capacity = window.shape[1] * window.shape[2]
+    used = window.sum(axis=(1, 2), dtype=np.float64)
+    return pd.DataFrame({
+        "Location": occ.rooms,
+        "prime_hours_per_week": used * occ.slot_hours,
+        "prime_utilization_pct": (used / capacity * 100.0) if capacity else np.zeros(len(used)),
+    })
+
+def _hourly(occ: Occupancy, grid: np.ndarray) -> np.ndarray:
+    """Mean over each hour's slots: (days, 24) occupancy share of `grid`'s rooms."""
+    per_hour = 60 // occ.slot_minutes if 60 % occ.slot_minutes == 0 else None
+    if per_hour is None:
+        raise ValueError("Hourly views need slot_minutes dividing 60.")
+    share = grid.mean(axis=0) if len(grid) else np.zeros(grid.shape[1:])
+    return share.reshape(share.shape[0], 24, per_hour).mean(axis=2)
+
+def hourly_occupancy(occ: Occupancy, days: Optional[str] = None) -> pd.DataFrame:
+    """Campus-wide % of rooms in use by hour of day (rows) and day (columns)."""
+    d = occ.day_index(days)
+    curve = _hourly(occ, occ.grid[:, d, :]) * 100.0
+    return pd.DataFrame(curve.T, index=pd.Index(range(24), name="Hour"), columns=list(occ.day_labels[d]))
+
+def heatmap_table(occ: Occupancy, days: Optional[str] = None, room=None) -> pd.DataFrame:
+    """
+    Heatmap-ready long table: one row per (Day, Hour) with the % of the
+    hour that rooms (or the single `room`) are occupied.
+    """
+    d = occ.day_index(days)
+    grid = occ.grid[:, d, :]
+    if room is not None:
+        hit = np.flatnonzero(occ.rooms == room)
+        if not len(hit):
+            raise KeyError(f"Unknown room: {room}")
+        grid = grid[hit]
+    pct = _hourly(occ, grid) * 100.0
+    return pd.DataFrame({
+        "Day": np.repeat(occ.day_labels[d], 24),
+        "Hour": np.tile(np.arange(24), len(d)),
+        "occupied_pct": pct.ravel(),
+    })
+
+@instrumented("analysis")
+def occupancy_utilization(
+    course_df: pd.DataFrame,
+    campus_rooms_df: pd.DataFrame,
+    standard_hours_per_week: float = 40.0,
+    prime_days: str = PRIME_DAYS,
+    prime_start: Clock = PRIME_START,
+    prime_end: Clock = PRIME_END,
+    meetings: Optional[MeetingTable] = None,
+    slot_minutes: int = SLOT_MINUTES,
+    term_start=None,
+    term_end=None,
+    as_of=None,
+) -> pd.DataFrame:
+    """
+    Per campus room: deduplicated occupied hours, their share of the
+    standard week, and utilization inside the prime-time window. Hours
+    are weighted by the share of the term sections meet, or taken for
+    the week of `as_of` (see build_occupancy).
+    """
+    cols = ["Location","Stations","Room Type","Room Size Category",
+            "occupied_hours_per_week","occupied_pct","prime_hours_per_week","prime_utilization_pct"]
+    if campus_rooms_df is None or campus_rooms_df.empty:
+        return pd.DataFrame(columns=cols)
+    base = campus_rooms_df[["Room ID","Stations","Room Type","Room Size Category"]].rename(columns={"Room ID":"Location"})
+    if meetings is None:
+        if course_df is None or course_df.empty:
+            out = base.copy()
+            for c in cols[4:]:
+                out[c] = 0.0
+            return out[cols]
+        meetings = get_meeting_table(course_df)
+    occ = get_occupancy(meetings, pd.unique(base["Location"]).tolist(), slot_minutes, term_start, term_end, as_of)
+    per_room = occupied_hours(occ).merge(
+        prime_time_utilization(occ, prime_days, prime_start, prime_end), on="Location")
+    out = base.merge(per_room, on="Location", how="left")
+    out["occupied_pct"] = out["occupied_hours_per_week"] / float(max(standard_hours_per_week, 0.001)) * 100.0
+    return out[cols]
@@ -0,0 +1,300 @@
+# utils/parse_cache.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set
+import pandas as pd
+
+# Parquet needs pyarrow; fall back to pickle files without it
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except Exception:
+    _HAS_PYARROW = False
+
+try:
+    import fcntl
+    _HAS_FCNTL = True
+except ImportError:  # Windows
+    fcntl = None
+    _HAS_FCNTL = False
+
+# Must be writable only by this user: headers and some sheet bodies are pickles
+DEFAULT_CACHE_DIR = os.getenv("CREDO_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "credo-etl"))
+DEFAULT_MAX_BYTES = int(float(os.getenv("CREDO_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+
+MANIFEST = "manifest.json"
+MANIFEST_LOCK = "manifest.lock"
+# Entries are root/<2 hex>/<sha256 hex>; anything else under the root belongs to someone else
+_SHARD = re.compile(r"[0-9a-f]{2}")
+_ENTRY = re.compile(r"[0-9a-f]{64}")
+# Writes between full rescans of the root while the running estimate stays under budget
+RESCAN_EVERY = 64
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+_THREAD_LOCK = threading.Lock()
+
+@contextmanager
+def _locked(path: Path):
+    """Exclusive lock on `path` across processes (flock), or across this process's threads without fcntl."""
+    if not _HAS_FCNTL:
+        with _THREAD_LOCK:
+            yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _body_name(sheet: str, usecols: Optional[Sequence], dtype: Optional[Dict] = None) -> str:
+    tag = repr((sheet, tuple(usecols) if usecols is not None else None, sorted((dtype or {}).items(), key=repr)))
+    return hashlib.sha1(tag.encode("utf-8")).hexdigest()[:20]
+
+
+class ParseCache:
+    """
+    On-disk, content-addressed cache of parsed uploads.
+
+    Entries live under `root/<sha256 of file bytes>/` and hold a JSON
+    manifest, pickled sheet headers, sheet bodies (Parquet when pyarrow is
+    available, pickle otherwise) and extracted PDF text, whole and per page. Writes are atomic
+    renames and manifest updates hold a file lock, so several processes can
+    share one root. The root must be private to the user running the app:
+    pickled files in it are loaded as trusted. Entries are evicted
+    least-recently-used first once the root exceeds `max_bytes`; the root
+    is only rescanned when a running estimate of its size goes over budget
+    or every RESCAN_EVERY writes (to pick up other processes' writes).
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or DEFAULT_CACHE_DIR)
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else int(max_bytes)
+        self._estimate: Optional[int] = None
+        self._writes = 0
+
+    # --------- Entries ---------
+    def _dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def touch(self, key: str) -> None:
+        d = self._dir(key)
+        if d.exists():
+            now = time.time()
+            os.utime(d, (now, now))
+
+    def manifest(self, key: str) -> Dict:
+        p = self._dir(key) / MANIFEST
+        try:
+            return json.loads(p.read_text("utf-8"))
+        except Exception:
+            return {}
+
+    def _update_manifest(self, key: str, **fields) -> None:
+        # Read-modify-write under the lock, or concurrent writers drop each other's fields
+        with _locked(self._dir(key) / MANIFEST_LOCK):
+            m = self.manifest(key)
+            for k, v in fields.items():
+                if isinstance(v, dict):
+                    m.setdefault(k, {}).update(v)
+                else:
+                    m[k] = v
+            atomic_write(self._dir(key) / MANIFEST, json.dumps(m).encode("utf-8"))
+
+    # --------- Workbooks ---------
+    def sheet_names(self, key: str) -> Optional[List[str]]:
+        return self.manifest(key).get("sheet_names")
+
+    def put_sheet_names(self, key: str, names: List[str]) -> None:
+        self._update_manifest(key, sheet_names=list(names))
+
+    def headers(self, key: str) -> Dict[str, pd.DataFrame]:
+        p = self._dir(key) / "headers.pkl"
+        try:
+            return pickle.loads(p.read_bytes())
+        except Exception:
+            return {}
+
+    def put_headers(self, key: str, headers: Dict[str, pd.DataFrame], row_counts: Dict[str, Optional[int]]) -> None:
+        merged = self.headers(key)
+        merged.update(headers)
+        data = pickle.dumps(merged)
+        atomic_write(self._dir(key) / "headers.pkl", data)
+        self._update_manifest(key, row_counts=row_counts)
+        self._wrote(len(data))
+
+    def row_counts(self, key: str) -> Dict[str, Optional[int]]:
+        return self.manifest(key).get("row_counts", {})
+
+    def read_sheet(self, key: str, sheet: str, usecols: Optional[Sequence] = None,
+                   dtype: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+        """Cached body for (sheet, usecols, dtype); a cached full sheet also serves column subsets."""
+        bodies = self.manifest(key).get("bodies", {})
+        variants = [(usecols, dtype)] + ([(None, None)] if usecols is not None and not dtype else [])
+        for cols, dt in variants:
+            fname = bodies.get(_body_name(sheet, cols, dt))
+            if not fname:
+                continue
+            path = self._dir(key) / fname
+            try:
+                if fname.endswith(".parquet"):
+                    df = pd.read_parquet(path, columns=list(usecols) if usecols is not None else None)
+                else:
+                    df = pd.read_pickle(path)
+                    if usecols is not None:
+                        df = df[list(usecols)]
+            except Exception:
+                continue
+            self.touch(key)
+            return df
+        return None
+
+    def put_sheet(self, key: str, sheet: str, df: pd.DataFrame, usecols: Optional[Sequence] = None,
+                  dtype: Optional[Dict] = None) -> None:
+        name = _body_name(sheet, usecols, dtype)
+        path = self._dir(key) / f"{name}.parquet"
+        tmp = path.with_name(f".tmp-{name}-{os.getpid()}.parquet")
+        fname = None
+        if _HAS_PYARROW and all(isinstance(c, str) for c in df.columns):
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                df.to_parquet(tmp, index=False)
+                os.replace(tmp, path)
+                fname = path.name
+                size = path.stat().st_size
+            except Exception:
+                # Mixed-type object columns don't round-trip through Arrow
+                if tmp.exists():
+                    tmp.unlink()
+        if fname is None:
+            fname = f"{name}.pkl"
+            data = pickle.dumps(df)
+            atomic_write(self._dir(key) / fname, data)
+            size = len(data)
+        self._update_manifest(key, bodies={name: fname})
+        self._wrote(size)
+
+    # --------- PDFs ---------
+    def get_text(self, key: str) -> Optional[str]:
+        p = self._dir(key) / "text.txt"
+        try:
+            text = p.read_text("utf-8")
+        except Exception:
+            return None
+        self.touch(key)
+        return text
+
+    def put_text(self, key: str, text: str) -> None:
+        data = text.encode("utf-8")
+        atomic_write(self._dir(key) / "text.txt", data)
+        self.touch(key)
+        self._wrote(len(data))
+
+    def page_count(self, key: str) -> Optional[int]:
+        return self.manifest(key).get("page_count")
+
+    def put_page_count(self, key: str, n: int) -> None:
+        self._update_manifest(key, page_count=int(n))
+
+    def get_page_text(self, key: str, page: int) -> Optional[str]:
+        try:
+            return (self._dir(key) / "pages" / f"{page}.txt").read_text("utf-8")
+        except Exception:
+            return None
+
+    def cached_pages(self, key: str) -> Set[int]:
+        """Page numbers with stored text, from one directory listing."""
+        try:
+            names = os.listdir(self._dir(key) / "pages")
+        except OSError:
+            return set()
+        return {int(f[:-4]) for f in names if f.endswith(".txt") and f[:-4].isdigit()}
+
+    def put_page_text(self, key: str, page: int, text: str) -> None:
+        data = text.encode("utf-8")
+        atomic_write(self._dir(key) / "pages" / f"{page}.txt", data)
+        self.touch(key)
+        # Counted, but a PDF's pages don't trigger the periodic rescan one by one
+        self._wrote(len(data), periodic=False)
+
+    # --------- Eviction ---------
+    def _entries(self):
+        if not self.root.exists():
+            return []
+        out = []
+        for shard in self.root.iterdir():
+            if not shard.is_dir() or not _SHARD.fullmatch(shard.name):
+                continue
+            for d in shard.iterdir():
+                if not d.is_dir() or not _ENTRY.fullmatch(d.name) or not d.name.startswith(shard.name):
+                    continue
+                size = sum(f.stat().st_size for f in d.rglob("*") if f.is_file())
+                out.append((d.stat().st_mtime, size, d))
+        return out
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _wrote(self, nbytes: int, periodic: bool = True) -> None:
+        """
+        Count a write against the running estimate; rescan and evict only
+        when it may be over budget or, for `periodic` writes, every
+        RESCAN_EVERY of them.
+        """
+        if periodic:
+            self._writes += 1
+        if self._estimate is not None:
+            self._estimate += nbytes
+            if self._estimate <= self.max_bytes and (not periodic or self._writes % RESCAN_EVERY):
+                return
+        self.evict()
+
+    def evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, d in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(d, ignore_errors=True)
+            total -= size
+        self._estimate = total
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._estimate = 0
+
+
+_DEFAULT: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """Process-wide cache rooted at CREDO_CACHE_DIR (default ~/.cache/credo-etl)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = ParseCache()
+    return _DEFAULT
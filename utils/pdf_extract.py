@@ -0,0 +1,259 @@
+# utils/pdf_extract.py
+"""
+Page-level PDF text extraction and schedule-table parsing.
+
+Pages are extracted in chunks on a process pool, each chunk parsing the
+document once, and streamed back in page order with a bounded number of
+chunks in flight. Each worker receives the file bytes once, when it
+starts. With a ParseCache every page's text is stored under (file hash,
+page number), so a repeat upload or an interrupted run only extracts the
+pages it is missing; cached pages are read as they are yielded.
+"""
+from __future__ import annotations
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from .fingerprint import bytes_fingerprint
+from .instrument import instrumented
+from .parse_cache import ParseCache
+
+# Try optional PDF backends lazily to avoid hard dependency
+try:
+    # Only bind callable names; don't import modules at top-level if unavailable
+    from pdfminer.high_level import extract_pages as _pdfminer_extract_pages
+    from pdfminer.layout import LTTextContainer as _LTTextContainer
+    from pdfminer.pdfpage import PDFPage as _PDFPage
+    _HAS_PDFMINER = True
+except Exception:
+    _pdfminer_extract_pages = None
+    _LTTextContainer = None
+    _PDFPage = None
+    _HAS_PDFMINER = False
+
+try:
+    import PyPDF2 as _PyPDF2
+    _HAS_PYPDF2 = True
+except Exception:
+    _PyPDF2 = None
+    _HAS_PYPDF2 = False
+
+# Pages per worker task; each task opens the document once
+PAGES_PER_CHUNK = 16
+# Below this many uncached pages the pool costs more than it saves
+POOL_MIN_PAGES = 32
+
+
+# --------- Backends ---------
+def pdf_page_count(file_bytes: bytes) -> int:
+    if _HAS_PYPDF2:
+        try:
+            return len(_PyPDF2.PdfReader(io.BytesIO(file_bytes)).pages)
+        except Exception:
+            pass
+    if _HAS_PDFMINER:
+        try:
+            with io.BytesIO(file_bytes) as fh:
+                return sum(1 for _ in _PDFPage.get_pages(fh))
+        except Exception:
+            pass
+    return 0
+
+
+def _pdfminer_chunk(file_bytes: bytes, pages: Sequence[int]) -> List[Tuple[int, str]]:
+    # One parse for the whole chunk; layout pages come back in document order
+    wanted = sorted(pages)
+    texts = []
+    with io.BytesIO(file_bytes) as fh:
+        for layout in _pdfminer_extract_pages(fh, page_numbers=wanted):
+            texts.append("".join(el.get_text() for el in layout if isinstance(el, _LTTextContainer)))
+    texts += [""] * (len(wanted) - len(texts))
+    return list(zip(wanted, texts))
+
+
+def _extract_chunk(file_bytes: bytes, pages: Sequence[int]) -> List[Tuple[int, str]]:
+    """Text of the given 0-based pages in ascending order; unreadable pages come back as ""."""
+    pages = sorted(pages)
+    if _HAS_PDFMINER:
+        try:
+            return _pdfminer_chunk(file_bytes, pages)
+        except Exception:
+            pass
+
+    if _HAS_PYPDF2:
+        try:
+            reader = _PyPDF2.PdfReader(io.BytesIO(file_bytes))
+        except Exception:
+            return [(p, "") for p in pages]
+        out = []
+        for p in pages:
+            try:
+                out.append((p, reader.pages[p].extract_text() or ""))
+            except Exception:
+                out.append((p, ""))
+        return out
+
+    # No PDF backend available; return empty so app continues
+    return [(p, "") for p in pages]
+
+
+# --------- Streaming ---------
+# The document being extracted, set once per pool worker by _init_worker
+_WORKER_BYTES: Optional[bytes] = None
+
+
+def _init_worker(file_bytes: bytes) -> None:
+    global _WORKER_BYTES
+    _WORKER_BYTES = file_bytes
+
+
+def _extract_worker_chunk(pages: Sequence[int]) -> List[Tuple[int, str]]:
+    return _extract_chunk(_WORKER_BYTES, pages)
+
+
+def iter_pdf_pages(file_bytes: bytes, cache: Optional[ParseCache] = None,
+                   workers: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page number, text) in page order. Cached pages are served from
+    `cache`; the rest are extracted PAGES_PER_CHUNK at a time, on up to
+    `workers` processes for large documents, with at most 2 x workers
+    chunks held in memory.
+    """
+    key = bytes_fingerprint(file_bytes) if cache is not None else None
+    n = cache.page_count(key) if cache is not None else None
+    if n is None:
+        n = pdf_page_count(file_bytes)
+        if cache is not None:
+            cache.put_page_count(key, n)
+
+    # Only which pages are cached; their text is read as each is yielded
+    cached = cache.cached_pages(key) if cache is not None else set()
+    missing = [p for p in range(n) if p not in cached]
+    chunks = [missing[i:i + PAGES_PER_CHUNK] for i in range(0, len(missing), PAGES_PER_CHUNK)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks) or 1))
+
+    def extracted() -> Iterator[Tuple[int, str]]:
+        if workers == 1 or len(missing) < POOL_MIN_PAGES:
+            for chunk in chunks:
+                yield from _extract_chunk(file_bytes, chunk)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(file_bytes,)) as pool:
+            inflight = []
+            for chunk in chunks:
+                inflight.append(pool.submit(_extract_worker_chunk, chunk))
+                if len(inflight) >= 2 * workers:
+                    yield from inflight.pop(0).result()
+            for fut in inflight:
+                yield from fut.result()
+
+    fresh = extracted()
+    for p in range(n):
+        if p in cached:
+            text = cache.get_page_text(key, p)
+            if text is None:
+                # Evicted since the listing
+                (_, text), = _extract_chunk(file_bytes, [p])
+                cache.put_page_text(key, p, text)
+            yield p, text
+            continue
+        page, text = next(fresh)
+        if cache is not None:
+            cache.put_page_text(key, page, text)
+        yield page, text
+
+
+def pdf_text(file_bytes: bytes, cache: Optional[ParseCache] = None, workers: Optional[int] = None) -> str:
+    return "\n".join(text for _, text in iter_pdf_pages(file_bytes, cache, workers)).strip()
+
+
+# --------- Schedule tables ---------
+_CELL_SPLIT = re.compile(r"\t|\s{2,}")
+
+
+def _cells(line: str) -> List[str]:
+    return [c for c in (s.strip() for s in _CELL_SPLIT.split(line.strip())) if c]
+
+
+def _fixed_width(line: str, starts: List[int]) -> List[str]:
+    """Slice a line at the header's column start offsets."""
+    bounds = starts[1:] + [None]
+    return [line[a:b].strip() if a < len(line) else "" for a, b in zip(starts, bounds)]
+
+
+def _header_starts(line: str, header: List[str]) -> Optional[List[int]]:
+    starts, pos = [], 0
+    for h in header:
+        i = line.find(h, pos)
+        if i < 0:
+            return None
+        starts.append(i)
+        pos = i + len(h)
+    return starts
+
+
+def page_tables(text: str, min_rows: int = 1) -> List[pd.DataFrame]:
+    """
+    Schedule-style tables found in one page of text. A header is a line of
+    at least four cells that is_schedule_sheet accepts; following lines
+    are rows while they split into the same number of cells (on tabs or
+    runs of 2+ spaces), falling back to the header's column offsets for
+    fixed-width layouts with blank cells.
+    """
+    from .file_handlers import is_schedule_sheet
+
+    tables = []
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        header = _cells(lines[i])
+        if len(header) < 4 or not is_schedule_sheet(header) or len(set(header)) < len(header):
+            i += 1
+            continue
+        starts = _header_starts(lines[i], header)
+        rows = []
+        i += 1
+        while i < len(lines):
+            line = lines[i]
+            cells = _cells(line)
+            if not cells:
+                i += 1
+                if rows:
+                    break
+                continue
+            if len(cells) != len(header):
+                if starts is None:
+                    break
+                cells = _fixed_width(line, starts)
+                # Mostly-empty slices are prose or a footer, not a row
+                if not cells[0] or sum(map(bool, cells)) * 2 < len(cells):
+                    break
+            rows.append(cells)
+            i += 1
+        if len(rows) >= min_rows:
+            tables.append(pd.DataFrame(rows, columns=header, dtype=object))
+    return tables
+
+
+@instrumented("ingestion")
+def extract_schedule_tables(file_bytes: bytes, cache: Optional[ParseCache] = None,
+                            workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Schedule tables across all pages as {"p<page>-t<n>": frame}, ready to
+    pass to collect_schedule_sheets / build_course_schedule alongside
+    workbook sheets. Tables continuing across pages under a repeated
+    header are concatenated.
+    """
+    out: Dict[str, pd.DataFrame] = {}
+    last_name, last_cols = None, None
+    for page, text in iter_pdf_pages(file_bytes, cache, workers):
+        for t, df in enumerate(page_tables(text), start=1):
+            cols = tuple(df.columns)
+            if cols == last_cols and t == 1:
+                out[last_name] = pd.concat([out[last_name], df], ignore_index=True)
+                continue
+            last_name, last_cols = f"p{page + 1}-t{t}", cols
+            out[last_name] = df
+    return out
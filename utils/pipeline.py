@@ -0,0 +1,142 @@
+# utils/pipeline.py
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from .fingerprint import frame_fingerprint
+from .file_handlers import load_bldg_room_lookup
+from .transformations import (
+    compact_course_schedule,
+    merge_course_schedules,
+    build_campus_rooms,
+    build_campus_buildings,
+    build_academic_departments,
+    build_rooms_inventory,
+    build_course_instructors,
+)
+
+HIT = "hit"
+COMPUTED = "computed"
+
+
+def value_fingerprint(value: Any) -> str:
+    """Fingerprint for a source value: content hash for frames, repr otherwise."""
+    if isinstance(value, pd.DataFrame):
+        return frame_fingerprint(value)
+    if isinstance(value, (list, tuple)):
+        h = hashlib.sha1()
+        for v in value:
+            h.update(value_fingerprint(v).encode("ascii"))
+        return h.hexdigest()
+    return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A named builder and the names of the sources/stages it takes, in call order."""
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...]
+
+
+class Pipeline:
+    """
+    Small memoizing DAG of stages.
+
+    Sources are set from outside with a fingerprint. A stage's key is a hash
+    of its name and its inputs' keys, so a stage reruns only when something
+    upstream of it changed. Only the latest output per stage is kept, in
+    memory or, with `spill` (an object with put(name, value) -> stored and
+    load(stored) -> value or None), wherever the spill target puts it; a
+    spilled output that can no longer be loaded is recomputed.
+    `report` records whether each stage touched since reset_report() was a
+    cache hit or recomputed.
+    """
+
+    def __init__(self, stages: Sequence[Stage], defaults: Optional[Dict[str, Any]] = None, spill=None):
+        self.stages: Dict[str, Stage] = {s.name: s for s in stages}
+        self.spill = spill
+        self._source_keys: Dict[str, str] = {}
+        self._sources: Dict[str, Any] = {}
+        self._memo: Dict[str, Tuple[str, Any]] = {}
+        self.report: Dict[str, str] = {}
+        for name, value in (defaults or {}).items():
+            self.set_source(name, value)
+
+    def set_source(self, name: str, value: Any, fingerprint: Optional[str] = None) -> None:
+        if name in self.stages:
+            raise ValueError(f"'{name}' is a stage, not a source.")
+        self._sources[name] = value
+        self._source_keys[name] = fingerprint if fingerprint is not None else value_fingerprint(value)
+
+    def key(self, name: str) -> str:
+        if name in self._source_keys:
+            return self._source_keys[name]
+        stage = self.stages.get(name)
+        if stage is None:
+            raise KeyError(f"Unknown source or stage: {name}")
+        h = hashlib.sha1(name.encode("utf-8"))
+        for inp in stage.inputs:
+            h.update(self.key(inp).encode("ascii"))
+        return h.hexdigest()
+
+    def reset_report(self) -> None:
+        self.report = {}
+
+    def get(self, name: str) -> Any:
+        return self._get(name)
+
+    def run(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        self.reset_report()
+        return {n: self._get(n) for n in (names or list(self.stages))}
+
+    def _get(self, name: str) -> Any:
+        if name in self._sources:
+            return self._sources[name]
+        stage = self.stages.get(name)
+        if stage is None:
+            raise KeyError(f"Unknown source or stage: {name}")
+        key = self.key(name)
+        memo = self._memo.get(name)
+        if memo is not None and memo[0] == key:
+            value = self.spill.load(memo[1]) if self.spill is not None else memo[1]
+            if value is not None or memo[1] is None:
+                self.report.setdefault(name, HIT)
+                return value
+        args = [self._get(inp) for inp in stage.inputs]
+        out = stage.func(*args)
+        self._memo[name] = (key, self.spill.put(name, out) if self.spill is not None else out)
+        self.report[name] = COMPUTED
+        return out
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        if name is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(name, None)
+
+
+def _compact_if(course_df: pd.DataFrame, compact: bool) -> pd.DataFrame:
+    return compact_course_schedule(course_df) if compact else course_df
+
+
+def build_transformation_pipeline(spill=None) -> Pipeline:
+    """
+    Step 2 builders as stages. Sources: `schedule_sheets` (list of raw
+    schedule frames), `lookup_sheets` (sheet mapping), `lookup_sheet`
+    (sheet name within it) and `compact_schema` (bool, default False).
+    Sheets are normalized one by one into `normalized`; toggling the
+    compact schema only reruns the cheap conversion after it.
+    """
+    return Pipeline([
+        Stage("normalized", merge_course_schedules, ("schedule_sheets",)),
+        Stage("course_schedule", _compact_if, ("normalized", "compact_schema")),
+        Stage("lookup", load_bldg_room_lookup, ("lookup_sheets", "lookup_sheet")),
+        Stage("campus_rooms", build_campus_rooms, ("lookup",)),
+        Stage("buildings", build_campus_buildings, ("campus_rooms",)),
+        Stage("departments", build_academic_departments, ("course_schedule",)),
+        Stage("inventory", build_rooms_inventory, ("campus_rooms",)),
+        Stage("instructors", build_course_instructors, ("course_schedule",)),
+    ], defaults={"compact_schema": False}, spill=spill)
@@ -0,0 +1,131 @@
+# utils/preview.py
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .fingerprint import frame_fingerprint
+
+PAGE_SIZES = (25, 50, 100, 250, 1000)
+ALL_COLUMNS = "(all columns)"
+
+_CACHE_SIZE = 32
+_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+
+# ------------------------------ Row order ------------------------------
+def _sort_key(col: pd.Series, ascending: bool = True) -> np.ndarray:
+    """Integer sort key per row, ranked once per distinct value; blanks sort last either way."""
+    codes, uniques = pd.factorize(col, use_na_sentinel=True)
+    try:
+        order = np.argsort(np.asarray(uniques), kind="stable")
+    except TypeError:
+        # Mixed types (e.g. room numbers) compare as text
+        order = np.argsort(np.asarray(uniques).astype(str), kind="stable")
+    n = len(uniques)
+    rank = np.empty(n + 1, dtype=np.int64)
+    rank[order] = np.arange(n) if ascending else np.arange(n)[::-1]
+    rank[-1] = n                # code -1 picks the trailing "blank" slot
+    return rank[codes]
+
+
+def _contains(col: pd.Series, needle: str) -> np.ndarray:
+    """Case-insensitive substring match, tested once per distinct value."""
+    codes, uniques = pd.factorize(col, use_na_sentinel=True)
+    hit = pd.Index(uniques).astype(str).str.lower().str.contains(needle, regex=False)
+    hit = np.append(np.asarray(hit, dtype=bool), False)
+    return hit[codes]
+
+
+def preview_order(df: pd.DataFrame, query: str = "", filter_col: Optional[str] = None,
+                  sort_by: Optional[str] = None, ascending: bool = True,
+                  fingerprint: Optional[str] = None) -> np.ndarray:
+    """
+    Row positions of `df` after filtering and sorting, cached per frame
+    content and view settings. Only positions are kept, never a copy of
+    the frame.
+    """
+    needle = (query or "").strip().lower()
+    fp = fingerprint or frame_fingerprint(df)
+    key = (fp, needle, filter_col, sort_by, ascending)
+    hit = _CACHE.get(key)
+    if hit is not None:
+        _CACHE.move_to_end(key)
+        return hit
+
+    pos = np.arange(len(df))
+    if needle:
+        cols = [filter_col] if filter_col in df.columns else list(df.columns)
+        mask = np.zeros(len(df), dtype=bool)
+        for c in cols:
+            mask |= _contains(df[c], needle)
+        pos = pos[mask]
+    if sort_by in df.columns and len(pos):
+        k = _sort_key(df[sort_by], ascending)[pos]
+        pos = pos[np.argsort(k, kind="stable")]
+
+    _CACHE[key] = pos
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return pos
+
+
+def page_slice(df: pd.DataFrame, positions: np.ndarray, page: int, page_size: int) -> Tuple[pd.DataFrame, int]:
+    """One page of rows (1-based page number) and the total page count."""
+    pages = max(1, -(-len(positions) // page_size))
+    page = min(max(1, page), pages)
+    out = df.iloc[positions[(page - 1) * page_size: page * page_size]]
+    # Only the visible page is made Arrow-friendly
+    obj = [c for c in out.columns if out[c].dtype == object]
+    if obj:
+        out = out.astype({c: "string" for c in obj})
+    return out, pages
+
+
+# ------------------------------ Widget ------------------------------
+def paginated_dataframe(df: Optional[pd.DataFrame], key: str, page_size: int = 50,
+                        fingerprint: Optional[str] = None) -> None:
+    """
+    Drop-in for st.dataframe on large frames: row counts, a text filter,
+    a sort column and page controls, with only the current page sent to
+    the browser. Pass the frame's version key as `fingerprint` (e.g. a
+    pipeline stage key) when the caller has one; otherwise every rerun
+    hashes the whole frame to find its cached row order.
+    """
+    if df is None or df.empty:
+        st.caption("0 rows")
+        return
+    if len(df) <= page_size:
+        st.caption(f"{len(df):,} rows")
+        st.dataframe(page_slice(df, np.arange(len(df)), 1, page_size)[0], hide_index=True)
+        return
+
+    cols = [str(c) for c in df.columns]
+    labels = dict(zip(cols, df.columns))
+    c1, c2, c3, c4 = st.columns([3, 2, 2, 1])
+    query = c1.text_input("Filter", key=f"{key}__q", placeholder="contains…")
+    filter_col = c2.selectbox("in", [ALL_COLUMNS] + cols, key=f"{key}__fc")
+    sort_by = c3.selectbox("Sort by", ["(none)"] + cols, key=f"{key}__s")
+    descending = c4.toggle("Desc", key=f"{key}__d")
+
+    pos = preview_order(
+        df, query,
+        filter_col=labels.get(filter_col),
+        sort_by=labels.get(sort_by),
+        ascending=not descending,
+        fingerprint=fingerprint,
+    )
+
+    c5, c6, c7 = st.columns([1, 1, 3])
+    size = c5.selectbox("Rows/page", PAGE_SIZES, index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+                        key=f"{key}__n")
+    pages = max(1, -(-len(pos) // size))
+    if st.session_state.get(f"{key}__p", 1) > pages:
+        # A narrower filter can leave the stored page out of range
+        st.session_state[f"{key}__p"] = pages
+    page = c6.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}__p")
+    view, pages = page_slice(df, pos, int(page), size)
+    c7.caption(f"{len(pos):,} of {len(df):,} rows · page {min(int(page), pages)} of {pages:,}")
+    st.dataframe(view, hide_index=True)
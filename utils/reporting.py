@@ -1,8 +1,208 @@
 # utils/reporting.py
 from __future__ import annotations
+import hashlib
 import io
+import os
+import re
+import tempfile
+import zipfile
+from collections import OrderedDict
+from typing import BinaryIO, List, Tuple, Union
 import pandas as pd
 
+from .fingerprint import frame_fingerprint
+from .instrument import instrumented
+
+try:
+    import xlsxwriter as _xlsxwriter
+    _HAS_XLSXWRITER = True
+except Exception:
+    _xlsxwriter = None
+    _HAS_XLSXWRITER = False
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except Exception:
+    _HAS_PYARROW = False
+
+# Sheet names, in deliverable order
+DELIVERABLE_SHEETS = [
+    "Course Schedule",
+    "Campus Rooms",
+    "Campus Buildings",
+    "Academic Depts",
+    "Utilization",
+    "Room Conflicts",
+    "Instructor Conflicts",
+]
+
+EXPORT_FORMATS = ("xlsx", "csv.zip", "parquet.zip")
+
+EXCEL_MAX_ROWS = 1_048_576
+WRITE_CHUNK_ROWS = 10_000
+
+# Generated deliverables kept in process, keyed by the tables' fingerprints
+_CACHE_SIZE = 4
+_CACHE_MAX_BYTES = int(float(os.getenv("CREDO_DELIVERABLE_CACHE_MB", "128")) * 1024 * 1024)
+_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+
+Tables = List[Tuple[str, pd.DataFrame]]
+Target = Union[str, os.PathLike, BinaryIO]
+
+
+def deliverable_tables(
+    course_schedule: pd.DataFrame,
+    campus_rooms: pd.DataFrame,
+    buildings: pd.DataFrame,
+    departments: pd.DataFrame,
+    utilization: pd.DataFrame,
+    room_conflicts: pd.DataFrame,
+    instructor_conflicts: pd.DataFrame,
+) -> Tables:
+    frames = [course_schedule, campus_rooms, buildings, departments, utilization, room_conflicts, instructor_conflicts]
+    return list(zip(DELIVERABLE_SHEETS, frames))
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower()
+
+
+def _column_values(col: pd.Series) -> list:
+    """Python scalars of one column, NaN/NaT/NA as None; only missing cells are touched."""
+    values = col.tolist()
+    missing = col.isna().to_numpy()
+    if missing.any():
+        for i in missing.nonzero()[0].tolist():
+            values[i] = None
+    return values
+
+
+def _row_chunks(df: pd.DataFrame):
+    """Rows as plain tuples, a bounded chunk at a time, with NaN/NaT as None."""
+    for start in range(0, len(df), WRITE_CHUNK_ROWS):
+        chunk = df.iloc[start:start + WRITE_CHUNK_ROWS]
+        yield from zip(*(_column_values(chunk.iloc[:, i]) for i in range(chunk.shape[1])))
+
+
+# --------- Writers ---------
+def write_deliverable_xlsx(tables: Tables, target: Target) -> None:
+    """
+    Stream tables into an xlsx workbook at `target` (path or binary stream).
+    xlsxwriter's constant_memory mode flushes each row to a temp file as it
+    is written, so memory stays flat regardless of sheet size. Tables longer
+    than Excel's row limit continue on "<name> (2)", ... sheets.
+    """
+    if not _HAS_XLSXWRITER:
+        raise ImportError("xlsxwriter is required for xlsx export.")
+    wb = _xlsxwriter.Workbook(target, {"constant_memory": True, "strings_to_urls": False})
+    header_fmt = wb.add_format({"bold": True, "border": 1})
+    date_fmt = wb.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+    try:
+        for name, df in tables:
+            df = df if df is not None else pd.DataFrame()
+            page, ws, r = 1, None, 0
+            date_cols = {i for i, t in enumerate(df.dtypes) if pd.api.types.is_datetime64_any_dtype(t)}
+
+            def new_sheet():
+                sheet = wb.add_worksheet(name if page == 1 else f"{name[:26]} ({page})")
+                sheet.write_row(0, 0, [str(c) for c in df.columns], header_fmt)
+                return sheet
+
+            ws = new_sheet()
+            for row in _row_chunks(df):
+                r += 1
+                if r >= EXCEL_MAX_ROWS:
+                    page, r = page + 1, 1
+                    ws = new_sheet()
+                if not date_cols:
+                    ws.write_row(r, 0, row)
+                    continue
+                # Each cell once: dates with the date format, the rest by type
+                for i, v in enumerate(row):
+                    if v is None:
+                        continue
+                    if i in date_cols:
+                        ws.write_datetime(r, i, v, date_fmt)
+                    else:
+                        ws.write(r, i, v)
+    finally:
+        wb.close()
+
+
+def write_deliverable_csv_zip(tables: Tables, target: Target) -> None:
+    """One CSV per table inside a deflated zip, written table by table."""
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, df in tables:
+            with zf.open(f"{_slug(name)}.csv", "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as fh:
+                df.to_csv(fh, index=False, chunksize=WRITE_CHUNK_ROWS)
+
+
+def _to_parquet(df: pd.DataFrame, target) -> None:
+    out = df.copy()
+    out.columns = [str(c) for c in out.columns]
+    # Mixed-type object columns (e.g. room numbers) are written as text
+    for c in out.columns:
+        if out[c].dtype == object:
+            out[c] = out[c].where(out[c].isna(), out[c].astype(str))
+    out.to_parquet(target, index=False)
+
+
+def write_deliverable_parquet_zip(tables: Tables, target: Target) -> None:
+    if not _HAS_PYARROW:
+        raise ImportError("pyarrow is required for Parquet export.")
+    # Parquet is already compressed; store members as-is
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, df in tables:
+            with zf.open(f"{_slug(name)}.parquet", "w") as fh:
+                _to_parquet(df, fh)
+
+
+_WRITERS = {
+    "xlsx": write_deliverable_xlsx,
+    "csv.zip": write_deliverable_csv_zip,
+    "parquet.zip": write_deliverable_parquet_zip,
+}
+
+
+@instrumented("reporting")
+def write_deliverable(tables: Tables, target: Target, fmt: str = "xlsx") -> None:
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose one of {', '.join(EXPORT_FORMATS)}.")
+    _WRITERS[fmt](tables, target)
+
+
+# --------- Cached bytes ---------
+@instrumented("reporting")
+def deliverable_bytes(tables: Tables, fmt: str = "xlsx") -> bytes:
+    """
+    Deliverable as bytes, cached by the content fingerprint of every table,
+    so reruns with unchanged inputs skip regeneration. The cache holds at
+    most _CACHE_SIZE deliverables and _CACHE_MAX_BYTES in total.
+    """
+    h = hashlib.sha1(fmt.encode("utf-8"))
+    for name, df in tables:
+        h.update(name.encode("utf-8"))
+        h.update(frame_fingerprint(df).encode("ascii"))
+    key = h.hexdigest()
+    hit = _CACHE.get(key)
+    if hit is not None:
+        _CACHE.move_to_end(key)
+        return hit
+
+    # Spill to an anonymous temp file and read it back once
+    with tempfile.TemporaryFile() as fh:
+        write_deliverable(tables, fh, fmt)
+        fh.seek(0)
+        data = fh.read()
+    if len(data) <= _CACHE_MAX_BYTES:
+        _CACHE[key] = data
+        while len(_CACHE) > _CACHE_SIZE or sum(len(v) for v in _CACHE.values()) > _CACHE_MAX_BYTES:
+            _CACHE.popitem(last=False)
+    return data
+
+
+@instrumented("reporting")
 def create_full_deliverable(
     course_schedule: pd.DataFrame,
     campus_rooms: pd.DataFrame,
@@ -11,15 +211,10 @@ def create_full_deliverable(
     utilization: pd.DataFrame,
     room_conflicts: pd.DataFrame,
     instructor_conflicts: pd.DataFrame,
+    fmt: str = "xlsx",
 ) -> bytes:
-    buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="xlsxwriter") as xw:
-        course_schedule.to_excel(xw, sheet_name="Course Schedule", index=False)
-        campus_rooms.to_excel(xw, sheet_name="Campus Rooms", index=False)
-        buildings.to_excel(xw, sheet_name="Campus Buildings", index=False)
-        departments.to_excel(xw, sheet_name="Academic Depts", index=False)
-        utilization.to_excel(xw, sheet_name="Utilization", index=False)
-        room_conflicts.to_excel(xw, sheet_name="Room Conflicts", index=False)
-        instructor_conflicts.to_excel(xw, sheet_name="Instructor Conflicts", index=False)
-    buf.seek(0)
-    return buf.getvalue()
+    tables = deliverable_tables(
+        course_schedule, campus_rooms, buildings, departments,
+        utilization, room_conflicts, instructor_conflicts,
+    )
+    return deliverable_bytes(tables, fmt)
@@ -0,0 +1,293 @@
+# utils/session_store.py
+"""
+Spill-to-disk store for per-session DataFrames.
+
+Large frames are written once as uncompressed Feather (Arrow IPC) files
+under `root/<session id>/` and only a small FrameHandle is kept in
+st.session_state. Loading memory-maps the file, so numeric columns come
+back without a copy and the OS can page them out under pressure. Sessions
+idle longer than the TTL, then the least recently used ones beyond the
+total size budget, are deleted.
+"""
+from __future__ import annotations
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .parse_cache import DEFAULT_CACHE_DIR, atomic_write
+
+try:
+    import pyarrow.feather as _feather
+    _HAS_PYARROW = True
+except Exception:
+    _feather = None
+    _HAS_PYARROW = False
+
+# Next to the parse cache, not inside it, so neither evicts the other's files
+DEFAULT_SESSION_DIR = os.getenv("CREDO_SESSION_DIR", DEFAULT_CACHE_DIR.rstrip("/\\") + "-sessions")
+DEFAULT_TTL_SECONDS = float(os.getenv("CREDO_SESSION_TTL_MIN", "120")) * 60
+DEFAULT_MAX_BYTES = int(float(os.getenv("CREDO_SESSION_MAX_MB", "8192")) * 1024 * 1024)
+# Loaded frames kept in this process across reruns, shared by all sessions
+DEFAULT_MEMO_BYTES = int(float(os.getenv("CREDO_SESSION_MEMO_MB", "512")) * 1024 * 1024)
+# Frames smaller than this stay in session_state as they are
+SPILL_MIN_BYTES = int(float(os.getenv("CREDO_SESSION_SPILL_MIN_KB", "256")) * 1024)
+SPILL_ENABLED = os.getenv("CREDO_SESSION_SPILL", "1") not in ("0", "false", "off", "no")
+
+
+@dataclass(frozen=True)
+class FrameHandle:
+    """Reference to a spilled frame; cheap to keep in session_state."""
+    session: str
+    name: str
+    path: str
+    rows: int
+    columns: Tuple[str, ...]
+    nbytes: int
+    # DataFrame.attrs don't survive Feather; they travel with the handle
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return self.rows
+
+
+def _stem(name: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    # Shallow estimate: object columns count 8 bytes a cell, enough to pick what to spill
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+class SessionStore:
+    """
+    Per-session frame files under `root/<session>/<name>.arrow` (or .pkl for
+    frames Arrow cannot hold, e.g. mixed-type object columns). Writes are
+    atomic renames. Every put or load touches the session directory; evict()
+    removes sessions idle past `ttl_seconds`, then oldest-first until the
+    root is within `max_bytes`.
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None, memo_bytes: Optional[int] = None):
+        self.root = Path(root or DEFAULT_SESSION_DIR)
+        self.ttl_seconds = DEFAULT_TTL_SECONDS if ttl_seconds is None else float(ttl_seconds)
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else int(max_bytes)
+        self.memo_bytes = DEFAULT_MEMO_BYTES if memo_bytes is None else int(memo_bytes)
+        self._memo: "OrderedDict[Tuple[str, int], Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._memo_total = 0
+        self._lock = threading.Lock()
+        # id(frame) -> (weakref, handle) for frames written or loaded here
+        self._handles: Dict[int, Tuple[weakref.ref, FrameHandle]] = {}
+
+    # --------- Frames ---------
+    def _track(self, df: pd.DataFrame, handle: FrameHandle) -> None:
+        key = id(df)
+        with self._lock:
+            self._handles[key] = (weakref.ref(df, lambda _, k=key: self._handles.pop(k, None)), handle)
+
+    def handle_for(self, df: pd.DataFrame) -> Optional[FrameHandle]:
+        """Handle of a file holding exactly this frame object, if it is still on disk."""
+        entry = self._handles.get(id(df))
+        if entry is None or entry[0]() is not df or not os.path.exists(entry[1].path):
+            return None
+        return entry[1]
+
+    def _dir(self, session: str) -> Path:
+        return self.root / session
+
+    def touch(self, session: str) -> None:
+        try:
+            os.utime(self._dir(session))
+        except OSError:
+            pass
+
+    def put(self, session: str, name: str, df: pd.DataFrame) -> FrameHandle:
+        d = self._dir(session)
+        d.mkdir(parents=True, exist_ok=True)
+        stem = _stem(name)
+        path = None
+        if _HAS_PYARROW and all(isinstance(c, str) for c in df.columns):
+            target = d / f"{stem}.arrow"
+            tmp = d / f".tmp-{stem}-{uuid.uuid4().hex[:8]}.arrow"
+            try:
+                # Uncompressed so reads can memory-map instead of decoding
+                _feather.write_feather(df, tmp, compression="uncompressed")
+                os.replace(tmp, target)
+                path = target
+            except Exception:
+                # Mixed-type object columns don't round-trip through Arrow
+                if tmp.exists():
+                    tmp.unlink()
+        if path is None:
+            path = d / f"{stem}.pkl"
+            atomic_write(path, pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+        for stale in (d / f"{stem}.arrow", d / f"{stem}.pkl"):
+            if stale != path and stale.exists():
+                stale.unlink()
+        self.touch(session)
+        self.evict(keep=session)
+        handle = FrameHandle(session, name, str(path), len(df), tuple(str(c) for c in df.columns),
+                             path.stat().st_size, dict(df.attrs))
+        self._track(df, handle)
+        return handle
+
+    def load(self, handle: FrameHandle) -> Optional[pd.DataFrame]:
+        """
+        The handle's frame, or None when it has been evicted. Each call gets
+        its own shallow copy of the memoized frame; under copy-on-write,
+        changing it never alters what later loads return.
+        """
+        path = Path(handle.path)
+        try:
+            key = (handle.path, path.stat().st_mtime_ns)
+        except OSError:
+            return None
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None:
+                self._memo.move_to_end(key)
+        if hit is not None:
+            self.touch(handle.session)
+            return self._shallow(hit[0], handle)
+        try:
+            if path.suffix == ".arrow":
+                table = _feather.read_table(path, memory_map=True)
+                # split_blocks keeps numeric columns as zero-copy views of the mapped file
+                df = table.to_pandas(split_blocks=True)
+            else:
+                df = pd.read_pickle(path)
+        except Exception:
+            return None
+        df.attrs.update(handle.attrs)
+        self.touch(handle.session)
+        self._remember(key, df)
+        return self._shallow(df, handle)
+
+    def _shallow(self, df: pd.DataFrame, handle: FrameHandle) -> pd.DataFrame:
+        out = df.copy(deep=False)
+        self._track(out, handle)
+        return out
+
+    def _remember(self, key: Tuple[str, int], df: pd.DataFrame) -> None:
+        # Deep: object columns hold Python objects, many times 8 bytes a cell
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.memo_bytes:
+            return
+        with self._lock:
+            self._memo[key] = (df, size)
+            self._memo_total += size
+            while self._memo_total > self.memo_bytes and self._memo:
+                _, (_, s) = self._memo.popitem(last=False)
+                self._memo_total -= s
+
+    def drop(self, session: str, name: Optional[str] = None) -> None:
+        """Delete one frame of a session, or the whole session when `name` is None."""
+        d = self._dir(session)
+        if name is None:
+            shutil.rmtree(d, ignore_errors=True)
+            return
+        stem = _stem(name)
+        for p in (d / f"{stem}.arrow", d / f"{stem}.pkl"):
+            if p.exists():
+                p.unlink()
+
+    # --------- Eviction ---------
+    def _sessions(self):
+        if not self.root.exists():
+            return []
+        out = []
+        for d in self.root.iterdir():
+            if d.is_dir():
+                size = sum(f.stat().st_size for f in d.iterdir() if f.is_file())
+                out.append((d.stat().st_mtime, size, d))
+        return out
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._sessions())
+
+    def evict(self, now: Optional[float] = None, keep: Optional[str] = None) -> None:
+        """Drop sessions idle past the TTL, then oldest first while over max_bytes; never `keep`."""
+        now = time.time() if now is None else now
+        entries = sorted(self._sessions(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, d in entries:
+            if d.name == keep:
+                continue
+            if now - mtime > self.ttl_seconds or total > self.max_bytes:
+                shutil.rmtree(d, ignore_errors=True)
+                total -= size
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_DEFAULT: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Process-wide store rooted at CREDO_SESSION_DIR (default <cache dir>-sessions, beside the parse cache)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = SessionStore()
+    return _DEFAULT
+
+class SessionSpill:
+    """Pipeline spill target: large stage outputs go to one session's files."""
+
+    def __init__(self, store: SessionStore, session: str):
+        self.store = store
+        self.session = session
+
+    def put(self, name: str, value: Any) -> Any:
+        if isinstance(value, pd.DataFrame) and _frame_bytes(value) >= SPILL_MIN_BYTES:
+            return self.store.put(self.session, f"stage-{name}", value)
+        return value
+
+    def load(self, stored: Any) -> Any:
+        return self.store.load(stored) if isinstance(stored, FrameHandle) else stored
+
+# ------------------------------ Streamlit helpers ------------------------------
+
+def session_id() -> str:
+    import streamlit as st
+    return st.session_state.setdefault("SESSION_STORE_ID", uuid.uuid4().hex)
+
+def stash(name: str, value: Any) -> Any:
+    """
+    Put `value` in st.session_state[name]: large DataFrames as a FrameHandle
+    spilled to disk, anything else as is. A frame that is already on disk
+    (re-stashed on a rerun, or loaded from a pipeline stage file) reuses
+    its file. Returns what was stored.
+    """
+    import streamlit as st
+    if SPILL_ENABLED and isinstance(value, pd.DataFrame) and _frame_bytes(value) >= SPILL_MIN_BYTES:
+        store = get_session_store()
+        value = store.handle_for(value) or store.put(session_id(), name, value)
+    st.session_state[name] = value
+    return value
+
+def session_spill() -> Optional[SessionSpill]:
+    """Spill target for this session's pipeline, or None when spilling is off."""
+    return SessionSpill(get_session_store(), session_id()) if SPILL_ENABLED else None
+
+def fetch(name: str, default: Any = None) -> Any:
+    """st.session_state[name], loading spilled frames; `default` when missing or evicted."""
+    import streamlit as st
+    value = st.session_state.get(name, default)
+    if isinstance(value, FrameHandle):
+        value = get_session_store().load(value)
+        if value is None:
+            # Evicted while idle: forget the dangling handle so pages ask to rebuild
+            st.session_state.pop(name, None)
+            return default
+    return value
@@ -0,0 +1,191 @@
+# utils/synthetic.py
+"""
+Seeded synthetic registrar data for benchmarks and load tests.
+
+Schedules mimic real exports: messy day and time formats, Zipf-skewed
+room and instructor usage, and a configurable share of "TBA" rows. The
+building lookup uses the same buildings and rooms, so every transform and
+analysis step has realistic matches to work with.
+"""
+from __future__ import annotations
+import io
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+ROOM_TYPES = ("Classroom", "Lab", "Lecture Hall", "Seminar", "Studio")
+DEPTS = ("ENG", "MAT", "BIO", "CHM", "PHY", "HIS", "PSY", "ART", "MUS", "CSC", "ECO", "NUR", "BUS", "SOC")
+
+# Canonical pattern -> spellings seen in registrar exports
+DAY_VARIANTS = {
+    "MWF": ("MWF", "M W F", "M-W-F", "mwf", "M/W/F"),
+    "TR": ("TR", "TTh", "TuTh", "T/Th", "T R", "tuth"),
+    "MW": ("MW", "M W", "M/W", "mw"),
+    "MTWRF": ("MTWRF", "MTWThF", "M-T-W-Th-F"),
+    "M": ("M",),
+    "W": ("W",),
+    "F": ("F",),
+    "S": ("S",),
+}
+DAY_WEIGHTS = {"MWF": 0.3, "TR": 0.3, "MW": 0.2, "MTWRF": 0.04, "M": 0.05, "W": 0.05, "F": 0.04, "S": 0.02}
+DURATIONS = (50, 75, 110, 165)
+TERM = ("2025-08-25", "2025-12-12")
+
+
+def _default_rooms(n_sections: int) -> int:
+    # ~10 sections per room keeps average utilization in a realistic range
+    return max(50, n_sections // 10)
+
+
+def _zipf_choice(rng: np.random.Generator, n_items: int, size: int, a: float = 1.1) -> np.ndarray:
+    """Item indices with a heavy head: weight of rank k is 1 / k**a."""
+    w = 1.0 / np.arange(1, n_items + 1) ** a
+    return rng.choice(n_items, size=size, p=w / w.sum())
+
+
+def _pick(rng: np.random.Generator, variants: np.ndarray, canon_idx: np.ndarray) -> np.ndarray:
+    # variants: (n_canon, max_variants) object array padded with None
+    counts = (variants != None).sum(axis=1)  # noqa: E711
+    return variants[canon_idx, (rng.random(len(canon_idx)) * counts[canon_idx]).astype(np.int64)]
+
+
+def _clock_text(rng: np.random.Generator, minutes: np.ndarray, excel: bool = True) -> np.ndarray:
+    """Times of day in a random mix of the formats registrars export."""
+    h, m = minutes // 60, minutes % 60
+    h12 = np.where(h % 12 == 0, 12, h % 12)
+    ap = np.where(h < 12, "AM", "PM")
+    styles = rng.integers(0, 5 if excel else 4, len(minutes))
+    out = np.empty(len(minutes), dtype=object)
+    fmts = [
+        lambda i: f"{h12[i]}:{m[i]:02d} {ap[i]}",
+        lambda i: f"{h12[i]}:{m[i]:02d}{ap[i].lower()}",
+        lambda i: f"{h[i]:02d}{m[i]:02d}",
+        lambda i: f"{h[i]}:{m[i]:02d}",
+        lambda i: round(minutes[i] / 1440.0, 6),   # Excel day fraction
+    ]
+    # Format once per distinct (minute, style) pair
+    key = minutes.astype(np.int64) * 5 + styles
+    uniq, first, inv = np.unique(key, return_index=True, return_inverse=True)
+    rendered = np.array([fmts[styles[i]](i) for i in first], dtype=object)
+    out[:] = rendered[inv]
+    return out
+
+
+def synthetic_lookup(n_rooms: int = 500, seed: int = 0, rooms_per_building: int = 40) -> pd.DataFrame:
+    """Building/room lookup with the headers load_bldg_room_lookup detects."""
+    rng = np.random.default_rng(seed)
+    n_bldg = max(1, -(-n_rooms // rooms_per_building))
+    bldg = np.array([f"B{i:03d}" for i in range(n_bldg)], dtype=object)
+    b = np.arange(n_rooms) // rooms_per_building
+    room = (100 + np.arange(n_rooms) % rooms_per_building).astype(str).astype(object)
+    rtype = rng.choice(ROOM_TYPES, n_rooms, p=[0.55, 0.2, 0.1, 0.1, 0.05])
+    stations = np.where(rtype == "Lecture Hall", rng.integers(80, 300, n_rooms),
+                        np.where(rtype == "Seminar", rng.integers(10, 25, n_rooms), rng.integers(16, 60, n_rooms)))
+    # A few rooms with no station count fall back to ASF for size category
+    stations = np.where(rng.random(n_rooms) < 0.05, 0, stations)
+    return pd.DataFrame({
+        "Building": bldg[b],
+        "Room #": room,
+        "ASF": (stations.clip(10) * rng.uniform(18, 28, n_rooms)).round(0),
+        "Stations": stations,
+        "Room Type": rtype,
+        "Registrar": rng.choice(["Y", "N"], n_rooms, p=[0.85, 0.15]),
+    })
+
+
+def synthetic_schedule(n_sections: int = 10_000, seed: int = 0, lookup: Optional[pd.DataFrame] = None,
+                       n_instructors: Optional[int] = None, tba_share: float = 0.08,
+                       half_term_share: float = 0.1, room_skew: float = 0.3,
+                       instructor_skew: float = 0.3) -> pd.DataFrame:
+    """
+    Raw schedule rows as a registrar export would have them. `tba_share`
+    of rows have "TBA" times/instructor and a blank room; rooms and
+    instructors follow Zipf distributions with the given exponents;
+    `half_term_share` of sections run for half the term only.
+    """
+    rng = np.random.default_rng(seed)
+    if lookup is None:
+        lookup = synthetic_lookup(_default_rooms(n_sections), seed)
+    n = n_sections
+    n_instructors = n_instructors or max(20, n // 3)
+
+    dept = rng.choice(DEPTS, n)
+    course_no = rng.integers(100, 500, n)
+    section = np.char.zfill(rng.integers(1, 40, n).astype(str), 2)
+    title = np.array([f"Topics {i}" for i in range(2000)], dtype=object)[rng.integers(0, 2000, n)]
+
+    canon = np.array(list(DAY_WEIGHTS), dtype=object)
+    ci = rng.choice(len(canon), n, p=np.array(list(DAY_WEIGHTS.values())) / sum(DAY_WEIGHTS.values()))
+    width = max(len(v) for v in DAY_VARIANTS.values())
+    variants = np.full((len(canon), width), None, dtype=object)
+    for i, c in enumerate(canon):
+        variants[i, :len(DAY_VARIANTS[c])] = DAY_VARIANTS[c]
+    days = _pick(rng, variants, ci)
+
+    start = rng.integers(7 * 12, 20 * 12, n) * 5
+    end = np.minimum(start + rng.choice(DURATIONS, n), 23 * 60 + 55)
+    start_txt = _clock_text(rng, start)
+    end_txt = _clock_text(rng, end)
+    # Some exports put the whole range in Start Time and leave End Time blank
+    ranged = rng.random(n) < 0.05
+    start_txt[ranged] = [f"{a}-{b}" for a, b in zip(_clock_text(rng, start[ranged], excel=False),
+                                                    _clock_text(rng, end[ranged], excel=False))]
+    end_txt[ranged] = ""
+
+    r = _zipf_choice(rng, len(lookup), n, a=room_skew)
+    bldg = lookup["Building"].to_numpy(dtype=object)[r]
+    room = lookup["Room #"].to_numpy(dtype=object)[r]
+    cap = lookup["Stations"].to_numpy()[r]
+    instr = np.array([f"Instructor {i:05d}" for i in range(n_instructors)], dtype=object)[
+        _zipf_choice(rng, n_instructors, n, a=instructor_skew)]
+
+    tba = rng.random(n) < tba_share
+    start_txt[tba] = "TBA"
+    end_txt[tba] = ""
+    days[tba] = rng.choice(["TBA", ""], int(tba.sum()))
+    bldg[tba] = ""
+    room[tba] = ""
+    instr[rng.random(n) < tba_share * 1.5] = "TBA"
+
+    t0, t1 = np.datetime64(TERM[0]), np.datetime64(TERM[1])
+    mid = t0 + (t1 - t0) // 2
+    half = rng.random(n) < half_term_share
+    second = rng.random(n) < 0.5
+    sdate = np.where(half & second, mid + 3, t0)
+    edate = np.where(half & ~second, mid, t1)
+
+    cap = np.maximum(np.where(cap > 0, cap, 30) - rng.integers(0, 5, n), 5)
+    return pd.DataFrame({
+        "Course Number": [f"{d} {c}" for d, c in zip(dept, course_no)],
+        "Section": section,
+        "Course Title": title,
+        "Dept": dept,
+        "Instructor": instr,
+        "Days": days,
+        "Start Time": start_txt,
+        "End Time": end_txt,
+        "Bldg": bldg,
+        "Room": room,
+        "Course Capacity": cap,
+        "Actual Enrolled": (cap * rng.uniform(0.3, 1.05, n)).astype(int),
+        "Start Date": pd.to_datetime(sdate),
+        "End Date": pd.to_datetime(edate),
+    })
+
+
+def synthetic_term(n_sections: int = 10_000, seed: int = 0, n_rooms: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """{"Class Schedule": ..., "Bldg Room Lookup": ...} as one workbook's sheets."""
+    lookup = synthetic_lookup(n_rooms or _default_rooms(n_sections), seed)
+    return {
+        "Class Schedule": synthetic_schedule(n_sections, seed, lookup),
+        "Bldg Room Lookup": lookup,
+    }
+
+
+def synthetic_workbook(n_sections: int = 10_000, seed: int = 0, n_rooms: Optional[int] = None) -> bytes:
+    """synthetic_term written to xlsx bytes, for ingestion benchmarks."""
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as xw:
+        for name, df in synthetic_term(n_sections, seed, n_rooms).items():
+            df.to_excel(xw, sheet_name=name, index=False)
+    return buf.getvalue()
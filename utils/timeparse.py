@@ -0,0 +1,165 @@
+# utils/timeparse.py
+from __future__ import annotations
+import re
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Sentinel stored in int16 minute columns when a row has no usable time
+NO_TIME = -1
+
+BLANK_TIMES = {"", "nan", "nat", "none", "tba", "tbd", "arr", "arranged"}
+
+# Plausible Excel serial day numbers (1954-10-04 .. 2119-01-12)
+_EXCEL_SERIALS = (20000, 80000)
+_EXCEL_EPOCH = np.datetime64("1899-12-30", "D")
+
+_DATE_PREFIX_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]")
+_RANGE_SPLIT_RE = re.compile(r"\s*(?:-|–|—|\bto\b)\s*")
+_TIME_RE = re.compile(
+    r"(?P<h>\d{1,2})"
+    r"(?:(?::|\.)(?P<m>\d{2})(?::\d{2}(?:\.\d+)?)?|(?P<m2>\d{2}))?"
+    r"\s*(?:(?P<ap>[ap])\.?\s*(?:m\.?)?)?"
+)
+
+# ------------------------------ Scalar parsing ------------------------------
+
+def _parse_clock(piece: str) -> Tuple[Optional[int], Optional[str]]:
+    """Parse one clock reading; returns (minutes, meridiem) with minutes=None on failure."""
+    m = _TIME_RE.fullmatch(piece)
+    if not m:
+        return None, None
+    h = int(m.group("h"))
+    mm = int(m.group("m") or m.group("m2") or 0)
+    ap = m.group("ap")
+    if mm > 59:
+        return None, None
+    if ap:
+        if not 1 <= h <= 12:
+            return None, None
+        h = h % 12 + (12 if ap == "p" else 0)
+    elif h > 23:
+        return None, None
+    return h * 60 + mm, ap
+
+def parse_time_value(val) -> Tuple[Optional[int], Optional[int], bool]:
+    """
+    Parse a raw SIS time cell into minutes since midnight.
+    Accepts "10:00 AM", "10:00a", "1000", "13:30:00", Excel day fractions,
+    datetime strings and ranges like "10:00-10:50".
+    Returns (start, end, ok); a single reading fills both start and end,
+    blanks/TBA return (None, None, True), unparseable text (None, None, False).
+    """
+    if val is None or (isinstance(val, float) and np.isnan(val)):
+        return None, None, True
+    s = str(val).strip().lower()
+    if s in BLANK_TIMES:
+        return None, None, True
+
+    # Excel may hand back a time as a fraction of a day
+    try:
+        f = float(s)
+        if 0 <= f < 1 and "." in s:
+            mins = int(round(f * 1440)) % 1440
+            return mins, mins, True
+        if f.is_integer():
+            s = str(int(f))
+    except ValueError:
+        pass
+
+    s = _DATE_PREFIX_RE.sub("", s)
+    pieces = [p for p in _RANGE_SPLIT_RE.split(s) if p]
+    if len(pieces) == 1:
+        mins, _ = _parse_clock(pieces[0])
+        return (mins, mins, mins is not None)
+    if len(pieces) != 2:
+        return None, None, False
+
+    start, start_ap = _parse_clock(pieces[0])
+    end, end_ap = _parse_clock(pieces[1])
+    if start is None or end is None:
+        return None, None, False
+    # "10:00-10:50am" / "11:00-12:15pm": the start inherits the end's meridiem
+    if start_ap is None and end_ap == "p" and start < 12 * 60:
+        if start + 12 * 60 <= end:
+            start += 12 * 60
+    return start, end, True
+
+# ------------------------------ Columnar parsing ------------------------------
+
+def parse_time_column(values: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parse a column of time cells, once per distinct value.
+    Returns int16 arrays (start, end) using NO_TIME for missing, plus boolean
+    arrays `is_range` (cell held a start-end range) and `failed`.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    k = len(uniques)
+    u_start = np.full(k + 1, NO_TIME, dtype=np.int16)
+    u_end = np.full(k + 1, NO_TIME, dtype=np.int16)
+    u_range = np.zeros(k + 1, dtype=bool)
+    u_failed = np.zeros(k + 1, dtype=bool)
+    for i, v in enumerate(uniques):
+        s, e, ok = parse_time_value(v)
+        if s is not None:
+            u_start[i] = s
+            u_end[i] = e
+            u_range[i] = s != e
+        u_failed[i] = not ok
+    # NA cells map to the trailing "blank" slot
+    codes = np.where(codes < 0, k, codes)
+    return u_start[codes], u_end[codes], u_range[codes], u_failed[codes]
+
+def schedule_minutes(start_values: pd.Series, end_values: pd.Series) -> pd.DataFrame:
+    """
+    Build the minute columns for a schedule from its raw Start/End Time cells.
+    A range in the start column supplies the end time when End Time is blank.
+    """
+    s_start, s_end, s_range, s_failed = parse_time_column(start_values)
+    e_start, e_end, e_range, e_failed = parse_time_column(end_values)
+
+    end = np.where(e_end != NO_TIME, e_end, np.where(s_range, s_end, NO_TIME)).astype(np.int16)
+    return pd.DataFrame(
+        {
+            "Start Min": s_start,
+            "End Min": end,
+            "Time Parse Failed": s_failed | e_failed,
+        },
+        index=start_values.index,
+    )
+
+# Label for every minute of the day, plus a trailing blank for NO_TIME
+_HHMM = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)] + [""], dtype=object)
+
+def minutes_to_hhmm(minutes) -> np.ndarray:
+    """Render minutes since midnight as 'HH:MM' strings ('' for NO_TIME)."""
+    m = np.asarray(minutes, dtype=np.int64)
+    return _HHMM[np.where((m >= 0) & (m < 24 * 60), m, len(_HHMM) - 1)]
+
+# ------------------------------ Dates ------------------------------
+
+def _parse_dates(uniques: pd.Series) -> np.ndarray:
+    text = uniques.astype(str).str.strip()
+    num = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+    serial = (num >= _EXCEL_SERIALS[0]) & (num <= _EXCEL_SERIALS[1])
+    text = text.where(~text.str.lower().isin(BLANK_TIMES) & ~serial)
+    try:
+        parsed = pd.to_datetime(text, errors="coerce", format="mixed")
+    except (TypeError, ValueError):
+        parsed = pd.to_datetime(text, errors="coerce")
+    out = parsed.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    out[serial] = _EXCEL_EPOCH + num[serial].astype(np.int64)
+    return out
+
+def parse_date_column(values: pd.Series) -> np.ndarray:
+    """
+    Calendar dates (datetime64[D], NaT when blank or unreadable) for a
+    column of date cells: Timestamps, date text or Excel serial numbers.
+    Each distinct value is parsed once.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    parsed = _parse_dates(pd.Series(uniques, dtype=object)) if len(uniques) else np.empty(0, dtype="datetime64[D]")
+    parsed = np.append(parsed, np.datetime64("NaT", "D"))
+    return parsed[np.where(codes < 0, len(uniques), codes)]
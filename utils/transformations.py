@@ -1,9 +1,21 @@
 # utils/transformations.py
 from __future__ import annotations
-from typing import List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
 import pandas as pd
 import numpy as np
 
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except Exception:
+    _HAS_PYARROW = False
+
+from .instrument import bind_session, current_run_id, current_session, instrumented, set_run_id
+from .layouts import LayoutStore, get_layout_store
+from .timeparse import parse_date_column, schedule_minutes
+
 # ------------------------------ Utilities ------------------------------
 
 DAY_ALIASES = {
@@ -16,6 +28,11 @@ DAY_ALIASES = {
     "u": "U", "sun": "U", "sunday": "U",
 }
 
+# Canonical meeting-day order; bit i of a Day Mask is DAY_ORDER[i]
+DAY_ORDER = "MTWRFSU"
+DAY_BITS = {d: 1 << i for i, d in enumerate(DAY_ORDER)}
+DAY_FLAG_TRUE = ("1","1.0","true","yes","y","x","✓")
+
 COURSE_ID_CANDIDATES = [
     "CourseID", "Course Id", "Course", "Course Number", "Course number",
     "CRSID", "COURSE", "Course & Section", "Course/Section", "Course and Section"
@@ -35,31 +52,105 @@ ENRL_CANDS         = ["Actual Enrolled", "10D Enroll", "10th D Enroll", "EOT Enr
 SEATS_OVERALL_CANDS= ["Seats in Overall Stn Utilization", "Seats Overall", "Seats in Overall"]
 START_DATE_CANDS   = ["Start Date", "Start", "Begin Date"]
 END_DATE_CANDS     = ["End Date", "End"]
+COURSE_NUMBER_CANDS= ["Course Number", "Course", "COURSE", "Course number"]
+DAY_FLAG_NAMES     = ("mon","m","tue","tu","t","wed","w","thu","th","r","fri","f","sat","s","sun","u")
+
+# Role -> candidate headers, resolved against each schedule's columns
+SCHEDULE_ROLES = {
+    "course": COURSE_NUMBER_CANDS,
+    "section": SECTION_CANDIDATES,
+    "course_id": COURSE_ID_CANDIDATES,
+    "title": TITLE_CANDIDATES,
+    "dept": DEPT_CANDIDATES,
+    "instructor": INSTR_CANDIDATES,
+    "start_time": START_TIME_CANDS,
+    "end_time": END_TIME_CANDS,
+    "days": DAYS_CANDS,
+    "bldg": BLDG_CANDS,
+    "room": ROOM_CANDS,
+    "capacity": CAP_CANDS,
+    "enrolled": ENRL_CANDS,
+    "seats_overall": SEATS_OVERALL_CANDS,
+    "start_date": START_DATE_CANDS,
+    "end_date": END_DATE_CANDS,
+}
 
 def _norm_cols(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df.columns = [str(c).strip() for c in df.columns]
     return df
 
-def _find_col(df: pd.DataFrame, cands: List[str]) -> Optional[str]:
-    cols_norm = {c.lower(): c for c in df.columns}
+# Bumped when resolution rules change, so stale stored profiles are ignored
+SCHEDULE_PROFILE_KIND = "schedule-v2"
+
+# Roles read as text; numeric and date roles keep Excel's own types and are coerced later
+SCHEDULE_TEXT_ROLES = ("course", "section", "course_id", "title", "dept", "instructor",
+                       "start_time", "end_time", "days", "bldg", "room")
+
+def _match_col(columns: Iterable[str], cands: List[str]) -> Optional[str]:
+    columns = list(columns)
+    cols_norm = {c.lower(): c for c in columns}
     for c in cands:
         c0 = c.lower()
         if c0 in cols_norm:
             return cols_norm[c0]
-    for c in df.columns:
+    for c in columns:
         cl = c.lower()
         for pat in cands:
             if pat.lower() in cl:
                 return c
     return None
 
-def _concat_course_id(df: pd.DataFrame) -> pd.Series:
-    course_col = _find_col(df, ["Course Number", "Course", "COURSE", "Course number"])
-    sect_col   = _find_col(df, SECTION_CANDIDATES)
+def _day_flag_cols(columns: Iterable[str]) -> List[str]:
+    return [c for c in columns if c.lower() in DAY_FLAG_NAMES]
+
+def schedule_profile(columns: Iterable[str], store: Optional[LayoutStore] = None) -> Dict:
+    """
+    Layout profile for a schedule header: {"mapping": role -> column,
+    "dtypes": column -> dtype}. Reused from the layout store when this header
+    has been seen before, otherwise resolved and saved.
+    """
+    columns = [str(c).strip() for c in columns]
+    store = store or get_layout_store()
+    prof = store.get(SCHEDULE_PROFILE_KIND, columns)
+    if prof is None:
+        mapping = {role: _match_col(columns, cands) for role, cands in SCHEDULE_ROLES.items()}
+        # "Start"/"End" also substring-match the time columns
+        times = {mapping["start_time"], mapping["end_time"]} - {None}
+        for role in ("start_date", "end_date"):
+            if mapping[role] in times:
+                mapping[role] = None
+        text_cols = [mapping[r] for r in SCHEDULE_TEXT_ROLES if mapping[r]]
+        if not mapping["days"]:
+            text_cols += _day_flag_cols(columns)
+        store.put(SCHEDULE_PROFILE_KIND, columns, mapping, {c: "str" for c in text_cols})
+        prof = store.get(SCHEDULE_PROFILE_KIND, columns)
+    return prof
+
+def resolve_schedule_columns(columns: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Map each schedule role (see SCHEDULE_ROLES) to a header in `columns`, or None."""
+    return schedule_profile(columns)["mapping"]
+
+def schedule_source_columns(columns: Iterable[str]) -> List[str]:
+    """
+    Headers build_course_schedule will actually read from a sheet with these
+    columns, so ingestion can skip parsing the rest.
+    """
+    columns = [str(c).strip() for c in columns]
+    mapping = resolve_schedule_columns(columns)
+    used = {c for c in mapping.values() if c}
+    if not mapping["days"]:
+        used.update(_day_flag_cols(columns))
+    return [c for c in columns if c in used]
+
+def _concat_course_id(df: pd.DataFrame, mapping: Optional[Dict[str, Optional[str]]] = None) -> pd.Series:
+    if mapping is None:
+        mapping = resolve_schedule_columns(df.columns)
+    course_col = mapping["course"]
+    sect_col   = mapping["section"]
     if course_col and sect_col:
         return (df[course_col].astype(str).str.strip() + df[sect_col].astype(str).str.strip()).str.replace(r"\s+", "", regex=True)
-    cid_col = _find_col(df, COURSE_ID_CANDIDATES)
+    cid_col = mapping["course_id"]
     if cid_col:
         return df[cid_col].astype(str).str.strip()
     raise KeyError("Missing a course identifier. Provide Course Number + Section or a combined CourseID column.")
@@ -76,65 +167,113 @@ def _normalize_days(val: str) -> str:
         out.append(DAY_ALIASES.get(ch, ch.upper()))
     return "".join(out)
 
+def normalize_days_column(values: pd.Series) -> pd.Series:
+    """_normalize_days once per distinct value, broadcast back to every row."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    norm = np.array([_normalize_days(u) for u in uniques] + [""], dtype=object)
+    return pd.Series(norm[np.where(codes < 0, len(uniques), codes)], index=values.index, dtype=object)
+
+def days_to_mask(days: pd.Series) -> np.ndarray:
+    """uint8 Day Mask per row (bit i set when DAY_ORDER[i] is in Days); other letters are ignored."""
+    codes, uniques = pd.factorize(days, use_na_sentinel=True)
+    masks = np.zeros(len(uniques) + 1, dtype=np.uint8)
+    for i, u in enumerate(uniques):
+        m = 0
+        for ch in str(u):
+            m |= DAY_BITS.get(ch, 0)
+        masks[i] = m
+    return masks[np.where(codes < 0, len(uniques), codes)]
+
+def _days_from_flags(df: pd.DataFrame, flag_cols: List[str]):
+    """
+    Days string and Day Mask from per-day flag columns, without a per-row loop.
+    Letters follow the flag columns' order; strings are built once per
+    distinct flag pattern.
+    """
+    flags = np.column_stack([
+        df[c].astype(str).str.strip().str.lower().isin(DAY_FLAG_TRUE).to_numpy() for c in flag_cols
+    ])
+    letters = np.array([DAY_ALIASES.get(c.lower(), c[:1].upper()) for c in flag_cols], dtype=object)
+    bits = np.array([DAY_BITS.get(l, 0) for l in letters], dtype=np.uint8)
+    mask = np.bitwise_or.reduce(np.where(flags, bits, 0).astype(np.uint8), axis=1)
+
+    patterns, inverse = np.unique(flags, axis=0, return_inverse=True)
+    strings = np.array(["".join(letters[p]) for p in patterns], dtype=object)
+    days = pd.Series(strings[inverse.ravel()], index=df.index, dtype=object)
+    return days, mask
+
 def _time_like_to_str(x):
     if pd.isna(x):
         return ""
     return str(x).strip()
 
+def _time_text_column(values: pd.Series) -> pd.Series:
+    """_time_like_to_str once per distinct value, broadcast back to every row."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    text = np.array([_time_like_to_str(u) for u in uniques] + [""], dtype=object)
+    # Default string inference, same dtype as a per-row .map would give
+    return pd.Series(text[np.where(codes < 0, len(uniques), codes)], index=values.index)
+
 # ------------------------------ Main builders ------------------------------
 
-def build_course_schedule(df_raw: pd.DataFrame) -> pd.DataFrame:
+@instrumented("transformation")
+def build_course_schedule(df_raw: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     """
     Normalized Course Schedule with columns:
     ['CourseID','Special','Course Title','Dept','Instructor','Start Time','End Time',
-     'Days','Location','Bldg','Room','Course Capacity','Actual Enrolled',
+     'Start Min','End Min','Time Parse Failed','Days','Day Mask','Location','Bldg','Room','Course Capacity','Actual Enrolled',
      'Seats in Overall Stn Utilization','Start Date','End Date']
+    Start/End Min are int16 minutes since midnight (NO_TIME when missing);
+    Time Parse Failed flags rows whose time text could not be read.
+    Day Mask is a uint8 bitmask of meeting days (bit i = DAY_ORDER[i]).
+    With compact=True the result goes through compact_course_schedule.
     """
     if df_raw is None or df_raw.empty:
         raise ValueError("Empty schedule dataframe provided.")
     df = _norm_cols(df_raw)
 
+    mapping = resolve_schedule_columns(df.columns)
+
     out = pd.DataFrame()
-    out["CourseID"] = _concat_course_id(df)
+    out["CourseID"] = _concat_course_id(df, mapping)
     out["Special"] = ""
 
-    title_col = _find_col(df, TITLE_CANDIDATES)
-    dept_col  = _find_col(df, DEPT_CANDIDATES)
-    instr_col = _find_col(df, INSTR_CANDIDATES)
-    start_col = _find_col(df, START_TIME_CANDS)
-    end_col   = _find_col(df, END_TIME_CANDS)
-    days_col  = _find_col(df, DAYS_CANDS)
-    bldg_col  = _find_col(df, BLDG_CANDS)
-    room_col  = _find_col(df, ROOM_CANDS)
-    cap_col   = _find_col(df, CAP_CANDS)
-    enr_col   = _find_col(df, ENRL_CANDS)
-    seats_overall_col = _find_col(df, SEATS_OVERALL_CANDS)
-    sdate_col = _find_col(df, START_DATE_CANDS)
-    edate_col = _find_col(df, END_DATE_CANDS)
+    title_col = mapping["title"]
+    dept_col  = mapping["dept"]
+    instr_col = mapping["instructor"]
+    start_col = mapping["start_time"]
+    end_col   = mapping["end_time"]
+    days_col  = mapping["days"]
+    bldg_col  = mapping["bldg"]
+    room_col  = mapping["room"]
+    cap_col   = mapping["capacity"]
+    enr_col   = mapping["enrolled"]
+    seats_overall_col = mapping["seats_overall"]
+    sdate_col = mapping["start_date"]
+    edate_col = mapping["end_date"]
 
     out["Course Title"] = df[title_col].astype(str).str.strip() if title_col else ""
     out["Dept"] = df[dept_col].astype(str).str.strip() if dept_col else ""
     out["Instructor"] = df[instr_col].astype(str).str.strip() if instr_col else ""
 
-    out["Start Time"] = df[start_col].map(_time_like_to_str) if start_col else ""
-    out["End Time"]   = df[end_col].map(_time_like_to_str) if end_col else ""
+    out["Start Time"] = _time_text_column(df[start_col]) if start_col else ""
+    out["End Time"]   = _time_text_column(df[end_col]) if end_col else ""
+    mins = schedule_minutes(out["Start Time"], out["End Time"])
+    out["Start Min"] = mins["Start Min"]
+    out["End Min"] = mins["End Min"]
+    out["Time Parse Failed"] = mins["Time Parse Failed"]
 
     if days_col:
-        out["Days"] = df[days_col].map(_normalize_days).str.replace(" ", "", regex=False)
+        out["Days"] = normalize_days_column(df[days_col])
+        out["Day Mask"] = days_to_mask(out["Days"])
     else:
         # Build from separate day flags if present
-        day_flag_cols = [c for c in df.columns if c.lower() in ("mon","m","tue","tu","t","wed","w","thu","th","r","fri","f","sat","s","sun","u")]
+        day_flag_cols = _day_flag_cols(df.columns)
         if day_flag_cols:
-            def mk_days(row):
-                letters = []
-                for c in day_flag_cols:
-                    val = str(row.get(c, "")).strip().lower()
-                    if val in ("1","true","yes","y","x","✓"):
-                        letters.append(DAY_ALIASES.get(c.lower(), c[:1].upper()))
-                return "".join(letters)
-            out["Days"] = df.apply(mk_days, axis=1)
+            out["Days"], out["Day Mask"] = _days_from_flags(df, day_flag_cols)
         else:
             out["Days"] = ""
+            out["Day Mask"] = np.uint8(0)
 
     out["Bldg"] = df[bldg_col].astype(str).str.strip() if bldg_col else ""
     out["Room"] = df[room_col].astype(str).str.strip() if room_col else ""
@@ -155,8 +294,155 @@ def build_course_schedule(df_raw: pd.DataFrame) -> pd.DataFrame:
     for c in ["Course Title","Dept","Instructor","Days","Location","Bldg","Room","Special","Start Date","End Date"]:
         out[c] = out[c].astype(str)
 
+    if compact:
+        out = compact_course_schedule(out)
+    return out
+
+# ------------------------------ Multi-sheet schedules ------------------------------
+
+# Columns that identify one scheduled meeting pattern across source files
+SECTION_KEY_COLUMNS = ["CourseID", "Days", "Start Min", "End Min", "Location"]
+
+def section_keys(df: pd.DataFrame, columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Dense int64 row key over `columns` (default SECTION_KEY_COLUMNS): equal
+    keys mean equal values. Built column by column from factorize codes,
+    re-compressed after each step so it never overflows.
+    """
+    key = np.zeros(len(df), dtype=np.int64)
+    for c in columns or SECTION_KEY_COLUMNS:
+        codes, uniques = pd.factorize(df[c], use_na_sentinel=False)
+        key, _ = pd.factorize(key * np.int64(len(uniques)) + codes)
+    return key.astype(np.int64)
+
+def duplicate_sections(df: pd.DataFrame, source: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    True for rows repeating an earlier row's SECTION_KEY_COLUMNS (see
+    section_keys). With `source` (a sheet number per row), only repeats of
+    a row from an earlier sheet count, so a sheet's own repeated rows are kept.
+    """
+    if df.empty:
+        return np.zeros(0, dtype=bool)
+    key = section_keys(df)
+    # factorize numbers keys by first appearance, so a running max finds firsts
+    first = np.flatnonzero(np.r_[True, key[1:] > np.maximum.accumulate(key)[:-1]])
+    if source is None:
+        return first[key] != np.arange(len(key))
+    source = np.asarray(source)
+    return source > source[first[key]]
+
+def has_course_identifier(columns: Iterable[str]) -> bool:
+    """True when the headers resolve to Course Number + Section or a combined CourseID."""
+    mapping = resolve_schedule_columns([str(c).strip() for c in columns])
+    return bool((mapping["course"] and mapping["section"]) or mapping["course_id"])
+
+def _normalize_sheet(df_raw: pd.DataFrame, run_id: Optional[str], session=None) -> Optional[pd.DataFrame]:
+    set_run_id(run_id)
+    bind_session(session)
+    if not has_course_identifier(df_raw.columns):
+        # Schedule-looking sheet with no course identifier (e.g. a room list with a Days column)
+        return None
+    return build_course_schedule(df_raw)
+
+@instrumented("transformation")
+def merge_course_schedules(frames: List[pd.DataFrame], compact: bool = False,
+                           workers: Optional[int] = None, dedupe: bool = True) -> pd.DataFrame:
+    """
+    Course Schedule from several raw schedule sheets. Each sheet is normalized
+    against its own header mapping (in a thread pool when there are several),
+    the normalized frames are concatenated and, with `dedupe`, sections
+    repeated from an earlier sheet are dropped (see duplicate_sections). Sheets
+    without a course identifier are skipped; the number of dropped
+    duplicates is in `attrs["duplicate_sections"]`.
+    """
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        raise ValueError("Empty schedule dataframe provided.")
+    workers = min(len(frames), workers or os.cpu_count() or 1)
+    run_id, session = current_run_id(), current_session()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(lambda f: _normalize_sheet(f, run_id, session), frames))
+    else:
+        parts = [_normalize_sheet(f, run_id, session) for f in frames]
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        raise KeyError("Missing a course identifier. Provide Course Number + Section or a combined CourseID column.")
+    dropped = 0
+    if dedupe and len(parts) > 1:
+        # Find repeats on the key columns alone, then filter each part before
+        # the one full-width concat, so no deduplicated copy is ever made
+        keys = pd.concat([p[SECTION_KEY_COLUMNS] for p in parts], ignore_index=True)
+        dup = duplicate_sections(keys, np.repeat(np.arange(len(parts)), [len(p) for p in parts]))
+        dropped = int(dup.sum())
+        if dropped:
+            bounds = np.cumsum([0] + [len(p) for p in parts])
+            parts = [p.loc[~dup[lo:hi]] for p, lo, hi in zip(parts, bounds[:-1], bounds[1:])]
+    out = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    del parts
+    if compact:
+        out = compact_course_schedule(out)
+    out.attrs["duplicate_sections"] = dropped
+    return out
+
+# ------------------------------ Compact schema ------------------------------
+
+# Low-cardinality text -> categorical codes; free text -> Arrow-backed strings
+COMPACT_CATEGORICAL = ["Dept","Instructor","Days","Location","Bldg","Room","Special"]
+COMPACT_TEXT        = ["CourseID","Course Title","Start Time","End Time"]
+COMPACT_INTEGER     = ["Course Capacity","Actual Enrolled","Seats in Overall Stn Utilization"]
+COMPACT_DATES       = ["Start Date","End Date"]
+
+def _text_dtype():
+    return "string[pyarrow]" if _HAS_PYARROW else "string"
+
+def _dates_once(values: pd.Series) -> pd.Series:
+    return pd.Series(parse_date_column(values).astype("datetime64[ns]"), index=values.index)
+
+@instrumented("transformation")
+def compact_course_schedule(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memory-lean copy of a normalized course schedule: sorted categoricals for
+    low-cardinality text, Arrow-backed (or pandas) strings for free text,
+    the smallest integer dtype for counts and datetime64 for dates.
+    """
+    out = df.copy()
+    for c in COMPACT_CATEGORICAL:
+        if c in out.columns:
+            cats = pd.Index(pd.unique(out[c].dropna())).sort_values()
+            out[c] = pd.Categorical(out[c], categories=cats)
+    for c in COMPACT_TEXT:
+        if c in out.columns:
+            out[c] = out[c].astype(_text_dtype())
+    for c in COMPACT_INTEGER:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce").fillna(0).astype(np.int64)
+            out[c] = pd.to_numeric(out[c], downcast="integer")
+    for c in COMPACT_DATES:
+        if c in out.columns:
+            out[c] = _dates_once(out[c])
     return out
 
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column deep memory use and dtype before/after a conversion, with a total row."""
+    b = before.memory_usage(deep=True, index=False)
+    a = after.memory_usage(deep=True, index=False)
+    rep = pd.DataFrame({
+        "column": b.index,
+        "dtype_before": [str(before[c].dtype) for c in b.index],
+        "dtype_after": [str(after[c].dtype) if c in after.columns else "" for c in b.index],
+        "bytes_before": b.to_numpy(),
+        "bytes_after": a.reindex(b.index).fillna(0).astype(np.int64).to_numpy(),
+    })
+    total = pd.DataFrame([{
+        "column": "TOTAL", "dtype_before": "", "dtype_after": "",
+        "bytes_before": int(rep["bytes_before"].sum()), "bytes_after": int(rep["bytes_after"].sum()),
+    }])
+    rep = pd.concat([rep, total], ignore_index=True)
+    rep["saved_pct"] = (100.0 * (1 - rep["bytes_after"] / rep["bytes_before"].where(rep["bytes_before"] > 0))).round(1)
+    return rep
+
+@instrumented("transformation")
 def build_campus_rooms(lookup_df: pd.DataFrame) -> pd.DataFrame:
     if lookup_df is None or lookup_df.empty:
         raise ValueError("Empty building/room lookup dataframe provided.")
@@ -185,6 +471,7 @@ def build_campus_rooms(lookup_df: pd.DataFrame) -> pd.DataFrame:
 
     return df[["Room ID","Bldg","Room","Stations","Room Type","ASF","Room Size Category"]].copy()
 
+@instrumented("transformation")
 def build_campus_buildings(rooms_df: pd.DataFrame) -> pd.DataFrame:
     if rooms_df is None or rooms_df.empty:
         return pd.DataFrame(columns=["Bldg","Rooms","Total Stations","Total ASF"])
@@ -197,6 +484,7 @@ def build_campus_buildings(rooms_df: pd.DataFrame) -> pd.DataFrame:
     grp.rename(columns={"Total_Stations":"Total Stations","Total_ASF":"Total ASF"}, inplace=True)
     return grp
 
+@instrumented("transformation")
 def build_academic_departments(course_df: pd.DataFrame) -> pd.DataFrame:
     if course_df is None or course_df.empty:
         return pd.DataFrame(columns=["Dept","Sections","Total Enrolled"])
@@ -205,13 +493,14 @@ def build_academic_departments(course_df: pd.DataFrame) -> pd.DataFrame:
         df["Dept"] = ""
     if "Actual Enrolled" not in df.columns:
         df["Actual Enrolled"] = 0
-    grp = df.groupby("Dept", as_index=False).agg(
+    grp = df.groupby("Dept", as_index=False, observed=True).agg(
         Sections=("CourseID","nunique"),
         Total_Enrolled=("Actual Enrolled","sum"),
     )
     grp.rename(columns={"Total_Enrolled":"Total Enrolled"}, inplace=True)
     return grp
 
+@instrumented("transformation")
 def build_rooms_inventory(rooms_df: pd.DataFrame) -> pd.DataFrame:
     if rooms_df is None or rooms_df.empty:
         return pd.DataFrame(columns=["Room ID","Desks","Tables","Chairs","Computers","AV","Wall","Other"])
@@ -220,10 +509,11 @@ def build_rooms_inventory(rooms_df: pd.DataFrame) -> pd.DataFrame:
         out[c] = ""
     return out
 
+@instrumented("transformation")
 def build_course_instructors(course_df: pd.DataFrame) -> pd.DataFrame:
     if course_df is None or course_df.empty:
         return pd.DataFrame(columns=["Instructor","Dept","Daily Hours (M-F)"])
     df = course_df.copy()
-    out = df.groupby(["Instructor","Dept"], as_index=False).agg(sections=("CourseID","nunique"))
+    out = df.groupby(["Instructor","Dept"], as_index=False, observed=True).agg(sections=("CourseID","nunique"))
     out["Daily Hours (M-F)"] = ""
     return out